@@ -6,26 +6,22 @@ import json
 import config
 from datetime import datetime
 
+PAIR_TEXT_COLUMNS = ['statement_a', 'statement_b', 'source_a', 'source_b', 'author_a', 'author_b',
+                     'topic_a', 'topic_b']
+
 class AnnotationExporter:
     def __init__(self, db):
         self.db = db
     
-    def export_to_csv(self, output_path=None):
+    def export_to_csv(self, output_path=None, chunk_size=None, **filters):
         """
-        Export pairs to CSV for manual annotation
+        Export pairs to CSV for manual annotation, streamed in chunks
+        filters: unlabeled_only, stratum, min_score (applied in SQL, see pairs_query)
         """
         if output_path is None:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             output_path = f"{config.FINAL_DATA_PATH}pairs_for_annotation_{timestamp}.csv"
         
-        # Get all pairs from database
-        pairs_df = self.db.get_all_pairs()
-        
-        # Prepare annotation columns
-        pairs_df['relationship_label'] = ''  # To be filled: Unrelated/Consistent/Inconsistent
-        pairs_df['inconsistency_subtype'] = ''  # To be filled if Inconsistent
-        pairs_df['notes'] = ''
-        
         # Reorder columns for annotation
         columns = [
             'id',
@@ -44,11 +40,20 @@ class AnnotationExporter:
             'notes'
         ]
         
-        pairs_df = pairs_df[columns]
+        count = 0
+        for pairs_df in self.db.iter_pairs(chunk_size, **filters):
+            # Prepare annotation columns
+            pairs_df['relationship_label'] = ''  # To be filled: Unrelated/Consistent/Inconsistent
+            pairs_df['inconsistency_subtype'] = ''  # To be filled if Inconsistent
+            pairs_df['notes'] = ''
+            
+            pairs_df[columns].to_csv(output_path, mode='w' if count == 0 else 'a', header=(count == 0),
+                                     index=False, encoding='utf-8')
+            count += len(pairs_df)
+        if count == 0:
+            pd.DataFrame(columns=columns).to_csv(output_path, index=False, encoding='utf-8')
         
-        # Save to CSV
-        pairs_df.to_csv(output_path, index=False, encoding='utf-8')
-        print(f"\n✓ Exported {len(pairs_df)} pairs to: {output_path}")
+        print(f"\n✓ Exported {count} pairs to: {output_path}")
         print(f"\nAnnotation Guidelines:")
         print("  relationship_label options:")
         print("    - Unrelated: Statements discuss different topics")
@@ -61,19 +66,103 @@ class AnnotationExporter:
         
         return output_path
     
-    def export_to_json(self, output_path=None):
+    def export_to_json(self, output_path=None, chunk_size=None, **filters):
         """
         Export pairs to JSON format (alternative format)
+        The array is written record by record, in the layout of json.dump(indent=2)
         """
         if output_path is None:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             output_path = f"{config.FINAL_DATA_PATH}pairs_for_annotation_{timestamp}.json"
         
-        pairs_df = self.db.get_all_pairs()
-        pairs_json = pairs_df.to_dict('records')
-        
+        count = 0
         with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(pairs_json, f, indent=2, ensure_ascii=False)
+            f.write('[')
+            for pairs_df in self.db.iter_pairs(chunk_size, **filters):
+                for record in pairs_df.to_dict('records'):
+                    f.write(',\n  ' if count else '\n  ')
+                    f.write(json.dumps(record, indent=2, ensure_ascii=False).replace('\n', '\n  '))
+                    count += 1
+            f.write('\n]' if count else ']')
         
         print(f"✓ Exported to JSON: {output_path}")
         return output_path
+    
+    def export_to_jsonl(self, output_path=None, chunk_size=None, **filters):
+        """
+        Export pairs as JSON Lines, one record per line, streamed in chunks
+        """
+        if output_path is None:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            output_path = f"{config.FINAL_DATA_PATH}pairs_for_annotation_{timestamp}.jsonl"
+        
+        count = 0
+        with open(output_path, 'w', encoding='utf-8') as f:
+            for pairs_df in self.db.iter_pairs(chunk_size, **filters):
+                for record in pairs_df.to_dict('records'):
+                    f.write(json.dumps(record, ensure_ascii=False) + '\n')
+                count += len(pairs_df)
+        
+        print(f"✓ Exported {count} pairs to JSONL: {output_path}")
+        return output_path
+    
+    def export_to_parquet(self, output_path=None, chunk_size=None, **filters):
+        """
+        Export pairs to Parquet, one row group per chunk (needs pyarrow)
+        """
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("Parquet export needs pyarrow (pip install pyarrow)")
+        
+        if output_path is None:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            output_path = f"{config.FINAL_DATA_PATH}pairs_for_annotation_{timestamp}.parquet"
+        
+        # Fixed schema, so chunks whose optional columns are all empty still match
+        schema = pa.schema([('id', pa.int64())]
+                           + [(column, pa.string()) for column in PAIR_TEXT_COLUMNS]
+                           + [('similarity_score', pa.float64()), ('same_source', pa.bool_()),
+                              ('relationship_label', pa.string()), ('inconsistency_subtype', pa.string())])
+        
+        count = 0
+        with pq.ParquetWriter(output_path, schema) as writer:
+            for pairs_df in self.db.iter_pairs(chunk_size, **filters):
+                pairs_df['same_source'] = pairs_df['same_source'].astype('boolean')
+                writer.write_table(pa.Table.from_pandas(pairs_df, schema=schema, preserve_index=False))
+                count += len(pairs_df)
+        
+        print(f"✓ Exported {count} pairs to Parquet: {output_path}")
+        return output_path
+    
+    def export_statements(self, statements, output_path=None, chunk_size=100000):
+        """
+        Export a StatementStore to CSV, one chunk of rows at a time
+        Metadata columns are written straight from their dictionary encoding
+        """
+        if output_path is None:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            output_path = f"{config.PROCESSED_DATA_PATH}statements_{timestamp}.csv"
+        
+        columns = ['text', 'source_url', 'author', 'date', 'domain', 'source_type', 'has_opinion', 'word_count']
+        opinions = statements.opinion_mask
+        
+        for start in range(0, max(len(statements), 1), chunk_size):
+            end = min(start + chunk_size, len(statements))
+            chunk = {'text': [statements.text(i) for i in range(start, end)]}
+            for field in ['source_url', 'author', 'date', 'domain', 'source_type']:
+                chunk[field] = pd.Categorical.from_codes(
+                    statements.codes(field)[start:end],
+                    categories=pd.Index(statements.categories(field), dtype=object)
+                )
+            chunk['has_opinion'] = opinions[start:end]
+            chunk['word_count'] = statements.word_counts[start:end]
+            
+            pd.DataFrame(chunk, columns=columns).to_csv(
+                output_path, mode='w' if start == 0 else 'a', header=(start == 0),
+                index=False, encoding='utf-8'
+            )
+        
+        print(f"✓ Exported {len(statements)} statements to: {output_path}")
+        return output_path
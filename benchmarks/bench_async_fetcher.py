@@ -0,0 +1,89 @@
+"""
+Benchmark: sequential scraping vs the asyncio fetcher against local stand-in hosts
+Each stand-in server listens on its own port, so it counts as a separate domain. A host
+refusing every page (HTTP 403) must open its circuit after HOST_FAILURE_THRESHOLD requests
+while stale links (HTTP 404) on a healthy host must not,
+and a busy host's queue must not hold the fetch slots other hosts need
+
+Usage: python -m benchmarks.bench_async_fetcher [num_hosts] [urls_per_host] [latency]
+"""
+import sys
+import time
+
+import config
+from scraping.async_fetcher import AsyncContentFetcher, DomainRateLimiter
+from scraping.enhanced_content_scraper import EnhancedContentScraper
+from benchmarks.standin_server import StandInServer
+
+def main():
+    num_hosts = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    urls_per_host = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    latency = float(sys.argv[3]) if len(sys.argv) > 3 else 0.2
+
+    # Keep the politeness budget identical for both runs
+    config.SCRAPE_DELAY = 0.5
+    config.PER_DOMAIN_RATE = 1 / config.SCRAPE_DELAY
+
+    servers = [StandInServer(latency=latency).start() for _ in range(num_hosts)]
+    try:
+        urls = [f"{s.base_url}/article/{i}" for i in range(urls_per_host) for s in servers]
+        # Both runs must hit the network
+        scraper = EnhancedContentScraper(use_cache=False, use_memo=False, use_frontier=False,
+                                         use_url_index=False)
+
+        start = time.perf_counter()
+        sequential = scraper.scrape_multiple_urls(urls, concurrent=False)
+        sequential_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        concurrent = scraper.scrape_multiple_urls(urls, concurrent=True)
+        concurrent_time = time.perf_counter() - start
+        
+        # A dozen URLs of one host queued ahead of the others, with fewer slots than that:
+        # the other hosts must not wait behind the busy host's politeness delay
+        busy, others = servers[0], servers[1:]
+        queue = [f"{busy.base_url}/article/{100 + i}" for i in range(12)]
+        queue += [f"{s.base_url}/article/{100 + i}" for i in range(2) for s in others]
+        finished = {}
+        fetcher = AsyncContentFetcher(scraper, max_concurrency=4, rate_limiter=DomainRateLimiter(rate=2, burst=1),
+                                      parse_workers=0)
+        start = time.perf_counter()
+        fetcher.fetch_all(queue, on_result=lambda url, doc, error: finished.setdefault(
+            url.split('/article/')[0], []).append(time.perf_counter() - start))
+        busy_time = max(finished.pop(busy.base_url))
+        others_time = max(max(times) for times in finished.values())
+        
+        # Errors that are not retried still count toward the host's circuit
+        blocked = StandInServer(latency=latency).start()
+        servers.append(blocked)
+        blocked_urls = [f"{blocked.base_url}/blocked/{i}" for i in range(2 * config.HOST_FAILURE_THRESHOLD)]
+        for url in blocked_urls:
+            blocked.add_route(url[len(blocked.base_url):], 'forbidden', content_type='text/plain', status=403)
+        assert not scraper.scrape_multiple_urls(blocked_urls, concurrent=False)
+        blocked_requests = blocked.request_count
+        
+        # Stale links fail one by one; the host stays open for its live pages
+        stale = [f"{busy.base_url}/gone/{i}" for i in range(2 * config.HOST_FAILURE_THRESHOLD)]
+        stale_requests = busy.request_count
+        live = scraper.scrape_multiple_urls(stale + [f"{busy.base_url}/article/200"], concurrent=False)
+        stale_requests = busy.request_count - stale_requests
+        scraper.close()
+    finally:
+        for s in servers:
+            s.stop()
+
+    assert [d['text'] for d in sequential] == [d['text'] for d in concurrent], "results differ"
+    print(f"\n{len(urls)} URLs over {num_hosts} hosts, {latency}s latency, {config.SCRAPE_DELAY}s per-domain delay")
+    print(f"  Sequential: {sequential_time:.2f}s ({len(urls)/sequential_time:.2f} URLs/sec)")
+    print(f"  Asyncio:    {concurrent_time:.2f}s ({len(urls)/concurrent_time:.2f} URLs/sec)")
+    print(f"  Speed-up: {sequential_time/concurrent_time:.1f}x, identical documents ✓")
+    assert busy_time >= 11 / 2, "the busy host got more than 2 requests/sec"
+    assert others_time < 2, f"other hosts waited {others_time:.1f}s behind the busy one"
+    print(f"  Busy host queued first: other hosts done in {others_time:.1f}s, busy host in {busy_time:.1f}s ✓")
+    assert blocked_requests == config.HOST_FAILURE_THRESHOLD, f"{blocked_requests} requests to a refusing host"
+    print(f"  Host answering 403: circuit opened after {blocked_requests}/{len(blocked_urls)} requests ✓")
+    assert len(live) == 1 and stale_requests == len(stale) + 1, "stale links opened a healthy host's circuit"
+    print(f"  Host with {len(stale)} stale links (404): circuit stayed closed, live page scraped ✓")
+
+if __name__ == "__main__":
+    main()
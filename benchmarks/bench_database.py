@@ -0,0 +1,222 @@
+"""
+Benchmark: StatementDatabase inserts, per row vs bulk
+The original per-row insert (a new connection and a commit per row, a SELECT after an
+IntegrityError for duplicates) and insert_statement on the shared WAL connection run on
+a sample; insert_statements_bulk/insert_pairs_bulk run on the full set, then again with
+half the statements already stored. Every path must map each row to the same statement
+Pair persistence (Step 7 of the pipeline) is compared too: re-inserting both statements
+of every pair to find their ids, vs ids carried from the statement insert. Last, a
+database of the original schema is migrated in place to content-hash keys
+
+Usage: python -m benchmarks.bench_database [num_statements] [sample_rows] [duplicate_rate] [num_pairs]
+"""
+import contextlib
+import io
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from storage.database import StatementDatabase, content_hash
+
+def reference_create_tables(db_path):
+    """Original schema: statements unique on (text, source_url)"""
+    conn = sqlite3.connect(db_path)
+    conn.execute('''
+        CREATE TABLE statements (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, text TEXT NOT NULL, source_url TEXT, author TEXT,
+            publication_date TEXT, topic TEXT, document_id TEXT, created_at TEXT, UNIQUE(text, source_url)
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE statement_pairs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, statement_a_id INTEGER, statement_b_id INTEGER,
+            similarity_score REAL, same_source BOOLEAN, relationship_label TEXT, inconsistency_subtype TEXT,
+            created_at TEXT, FOREIGN KEY (statement_a_id) REFERENCES statements(id),
+            FOREIGN KEY (statement_b_id) REFERENCES statements(id), UNIQUE(statement_a_id, statement_b_id)
+        )
+    ''')
+    conn.commit()
+    conn.close()
+
+def used_bytes(conn):
+    """Bytes of the database file in use (freed pages excluded)"""
+    pages = conn.execute('PRAGMA page_count').fetchone()[0] - conn.execute('PRAGMA freelist_count').fetchone()[0]
+    return pages * conn.execute('PRAGMA page_size').fetchone()[0]
+
+def reference_insert_statement(db_path, text, source_url, author=None, topic=None, document_id=None):
+    """Original StatementDatabase.insert_statement"""
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    try:
+        cursor.execute('''
+            INSERT INTO statements (text, source_url, author, topic, document_id, created_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', (text, source_url, author, topic, document_id, datetime.now().isoformat()))
+        conn.commit()
+        statement_id = cursor.lastrowid
+    except sqlite3.IntegrityError:
+        cursor.execute('SELECT id FROM statements WHERE text=? AND source_url=?', (text, source_url))
+        statement_id = cursor.fetchone()[0]
+    conn.close()
+    return statement_id
+
+def reference_insert_pair(db_path, statement_a_id, statement_b_id, similarity_score, same_source=True):
+    """Original StatementDatabase.insert_pair"""
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    try:
+        cursor.execute('''
+            INSERT INTO statement_pairs (statement_a_id, statement_b_id, similarity_score, same_source, created_at)
+            VALUES (?, ?, ?, ?, ?)
+        ''', (statement_a_id, statement_b_id, similarity_score, same_source, datetime.now().isoformat()))
+        conn.commit()
+        pair_id = cursor.lastrowid
+    except sqlite3.IntegrityError:
+        pair_id = None
+    conn.close()
+    return pair_id
+
+def same_statements(ids, other_ids):
+    """Both id lists give every input row the same stored statement (ids themselves may
+    differ: AUTOINCREMENT values consumed by ON CONFLICT DO NOTHING are not reused)"""
+    mapping = {}
+    return len(ids) == len(other_ids) and all(mapping.setdefault(a, b) == b for a, b in zip(ids, other_ids)) \
+        and len(set(mapping.values())) == len(mapping)
+
+def make_statements(count, duplicate_rate, seed=42):
+    """Synthetic extracted statements, about 20 per source URL, with repeats"""
+    rng = random.Random(seed)
+    words = ['farmers', 'MSP', 'wheat', 'paddy', 'quintal', 'subsidy', 'mandi', 'procurement', 'crore',
+             'irrigation', 'monsoon', 'kharif', 'rabi', 'fertiliser', 'loan', 'waiver', 'price', 'rose']
+    statements = []
+    for i in range(count):
+        if statements and rng.random() < duplicate_rate:
+            statements.append(dict(rng.choice(statements)))
+            continue
+        text = ' '.join(rng.choice(words) for _ in range(rng.randint(8, 30))) + f" ({i})."
+        statements.append({'text': text, 'source_url': f"https://example.com/news/{i // 20}",
+                           'author': rng.choice([None, 'PTI', 'Staff Reporter'])})
+    return statements
+
+def main():
+    num_statements = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    sample_rows = int(sys.argv[2]) if len(sys.argv) > 2 else 5000
+    duplicate_rate = float(sys.argv[3]) if len(sys.argv) > 3 else 0.1
+    num_pairs = int(sys.argv[4]) if len(sys.argv) > 4 else 1000
+
+    statements = make_statements(num_statements, duplicate_rate)
+    sample = statements[:sample_rows]
+    workdir = tempfile.mkdtemp()
+    rows = []
+
+    def timed(label, count, run):
+        start = time.perf_counter()
+        result = run()
+        seconds = time.perf_counter() - start
+        rows.append((label, count, seconds))
+        return result
+
+    # Original: a connection and a commit per row
+    path = os.path.join(workdir, 'reference.db')
+    reference_create_tables(path)
+    reference_ids = timed('Per row, new connection', len(sample), lambda: [
+        reference_insert_statement(path, s['text'], s['source_url'], s['author'], 'agriculture') for s in sample
+    ])
+
+    # insert_statement: a commit per row on the shared WAL connection
+    db = StatementDatabase(os.path.join(workdir, 'per_row.db'))
+    per_row_ids = timed('Per row, WAL connection', len(sample), lambda: [
+        db.insert_statement(s['text'], s['source_url'], s['author'], 'agriculture') for s in sample
+    ])
+    db.close()
+    assert same_statements(per_row_ids, reference_ids), "insert_statement ids differ from the original"
+
+    # Bulk: all statements, then pairs between consecutive ones, in one transaction each
+    db = StatementDatabase(os.path.join(workdir, 'bulk.db'))
+    half = statements[:num_statements // 2]
+    timed('Bulk, new statements', len(half), lambda: db.insert_statements_bulk(half, topic='agriculture'))
+    bulk_ids = timed('Bulk, half stored', num_statements,
+                     lambda: db.insert_statements_bulk(statements, topic='agriculture'))
+    assert same_statements(bulk_ids[:sample_rows], reference_ids), "bulk ids differ from the original"
+    assert len(set(bulk_ids)) == len({(s['text'], s['source_url']) for s in statements})
+
+    pairs = [(a, b, 0.8, True) for a, b in zip(bulk_ids, bulk_ids[1:]) if a != b]
+    pair_ids = timed('Bulk pairs', len(pairs), lambda: db.insert_pairs_bulk(pairs))
+    unique_pairs = len({pair[:2] for pair in pairs})
+    assert sum(pair_id is not None for pair_id in pair_ids) == unique_pairs
+    assert not any(timed('Bulk pairs, all stored', len(pairs), lambda: db.insert_pairs_bulk(pairs)))
+    db.close()
+
+    # Step 7: pairs as generated, referencing statements by index into the sample
+    rng = random.Random(7)
+    pair_indices = [tuple(rng.sample(range(sample_rows), 2)) for _ in range(num_pairs)]
+
+    def original_step7():
+        saved = 0
+        for a, b in pair_indices:
+            a_id = reference_insert_statement(path, sample[a]['text'], sample[a]['source_url'],
+                                              sample[a]['author'], 'agriculture')
+            b_id = reference_insert_statement(path, sample[b]['text'], sample[b]['source_url'],
+                                              sample[b]['author'], 'agriculture')
+            saved += reference_insert_pair(path, a_id, b_id, 0.8) is not None
+        return saved
+
+    db = StatementDatabase(os.path.join(workdir, 'step7.db'))
+    statement_ids = db.insert_statements_bulk(sample, topic='agriculture')
+    saved = timed('Step 7, re-inserting', num_pairs, original_step7)
+    pair_ids = timed('Step 7, by statement index', num_pairs, lambda: db.insert_pairs_bulk(
+        (statement_ids[a], statement_ids[b], 0.8, True) for a, b in pair_indices
+    ))
+    assert sum(pair_id is not None for pair_id in pair_ids) == saved
+    db.close()
+
+    # Migration: every statement and pair in the original schema, upgraded in place
+    legacy = os.path.join(workdir, 'legacy.db')
+    reference_create_tables(legacy)
+    conn = sqlite3.connect(legacy)
+    conn.executemany('INSERT OR IGNORE INTO statements (text, source_url, author, topic) VALUES (?, ?, ?, ?)',
+                     [(s['text'], s['source_url'], s['author'], 'agriculture') for s in statements])
+    legacy_ids = {(text, url): statement_id
+                  for statement_id, text, url in conn.execute('SELECT id, text, source_url FROM statements')}
+    ids = [legacy_ids[s['text'], s['source_url']] for s in statements]
+    conn.executemany('INSERT OR IGNORE INTO statement_pairs (statement_a_id, statement_b_id, similarity_score) '
+                     'VALUES (?, ?, 0.8)', [(a, b) for a, b in zip(ids, ids[1:]) if a != b])
+    conn.commit()
+    keys = list(legacy_ids)
+    timed('Lookup, text + URL', len(keys), lambda: [
+        conn.execute('SELECT id FROM statements WHERE text=? AND source_url=?', key).fetchone() for key in keys
+    ])
+    size_before = used_bytes(conn)
+    pairs_before = conn.execute('SELECT COUNT(*) FROM statement_pairs').fetchone()[0]
+    conn.close()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        db = timed('Migration', len(keys), lambda: StatementDatabase(legacy))
+    migrated_ids = timed('Lookup, content_hash', len(keys), lambda: [
+        db.conn.execute('SELECT id FROM statements WHERE content_hash=?', (content_hash(*key),)).fetchone()[0]
+        for key in keys
+    ])
+    assert migrated_ids == [legacy_ids[key] for key in keys], "migration changed statement ids"
+    assert db.conn.execute('SELECT COUNT(*) FROM statement_pairs').fetchone()[0] == pairs_before
+    size_after = used_bytes(db.conn)
+    db.close()
+
+    print(f"{num_statements} statements ({duplicate_rate:.0%} repeated), per-row paths on the first {sample_rows}")
+    print(f"{'Operation':<28} {'Rows':>8} {'Seconds':>9} {'Rows/sec':>10}")
+    for label, count, seconds in rows:
+        print(f"{label:<28} {count:>8} {seconds:>9.2f} {count / seconds:>10.0f}")
+    rates = {label: count / seconds for label, count, seconds in rows}
+    print(f"Bulk vs original: {rates['Bulk, new statements'] / rates['Per row, new connection']:.0f}x rows/sec, "
+          f"same statement ids ✓")
+    print(f"Step 7 ({num_pairs} pairs): {3 * num_pairs} connections -> 1 transaction, "
+          f"{rates['Step 7, by statement index'] / rates['Step 7, re-inserting']:.0f}x faster, same pairs saved ✓")
+    print(f"Migration: {size_before / 2 ** 20:.1f} MB -> {size_after / 2 ** 20:.1f} MB in use "
+          f"(with source_url/similarity/label indexes), lookups "
+          f"{rates['Lookup, content_hash'] / rates['Lookup, text + URL']:.1f}x faster, ids and pairs kept ✓")
+
+if __name__ == "__main__":
+    main()
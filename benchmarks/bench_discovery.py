@@ -0,0 +1,225 @@
+"""
+Benchmark: sitemap/RSS discovery against local stand-in sites
+Each stand-in host serves robots.txt (with a disallowed section), a sitemap index of
+gzipped child sitemaps, a news sitemap and RSS/Atom feeds linked from its homepage.
+Discovery runs three times: a first crawl, an unchanged rerun, and a rerun after every
+site publishes a new sitemap and feed items, which must return only the new articles.
+Last, a fresh crawl capped at max_urls_per_domain must return every article exactly
+once over as many runs as the cap needs. A host serving a gzip bomb, an oversized
+sitemap and one with a video content type must yield nothing, with memory bounded by
+DISCOVERY_MAX_BYTES
+
+Usage: python -m benchmarks.bench_discovery [num_hosts] [sitemaps_per_host] [urls_per_sitemap] [latency] [cap]
+"""
+import gzip
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import config
+from benchmarks.standin_server import StandInServer
+from scraping.discovery import DiscoveryCrawler
+from scraping.enhanced_content_scraper import EnhancedContentScraper
+
+SITEMAP_NS = 'xmlns="http://www.sitemaps.org/schemas/sitemap/0.9"'
+NEWS_NS = 'xmlns:news="http://www.google.com/schemas/sitemap-news/0.9"'
+AGRI_SLUGS = ["msp-wheat-procurement", "farmers-protest-apmc", "kharif-crop-sowing", "fertiliser-subsidy-cut"]
+OTHER_SLUGS = ["cricket-world-cup", "stock-market-rally", "bollywood-box-office", "election-results"]
+
+class StandInSite:
+    """Sitemaps and feeds of one stand-in host; expected holds the URLs discovery should find"""
+
+    def __init__(self, server, sitemaps, urls_per_sitemap):
+        self.server = server
+        self.urls_per_sitemap = urls_per_sitemap
+        self.now = datetime.now(timezone.utc)
+        self.next_id = 0
+        self.children = []  # (path, lastmod)
+        self.feed_items = []  # (url, title, date)
+        self.expected = set()
+
+        base = server.base_url
+        server.add_route('/robots.txt', f"User-agent: *\nDisallow: /private/\n"
+                                        f"Sitemap: {base}/sitemap_index.xml\nSitemap: {base}/news-sitemap.xml\n",
+                         content_type='text/plain')
+        server.add_route('/', f"""<html><head>
+<link rel="alternate" type="application/rss+xml" href="/feed.rss">
+<link rel="alternate" type="application/atom+xml" href="{base}/feed.atom"></head><body></body></html>""")
+        for age in range(sitemaps, 0, -1):
+            self.publish_sitemap(self.now - timedelta(days=age))
+        self.publish_news()
+        self.publish_feeds(self.now - timedelta(hours=1))
+
+    def _article(self, agri, private=False):
+        self.next_id += 1
+        slugs = AGRI_SLUGS if agri else OTHER_SLUGS
+        section = 'private' if private else 'news'
+        url = f"{self.server.base_url}/{section}/{slugs[self.next_id % len(slugs)]}/{self.next_id}"
+        if agri and not private:
+            self.expected.add(url)
+        return url
+
+    def publish_sitemap(self, lastmod):
+        """A gzipped child sitemap: half agriculture articles, some of them disallowed"""
+        entries = []
+        for i in range(self.urls_per_sitemap):
+            url = self._article(agri=i % 2 == 0, private=i % 10 == 0)
+            entries.append(f"<url><loc>{url}</loc><lastmod>{lastmod.isoformat()}</lastmod></url>")
+        path = f"/sitemaps/{len(self.children)}.xml.gz"
+        xml = f'<?xml version="1.0" encoding="UTF-8"?><urlset {SITEMAP_NS}>{"".join(entries)}</urlset>'
+        self.server.add_route(path, gzip.compress(xml.encode('utf-8')), content_type='application/x-gzip')
+        self.children.append((path, lastmod))
+
+        index = ''.join(f"<sitemap><loc>{self.server.base_url}{p}</loc><lastmod>{m.isoformat()}</lastmod></sitemap>"
+                        for p, m in self.children)
+        self.server.add_route('/sitemap_index.xml', f'<sitemapindex {SITEMAP_NS}>{index}</sitemapindex>',
+                              content_type='application/xml')
+
+    def publish_news(self):
+        """News sitemap: agriculture shows only in the headline"""
+        entries = []
+        for i in range(10):
+            url = self._article(agri=False)
+            title = "Farmers demand higher MSP for paddy" if i % 2 == 0 else "Markets close higher"
+            if i % 2 == 0:
+                self.expected.add(url)
+            entries.append(f"<url><loc>{url}</loc><news:news><news:publication_date>{self.now.isoformat()}"
+                           f"</news:publication_date><news:title>{title}</news:title></news:news></url>")
+        self.server.add_route('/news-sitemap.xml', f'<urlset {SITEMAP_NS} {NEWS_NS}>{"".join(entries)}</urlset>',
+                              content_type='application/xml')
+
+    def publish_feeds(self, date):
+        """RSS and Atom feeds with the latest items (RSS items repeat sitemap-style articles)"""
+        for _ in range(5):
+            self.feed_items.append((self._article(agri=True), "Monsoon update for farmers", date))
+        items = self.feed_items[-20:]
+        rss = ''.join(f"<item><title>{t}</title><link>{u}</link><pubDate>{d.strftime('%a, %d %b %Y %H:%M:%S +0000')}"
+                      f"</pubDate></item>" for u, t, d in items)
+        atom = ''.join(f'<entry><title>{t}</title><link href="{u}"/><updated>{d.isoformat()}</updated></entry>'
+                       for u, t, d in items)
+        self.server.add_route('/feed.rss', f'<rss version="2.0"><channel>{rss}</channel></rss>',
+                              content_type='application/rss+xml')
+        self.server.add_route('/feed.atom', f'<feed xmlns="http://www.w3.org/2005/Atom">{atom}</feed>',
+                              content_type='application/atom+xml')
+
+def check_oversized_listings(max_bytes=1024 * 1024):
+    """
+    Sitemaps over DISCOVERY_MAX_BYTES (as downloaded or after gunzip) or with a content
+    type discovery does not read are rejected before they are held in memory
+    Returns (rejected sitemaps, peak traced memory in bytes)
+    """
+    config.DISCOVERY_MAX_BYTES = max_bytes
+    server = StandInServer().start()
+    base = server.base_url
+    entry = f'<url><loc>{base}/news/msp-wheat-procurement/1</loc></url>'
+    padding = ' ' * (64 * max_bytes)
+    sitemaps = {
+        '/bomb.xml.gz': (gzip.compress(f'<urlset {SITEMAP_NS}>{entry}{padding}</urlset>'.encode()), 'application/x-gzip'),
+        '/huge.xml': (f'<urlset {SITEMAP_NS}>{entry * (2 * max_bytes // len(entry))}</urlset>', 'application/xml'),
+        '/sitemap.mp4': (f'<urlset {SITEMAP_NS}>{entry}</urlset>', 'video/mp4'),
+    }
+    for path, (body, content_type) in sitemaps.items():
+        server.add_route(path, body, content_type=content_type)
+    server.add_route('/robots.txt', ''.join(f"Sitemap: {base}{path}\n" for path in sitemaps), content_type='text/plain')
+    del padding
+
+    try:
+        crawler = DiscoveryCrawler(domains=[base], state_path=Path(tempfile.mkdtemp()) / 'discovery_state.json')
+        tracemalloc.start()
+        found = crawler.discover()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    finally:
+        server.stop()
+    assert not found, f"oversized or non-XML sitemaps returned {len(found)} URLs"
+    assert peak < 8 * max_bytes, f"discovery held {peak / 1e6:.0f} MB for sitemaps capped at {max_bytes / 1e6:.0f} MB"
+    return len(sitemaps), peak
+
+def main():
+    num_hosts = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    sitemaps_per_host = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    urls_per_sitemap = int(sys.argv[3]) if len(sys.argv) > 3 else 500
+    latency = float(sys.argv[4]) if len(sys.argv) > 4 else 0.05
+    cap = int(sys.argv[5]) if len(sys.argv) > 5 else 500
+
+    config.PER_DOMAIN_RATE = 50
+    max_bytes = config.DISCOVERY_MAX_BYTES
+    rejected, peak = check_oversized_listings()
+    config.DISCOVERY_MAX_BYTES = max_bytes
+    servers = [StandInServer(latency=latency).start() for _ in range(num_hosts)]
+    try:
+        sites = [StandInSite(server, sitemaps_per_host, urls_per_sitemap) for server in servers]
+        domains = [server.base_url for server in servers]
+        state_path = Path(tempfile.mkdtemp()) / 'discovery_state.json'
+
+        def discover(path=state_path, max_urls=10 ** 6):
+            crawler = DiscoveryCrawler(domains=domains, state_path=path, max_sitemaps=sitemaps_per_host + 1,
+                                       max_urls_per_domain=max_urls)
+            requests_before = sum(server.request_count for server in servers)
+            start = time.perf_counter()
+            found = crawler.discover()
+            crawler.save()
+            assert len(found) == len({entry['url'] for entry in found})
+            return ({entry['url'] for entry in found}, time.perf_counter() - start,
+                    sum(server.request_count for server in servers) - requests_before)
+
+        rows = []
+        expected = set().union(*(site.expected for site in sites))
+        all_expected = set(expected)
+        found, seconds, requests_made = discover()
+        assert found == expected, f"first crawl: {len(found)} URLs found, {len(expected)} expected"
+        rows.append(('First crawl', len(found), seconds, requests_made))
+
+        found, seconds, requests_made = discover()
+        assert not found, f"unchanged rerun returned {len(found)} URLs"
+        rows.append(('Unchanged rerun', len(found), seconds, requests_made))
+
+        for site in sites:
+            site.expected = set()
+            site.publish_sitemap(datetime.now(timezone.utc))
+            site.publish_feeds(datetime.now(timezone.utc))
+        expected = set().union(*(site.expected for site in sites))
+        all_expected |= expected
+        found, seconds, requests_made = discover()
+        assert found == expected, f"incremental rerun: {len(found)} URLs found, {len(expected)} expected"
+        rows.append(('After publishing', len(found), seconds, requests_made))
+
+        # A fresh crawl with a per-domain cap: each run returns the oldest entries left,
+        # until every article has been returned once
+        capped_path = Path(tempfile.mkdtemp()) / 'discovery_state.json'
+        returned = set()
+        capped_runs = 0
+        while True:
+            capped, seconds, requests_made = discover(capped_path, cap)
+            if not capped:
+                break
+            assert not capped & returned, "a capped run returned an article again"
+            # Each stand-in sitemap dates all its entries alike, so ties add up to one sitemap
+            assert len(capped) <= (cap + urls_per_sitemap) * num_hosts, "a capped run exceeded the cap"
+            returned |= capped
+            capped_runs += 1
+        assert returned == all_expected, f"capped runs found {len(returned)} URLs, {len(all_expected)} expected"
+        rows.append((f'Capped at {cap}', len(returned), capped_runs, None))
+
+        # Discovered URLs feed straight into the content scraper
+        scraper = EnhancedContentScraper(use_cache=False, use_memo=False, use_frontier=False, use_url_index=False)
+        documents = scraper.scrape_multiple_urls(sorted(found))
+        scraper.close()
+    finally:
+        for server in servers:
+            server.stop()
+
+    print(f"\n{num_hosts} sites, {sitemaps_per_host} sitemaps x {urls_per_sitemap} URLs each, {latency}s latency")
+    print(f"{'Run':<18} {'New URLs':>9} {'Seconds':>9} {'Requests':>9}")
+    for run, count, seconds, requests_made in rows[:-1]:
+        print(f"{run:<18} {count:>9} {seconds:>9.2f} {requests_made:>9}")
+    run, count, capped_runs, _ = rows[-1]
+    print(f"{run:<18} {count:>9} URLs over {capped_runs} runs, each returned once")
+    print(f"Gzip bomb, oversized and non-XML sitemaps ({rejected}) rejected, peak memory {peak / 1e6:.1f} MB ✓")
+    print(f"Scraped {len(documents)}/{len(found)} newly discovered articles; all runs found exactly the expected URLs ✓")
+
+if __name__ == "__main__":
+    main()
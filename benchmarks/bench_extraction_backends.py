@@ -0,0 +1,110 @@
+"""
+Benchmark: article extraction backends over a saved corpus of HTML pages
+Each backend runs in a fresh process so its peak memory can be measured, then the
+extracted documents go through EnhancedStatementExtractor to compare statement yield
+
+Usage: python -m benchmarks.bench_extraction_backends [source] [num_pages]
+       source: 'generated' (default), 'cache' (pages in the HTTP response cache)
+               or a directory of saved .html files
+"""
+import contextlib
+import io
+import multiprocessing
+import resource
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from processing.text_cleaning import clean_document_texts
+from scraping.extraction_backends import BACKENDS
+from scraping.http_cache import ResponseCache
+from benchmarks.standin_server import news_page_html, article_html
+
+def load_corpus(source, num_pages):
+    """(url, html) pairs from the chosen source"""
+    if source == 'cache':
+        cache = ResponseCache()
+        corpus = []
+        for entry in cache.iter_entries():
+            if len(corpus) >= num_pages:
+                break
+            corpus.append((entry['url'], cache.read_body(entry)))
+        cache.close()
+        return corpus
+    if source != 'generated':
+        paths = sorted(Path(source).glob('*.html'))[:num_pages]
+        return [(f"https://example.com/{p.stem}", p.read_text(encoding='utf-8', errors='replace')) for p in paths]
+    return [(f"https://example.com/page/{i}", news_page_html(i) if i % 4 else article_html(i))
+            for i in range(num_pages)]
+
+def run_backend(name, corpus):
+    """
+    Child process: extract every page with one backend
+    Returns (documents, seconds, peak RSS growth in MB)
+    """
+    from scraping.enhanced_content_scraper import EnhancedContentScraper
+    scraper = EnhancedContentScraper(use_cache=False, extractor=name, use_memo=False, use_frontier=False,
+                                     use_url_index=False)
+
+    # Warm up lazy imports and model loading before measuring
+    with contextlib.redirect_stdout(io.StringIO()):
+        scraper.parse_html(*corpus[0], clean=False)
+    baseline_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        documents = [scraper.parse_html(url, html, clean=False) for url, html in corpus]
+    elapsed = time.perf_counter() - start
+
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return [doc for doc in documents if doc], elapsed, (peak_kb - baseline_kb) / 1024
+
+def main():
+    source = sys.argv[1] if len(sys.argv) > 1 else 'generated'
+    num_pages = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    corpus = load_corpus(source, num_pages)
+    if not corpus:
+        print(f"No pages found in '{source}'")
+        return
+    print(f"Corpus: {len(corpus)} pages from '{source}', {sum(len(h) for _, h in corpus)/1e6:.1f} MB of HTML\n")
+
+    from processing.enhanced_statement_extractor import EnhancedStatementExtractor
+    extractor = EnhancedStatementExtractor()
+
+    results = {}
+    context = multiprocessing.get_context('spawn')
+    for name in BACKENDS:
+        try:
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                documents, elapsed, memory_mb = pool.submit(run_backend, name, corpus).result()
+        except ImportError as e:
+            print(f"  ⚠️  Skipping {name}: {e}")
+            continue
+
+        for doc, text in zip(documents, clean_document_texts(doc['text'] for doc in documents)):
+            doc['text'] = text
+        statements, stats = extractor.extract_from_multiple_documents(documents, verbose=False)
+        results[name] = {
+            'documents': len(documents),
+            'docs_per_sec': len(corpus) / max(elapsed, 1e-9),
+            'memory_mb': memory_mb,
+            'statements': len(statements),
+            'opinions': statements.opinion_count()
+        }
+
+    best_yield = max((r['statements'] for r in results.values()), default=0)
+    print(f"{'Backend':<12} {'Docs':>6} {'Docs/sec':>10} {'Peak +MB':>9} {'Statements':>11} {'Opinions':>9} {'Yield':>7}")
+    for name, r in results.items():
+        share = r['statements'] / best_yield * 100 if best_yield else 0
+        print(f"{name:<12} {r['documents']:>6} {r['docs_per_sec']:>10.1f} {r['memory_mb']:>9.1f} "
+              f"{r['statements']:>11} {r['opinions']:>9} {share:>6.1f}%")
+
+    # Fastest backend that keeps at least 99% of the best statement yield
+    keeps_yield = [name for name, r in results.items() if r['statements'] >= 0.99 * best_yield]
+    if keeps_yield:
+        pick = max(keeps_yield, key=lambda name: results[name]['docs_per_sec'])
+        print(f"\n✓ Fastest backend without losing statements: {pick} (set config.ARTICLE_EXTRACTOR = \"{pick}\")")
+
+if __name__ == "__main__":
+    main()
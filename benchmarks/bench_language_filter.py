@@ -0,0 +1,98 @@
+"""
+Benchmark: language prefilter on cleaned scraper output
+Articles mixing English, Hindi (Devanagari) and Hinglish paragraphs go through the
+content scraper's extraction and cleaning, which join paragraphs onto one line, then
+through LanguagePrefilter. The original paragraph split sees one paragraph per article
+and keeps or drops it whole; every English sentence must be kept and every Hindi and
+Hinglish one skipped
+
+Usage: python -m benchmarks.bench_language_filter [num_articles] [paragraphs]
+"""
+import contextlib
+import io
+import random
+import re
+import sys
+import time
+
+import config
+from processing.language_filter import LanguagePrefilter
+from processing.text_cleaning import clean_document_text
+from scraping.enhanced_content_scraper import EnhancedContentScraper
+
+ENGLISH = [
+    "MSP for wheat should be increased to support farmers in Punjab.",
+    "The government announced a hike of 150 rupees per quintal for paddy this kharif season.",
+    "Farm unions said the procurement centres in the district were closed for a week.",
+    "Monsoon rainfall was 8 percent below normal, hurting the sowing of pulses.",
+]
+HINDI = [
+    "किसानों को फसल का उचित मूल्य मिलना चाहिए।",
+    "सरकार ने धान की खरीद के लिए नए केंद्र खोलने की घोषणा की है।",
+    "मानसून की कमी से दालों की बुवाई पर असर पड़ा है।",
+]
+HINGLISH = [
+    "Bhai MSP toh kabhi nahi milta, sab kuch sirf kaagaz pe hai aur kisan pareshan hai.",
+    "Yeh sarkar kuch nahi karti, mandi mein bhi koi kharidne wala nahi hai abhi tak.",
+]
+
+def make_articles(count, paragraphs, seed=42):
+    """(url, html, English sentences) per article, with Hindi and Hinglish paragraphs mixed in"""
+    rng = random.Random(seed)
+    articles = []
+    for i in range(count):
+        english = []
+        body = []
+        for _ in range(paragraphs):
+            kind = rng.random()
+            if kind < 0.6:
+                sentences = rng.sample(ENGLISH, 2)
+                english.extend(sentences)
+            else:
+                sentences = rng.sample(HINDI if kind < 0.8 else HINGLISH, 1)
+            body.append(f"<p>{' '.join(sentences)}</p>")
+        html = (f"<html><head><title>Kisan report {i}</title></head>"
+                f"<body><article>{''.join(body)}</article></body></html>")
+        articles.append((f"https://example.com/news/{i}", html, english))
+    return articles
+
+def reference_filter_text(prefilter, text):
+    """Original LanguagePrefilter.filter_text: one check per newline-separated paragraph"""
+    paragraphs = [p for p in re.split(r'\n+', text) if p.strip()]
+    latin_ratios, _ = prefilter.script_ratios(paragraphs)
+    return '\n'.join(paragraph for paragraph, latin in zip(paragraphs, latin_ratios)
+                     if latin >= config.MIN_LATIN_SCRIPT_RATIO and not prefilter.looks_hinglish(paragraph))
+
+def main():
+    num_articles = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    paragraphs = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+
+    articles = make_articles(num_articles, paragraphs)
+    scraper = EnhancedContentScraper(use_cache=False, use_memo=False, use_frontier=False, use_url_index=False)
+    with contextlib.redirect_stdout(io.StringIO()):
+        texts = [scraper.parse_html(url, html)['text'] for url, html, _ in articles]
+    assert not any('\n' in text for text in texts), "cleaned scraper output is expected on one line"
+
+    prefilter = LanguagePrefilter(action='drop', use_language_id=True)
+    start = time.perf_counter()
+    reference = [reference_filter_text(prefilter, text) for text in texts]
+    reference_time = time.perf_counter() - start
+    start = time.perf_counter()
+    filtered = [prefilter.filter_text(text) for text in texts]
+    filter_time = time.perf_counter() - start
+
+    leaked = 0
+    for (_, _, english), text, reference_text in zip(articles, filtered, reference):
+        expected = clean_document_text(' '.join(english))
+        assert text == expected, f"filtered text differs:\n{text}\n{expected}"
+        leaked += reference_text != expected
+
+    chars = sum(len(text) for text in texts)
+    print(f"{num_articles} articles, {paragraphs} paragraphs each, {chars / 1e6:.1f}M chars after cleaning")
+    print(f"  Paragraph split: {reference_time:.2f}s, {leaked}/{num_articles} articles filtered wrongly")
+    print(f"  Sentence split:  {filter_time:.2f}s ({chars / filter_time / 1e6:.1f}M chars/s)")
+    print(f"  Skipped {prefilter.stats['paragraphs_skipped']} Hindi/Hinglish sentences, "
+          f"every English sentence kept ✓")
+
+if __name__ == "__main__":
+    main()
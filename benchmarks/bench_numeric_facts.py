@@ -0,0 +1,90 @@
+"""
+Benchmark: numeric fact extraction and the candidate join
+Checks fact extraction on fixed statements (compound scales such as "lakh crore"
+included), that the index loads without config when given its thresholds, then times
+indexing synthetic statements and compares the bucketed join with an all-pairs join
+of every (key, unit, year) group: each candidate must be a real value conflict
+
+Usage: python -m benchmarks.bench_numeric_facts [num_statements]
+"""
+import random
+import subprocess
+import sys
+import time
+
+from processing.numeric_facts import NumericFactIndex
+
+CASES = [
+    ("The MSP for wheat was raised to ₹2,275 per quintal for 2023-24.",
+     [('wheat', 'inr_per_quintal', 2275.0, 2023)]),
+    ("PM-KISAN has transferred over ₹2.8 lakh crore to farmers.", [('pm_kisan', 'inr', 2.8e12, None)]),
+    ("The loan waiver announced in 2017 cost Rs 36 thousand crore.", [('loan_waiver', 'inr', 3.6e11, 2017)]),
+    ("Spending on fertiliser stood at 1.75 lakh crore rupees in 2023.", [('fertilizer', 'inr', 1.75e12, 2023)]),
+    ("Paddy procurement crossed 52 lakh tonnes this season.", [('rice', 'tonnes', 5.2e6, None)]),
+    ("Wheat output is estimated at 112 million tonnes, up 2.5 percent.",
+     [('wheat', 'tonnes', 1.12e8, None), ('wheat', 'percent', 2.5, None)]),
+]
+
+def make_statements(count, seed=42):
+    """Synthetic statements quoting a few values per crop/scheme and year"""
+    rng = random.Random(seed)
+    templates = [
+        ("The MSP for {crop} is ₹{value:,} per quintal for {year}.", lambda: rng.choice([2015, 2125, 2183, 2275])),
+        ("{crop} procurement reached {value} lakh tonnes in {year}.", lambda: rng.choice([41, 52, 60.5])),
+        ("PM-KISAN paid ₹{value} lakh crore to farmers by {year}.", lambda: rng.choice([2, 2.24, 2.8, 3])),
+        ("{crop} exports fell {value}% in {year}.", lambda: rng.choice([4, 7.5, 12])),
+    ]
+    crops = ['wheat', 'paddy', 'mustard', 'cotton', 'maize', 'onion']
+    statements = []
+    for _ in range(count):
+        template, value = rng.choice(templates)
+        statements.append(template.format(crop=rng.choice(crops), value=value(), year=rng.randint(2015, 2024)))
+    return statements
+
+def all_pairs_conflicts(index):
+    """Every statement pair of a (key, unit, year) group whose values differ"""
+    conflicts = set()
+    for facts in index.groups.values():
+        for i, (value_a, a) in enumerate(facts):
+            for value_b, b in facts[i + 1:]:
+                if a != b and not index._same_value(value_a, value_b):
+                    conflicts.add((min(a, b), max(a, b)))
+    return conflicts
+
+def main():
+    num_statements = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+
+    index = NumericFactIndex(value_tolerance=0.01, fanout=3, max_per_group=50)
+    for text, expected in CASES:
+        facts = index.extract_facts(text)
+        assert facts == expected, f"{text}\n  extracted {facts}\n  expected  {expected}"
+
+    # The standalone GPU script passes every threshold and must not load config
+    probe = ("import sys; from processing.numeric_facts import NumericFactIndex; "
+             "NumericFactIndex(0.01, 3, 50); sys.exit('config' in sys.modules)")
+    assert subprocess.run([sys.executable, '-c', probe]).returncode == 0, "numeric_facts imported config"
+
+    statements = make_statements(num_statements)
+    start = time.perf_counter()
+    for i, text in enumerate(statements):
+        index.add(i, text)
+    index_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    candidates = index.candidate_pairs()
+    join_time = time.perf_counter() - start
+    start = time.perf_counter()
+    conflicts = all_pairs_conflicts(index)
+    all_pairs_time = time.perf_counter() - start
+    assert all((a, b) in conflicts for a, b, _ in candidates), "a candidate pair does not conflict"
+
+    print(f"{len(CASES)} fixed statements extracted as expected (compound scales included) ✓")
+    print("Index loads without config when given its thresholds ✓")
+    print(f"{num_statements} statements, {index.fact_count} facts in {len(index.groups)} groups")
+    print(f"  Extraction:     {index_time:.2f}s ({num_statements / index_time:,.0f} statements/s)")
+    print(f"  Bucketed join:  {join_time:.3f}s, {len(candidates)} candidate pairs")
+    print(f"  All-pairs join: {all_pairs_time:.3f}s, {len(conflicts)} conflicting pairs")
+    print("  Every candidate is a real value conflict ✓")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+"""
+Benchmark: Reddit collection with one worker vs the bounded worker pool, against the
+replay harness' stand-in Reddit API (subreddit search, comment trees with "load more"
+stubs past the requested limit), then incremental runs: a rerun with nothing new, and
+one after new posts and comments are published, which must return exactly those. A
+backlog larger than the per-search limit must arrive over two runs, a search that fails
+mid-listing must keep its partial results and the next run return only the rest, and a
+thread whose fetch fails must be read again by the next run
+
+Usage: python -m benchmarks.bench_reddit [num_queries] [posts_per_query] [comments_per_post] [latency]
+"""
+import contextlib
+import io
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import config
+from benchmarks.replay import ReplayCorpus, ReplayServer
+
+def main():
+    num_queries = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    posts_per_query = int(sys.argv[2]) if len(sys.argv) > 2 else 12
+    comments_per_post = int(sys.argv[3]) if len(sys.argv) > 3 else 300
+    latency = float(sys.argv[4]) if len(sys.argv) > 4 else 0.1
+
+    corpus = ReplayCorpus.generate(num_pages=10, num_queries=num_queries, posts_per_query=posts_per_query,
+                                   comments_per_post=comments_per_post)
+    from scraping.reddit_scraper import RedditScraper
+
+    rows = []
+    with ReplayServer(corpus, hosts=1, latency=latency) as replay:
+        for key, value in replay.endpoints().items():
+            setattr(config, key, value)
+        config.REDDIT_REQUEST_RATE = 50  # Above what the workers reach, so latency is measured
+
+        for workers in (1, config.REDDIT_WORKERS):
+            scraper = RedditScraper(client_id='replay', client_secret='replay', use_url_index=False,
+                                    workers=workers, use_state=False)
+            requests_before = replay.request_count
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                items = scraper.scrape_agriculture_content(corpus.queries, max_posts_per_query=30)
+            rows.append((workers, items, time.perf_counter() - start, replay.request_count - requests_before))
+
+        # All workers' clients share one request budget: a tight one sets the pace
+        config.REDDIT_REQUEST_RATE = 10
+        scraper = RedditScraper(client_id='replay', client_secret='replay', use_url_index=False, use_state=False)
+        requests_before = replay.request_count
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            scraper.scrape_agriculture_content(corpus.queries, max_posts_per_query=30)
+        paced = (time.perf_counter() - start, replay.request_count - requests_before)
+        assert paced[0] >= (paced[1] - scraper.workers) / 10, "workers exceeded the shared request budget"
+        config.REDDIT_REQUEST_RATE = 50
+
+        # Incremental runs share one state database
+        config.REDDIT_STATE_PATH = str(Path(tempfile.mkdtemp()) / 'reddit.db')
+
+        class FlakyScraper(RedditScraper):
+            """Comment fetches of the threads in `failing` fail once; listings reaching `failing_posts` fail"""
+            failing = set()
+            failing_posts = set()
+
+            def post_data(self, submission, subreddit_name):
+                if submission.id in self.failing_posts:
+                    raise ConnectionError("listing cut short")
+                return super().post_data(submission, subreddit_name)
+
+            def get_post_comments(self, post_url, limit=100):
+                if post_url in self.failing:
+                    self.failing.discard(post_url)
+                    return None
+                return super().get_post_comments(post_url, limit)
+
+        def collect():
+            scraper = FlakyScraper(client_id='replay', client_secret='replay', use_url_index=False)
+            requests_before = replay.request_count
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                items = scraper.scrape_agriculture_content(corpus.queries, max_posts_per_query=30)
+            return items, time.perf_counter() - start, replay.request_count - requests_before
+
+        incremental = [('First run', *collect())]
+        incremental.append(('Nothing new', *collect()))
+        assert not incremental[-1][1], "a rerun with nothing new returned items"
+
+        # Publish a post per query and new top-level comments on three threads read before
+        expected = set()
+        newest = max(post['created_utc'] for post in corpus.reddit_posts)
+        for i, query in enumerate(corpus.queries):
+            post_id = f"new{i}"
+            permalink = f"/r/farming/comments/{post_id}/{query.replace(' ', '_')[:40]}/"
+            comments = [{'id': f"c{post_id}x{j}", 'body': f"Reply {j} on the new {query} thread, with detail",
+                         'author': 'user1', 'created_utc': newest + 10, 'score': 1} for j in range(10)]
+            replay.add_reddit_post({
+                'id': post_id, 'name': f"t3_{post_id}", 'title': f"{query.capitalize()}?", 'selftext': '',
+                'subreddit': 'farming', 'permalink': permalink, 'author': 'user1',
+                'created_utc': newest + i + 1, 'score': 1, 'num_comments': 0
+            }, comments)
+            expected.add(f"https://reddit.com{permalink}")
+            expected.update(f"https://reddit.com{permalink}{c['id']}" for c in comments)
+        threads = list(dict.fromkeys(item['parent_post'] for item in incremental[0][1] if item['type'] == 'comment'))
+        for thread in threads[:3]:
+            thread_id = thread.rstrip('/').split('/')[6]
+            comments = [{'id': f"c{thread_id}x{j}", 'body': f"A later comment number {j} on this thread",
+                         'author': 'user2', 'created_utc': newest + 20, 'score': 1} for j in range(5)]
+            replay.add_reddit_comments(thread_id, comments)
+            expected.update(thread + c['id'] for c in comments)
+
+        incremental.append(('After publishing', *collect()))
+        assert {item['url'] for item in incremental[-1][1]} == expected, "incremental run missed or repeated items"
+
+        # More new posts than max_posts_per_query: the rest must come with the next run
+        expected = set()
+        for j in range(45):
+            post_id = f"back{j}"
+            permalink = f"/r/farming/comments/{post_id}/{corpus.queries[0].replace(' ', '_')[:40]}/"
+            replay.add_reddit_post({
+                'id': post_id, 'name': f"t3_{post_id}", 'title': f"{corpus.queries[0].capitalize()}?",
+                'selftext': '', 'subreddit': 'farming', 'permalink': permalink, 'author': 'user1',
+                'created_utc': newest + 100 + j, 'score': 1, 'num_comments': 0
+            }, [])
+            expected.add(f"https://reddit.com{permalink}")
+        incremental.append(('Backlog, first run', *collect()))
+        incremental.append(('Backlog, next run', *collect()))
+        first, rest = ({item['url'] for item in run[1]} for run in incremental[-2:])
+        assert len(first) == 30 and first | rest == expected and not first & rest, "backlog posts lost or repeated"
+
+        # A search cut short keeps what it listed; the next run returns only the rest
+        expected = set()
+        for j in range(10):
+            post_id = f"cut{j}"
+            permalink = f"/r/farming/comments/{post_id}/{corpus.queries[0].replace(' ', '_')[:40]}/"
+            replay.add_reddit_post({
+                'id': post_id, 'name': f"t3_{post_id}", 'title': f"{corpus.queries[0].capitalize()}?",
+                'selftext': '', 'subreddit': 'farming', 'permalink': permalink, 'author': 'user1',
+                'created_utc': newest + 300 + j, 'score': 1, 'num_comments': 0
+            }, [])
+            expected.add(f"https://reddit.com{permalink}")
+        FlakyScraper.failing_posts.add('cut5')  # Newest first: fails after cut9..cut6
+        incremental.append(('Listing cut short', *collect()))
+        FlakyScraper.failing_posts.clear()
+        incremental.append(('After the cut', *collect()))
+        first, rest = ({item['url'] for item in run[1]} for run in incremental[-2:])
+        assert len(first) == 4 and first | rest == expected and not first & rest, "partial listing lost or repeated"
+        incremental.append(('Nothing new', *collect()))
+        assert not incremental[-1][1], "a rerun after a partial listing returned items"
+
+        # A thread whose comment fetch fails is not cached as read
+        thread = threads[3]
+        thread_id = thread.rstrip('/').split('/')[6]
+        comments = [{'id': f"c{thread_id}y{j}", 'body': f"Another comment number {j} on this thread",
+                     'author': 'user2', 'created_utc': newest + 200, 'score': 1} for j in range(5)]
+        replay.add_reddit_comments(thread_id, comments)
+        FlakyScraper.failing.add(thread)
+        incremental.append(('Fetch failed', *collect()))
+        assert not incremental[-1][1], "a failed thread fetch returned items"
+        incremental.append(('After the failure', *collect()))
+        assert {item['url'] for item in incremental[-1][1]} == {thread + c['id'] for c in comments}, \
+            "a thread whose fetch failed was not read again"
+
+    assert rows[0][1] == rows[-1][1], "results differ between worker counts"
+    print(f"{num_queries} queries x 6 subreddits, {posts_per_query} posts/query, "
+          f"{comments_per_post} comments/post (up to {config.REDDIT_MAX_COMMENTS} read), {latency}s latency")
+    print(f"{'Workers':>8} {'Items':>7} {'Requests':>9} {'Seconds':>9} {'Items/sec':>10}")
+    for workers, items, seconds, requests_made in rows:
+        print(f"{workers:>8} {len(items):>7} {requests_made:>9} {seconds:>9.2f} {len(items) / seconds:>10.1f}")
+    print(f"Speed-up: {rows[0][2] / rows[-1][2]:.1f}x, identical items ✓")
+    print(f"Shared budget of 10 req/s: {paced[1]} requests in {paced[0]:.2f}s "
+          f"({paced[1] / paced[0]:.1f} req/s) across {config.REDDIT_WORKERS} workers ✓")
+
+    print(f"\nIncremental ({config.REDDIT_WORKERS} workers):")
+    print(f"{'Run':<18} {'Items':>7} {'Requests':>9} {'Seconds':>9}")
+    for run, items, seconds, requests_made in incremental:
+        print(f"{run:<18} {len(items):>7} {requests_made:>9} {seconds:>9.2f}")
+    print("Reruns returned exactly the newly published posts and comments, "
+          "backlogs, partial listings and failed threads included ✓")
+
+if __name__ == "__main__":
+    main()
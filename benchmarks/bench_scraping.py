@@ -0,0 +1,197 @@
+"""
+Benchmark: scraping stages (SERP, content, Reddit) against the offline replay harness
+The corpus is served from local stand-in hosts; each stage runs in a fresh process
+against it, so throughput and peak memory are measured without any network access.
+Also checks that a throughput 429 from SerpAPI fails only its query, while one for a
+used-up quota stops further API searches
+
+Usage: python -m benchmarks.bench_scraping [source] [num_pages] [latency] [error_rate] [page_kb] [api_quota]
+       source: 'generated' (default), 'run' (pages, search results and Reddit items
+               recorded by the last pipeline run) or a corpus directory (ReplayCorpus.save)
+       api_quota: SerpAPI searches the replay answers per stage before refusing (default unlimited)
+"""
+import contextlib
+import io
+import multiprocessing
+import resource
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import requests
+from benchmarks.replay import ReplayCorpus, ReplayServer
+
+NUM_HOSTS = 8
+# Politeness for the replay hosts: high enough that the fetch layer, not the rate limit, is measured
+REPLAY_CONFIG = {
+    'SCRAPE_DELAY': 0,
+    'PER_DOMAIN_RATE': 20,
+    'PER_DOMAIN_BURST': 4,
+    'SERP_BATCH_PAUSE': 0,
+    'SERP_API_RATE': 50,
+    'SERP_SCRAPE_RATE': 50,
+    'REDDIT_REQUEST_RATE': 50
+}
+
+def _configure(overrides):
+    import config
+    for key, value in overrides.items():
+        setattr(config, key, value)
+
+def _measure(stage):
+    """Run stage() quietly; returns (result, seconds, peak RSS growth in MB)"""
+    baseline_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = stage()
+    elapsed = time.perf_counter() - start
+    return result, elapsed, (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - baseline_kb) / 1024
+
+def run_serp(overrides, queries, use_api):
+    """Child process: search every query through SerpAPI or the Google scraping fallback"""
+    _configure(overrides)
+    from scraping.enhanced_serp_scraper import EnhancedSERPScraper
+    scraper = EnhancedSERPScraper(api_key='replay' if use_api else '', use_cache=False)
+    return _measure(lambda: scraper.scrape_all_queries(queries, num_results=10, filter_domains=False))
+
+def run_scheduler(overrides, queries):
+    """Child process: search every query through the concurrent SERP scheduler"""
+    _configure(overrides)
+    from scraping.enhanced_serp_scraper import EnhancedSERPScraper
+    from scraping.serp_scheduler import SerpScheduler
+    scheduler = SerpScheduler(EnhancedSERPScraper(api_key='replay', use_cache=False))
+    results, elapsed, memory_mb = _measure(lambda: scheduler.run(queries, num_results=10, filter_domains=False))
+    return results, elapsed, memory_mb, scheduler.stats
+
+def run_api_refusals(overrides, queries):
+    """Child process: search queries one by one through SerpAPI; (got results, api_exhausted) per query"""
+    _configure(overrides)
+    import config
+    config.RETRY_BASE_DELAY = 0.01
+    from scraping.enhanced_serp_scraper import EnhancedSERPScraper
+    scraper = EnhancedSERPScraper(api_key='replay', use_cache=False)
+    outcomes = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for query in queries:
+            outcomes.append((bool(scraper.search_with_api(query)), scraper.api_exhausted))
+    return outcomes
+
+def run_streamed(overrides, queries):
+    """Child process: scheduler search with content fetching starting as results arrive"""
+    _configure(overrides)
+    from scraping.enhanced_serp_scraper import EnhancedSERPScraper
+    from scraping.enhanced_content_scraper import EnhancedContentScraper
+    from scraping.serp_scheduler import SerpScheduler
+    scheduler = SerpScheduler(EnhancedSERPScraper(api_key='replay', use_cache=False))
+    scraper = EnhancedContentScraper(use_cache=False, use_memo=False, use_frontier=False, use_url_index=False)
+    measured = _measure(lambda: scraper.scrape_url_stream(
+        scheduler.stream(queries, num_results=10, filter_domains=False), key=lambda r: r['url']
+    ))
+    scraper.close()
+    return measured
+
+def run_content(overrides, urls):
+    """
+    Child process: scrape every URL, then time parsing alone over the same pages
+    Returns (documents, seconds, MB, parse seconds, HTML MB parsed)
+    """
+    _configure(overrides)
+    from scraping.enhanced_content_scraper import EnhancedContentScraper
+    scraper = EnhancedContentScraper(use_cache=False, use_memo=False, use_frontier=False, use_url_index=False)
+    documents, elapsed, memory_mb = _measure(lambda: scraper.scrape_multiple_urls(urls))
+    scraper.close()
+
+    pages = []
+    for url in urls:
+        response = requests.get(url, timeout=30)
+        if response.ok:
+            pages.append((url, response.text))
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for url, html in pages:
+            scraper.parse_html(url, html, clean=False)
+    parse_time = time.perf_counter() - start
+    return documents, elapsed, memory_mb, parse_time, sum(len(html) for _, html in pages) / 1e6, len(pages)
+
+def run_reddit(overrides, queries, max_posts):
+    """Child process: collect posts and comments for every query"""
+    _configure(overrides)
+    from scraping.reddit_scraper import RedditScraper
+    scraper = RedditScraper(client_id='replay', client_secret='replay', use_url_index=False, use_state=False)
+    return _measure(lambda: scraper.scrape_agriculture_content(queries, max_posts_per_query=max_posts))
+
+def load_corpus(source, num_pages):
+    if source == 'generated':
+        return ReplayCorpus.generate(num_pages=num_pages)
+    if source == 'run':
+        return ReplayCorpus.from_run()
+    return ReplayCorpus.load(source)
+
+def main():
+    source = sys.argv[1] if len(sys.argv) > 1 else 'generated'
+    num_pages = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    latency = float(sys.argv[3]) if len(sys.argv) > 3 else 0.05
+    error_rate = float(sys.argv[4]) if len(sys.argv) > 4 else 0.0
+    page_kb = int(sys.argv[5]) if len(sys.argv) > 5 else 0
+    api_quota = int(sys.argv[6]) if len(sys.argv) > 6 else None
+
+    corpus = load_corpus(source, num_pages)
+    if not corpus.pages:
+        print(f"No pages in the '{source}' corpus")
+        return
+    queries = corpus.queries or [f"agriculture query {i}" for i in range(10)]
+    print(f"Corpus '{source}': {len(corpus.pages)} pages, {len(queries)} queries, "
+          f"{len(corpus.reddit_posts)} Reddit posts")
+    print(f"Replay: {NUM_HOSTS} hosts, {latency}s latency, {error_rate:.0%} errors"
+          + (f", pages padded to {page_kb} KB" if page_kb else "") + "\n")
+
+    rows = []
+    context = multiprocessing.get_context('spawn')
+    with ReplayServer(corpus, hosts=NUM_HOSTS, latency=latency, error_rate=error_rate,
+                      page_bytes=page_kb * 1024 or None, api_quota=api_quota) as replay:
+        overrides = {**REPLAY_CONFIG, **replay.endpoints()}
+
+        def in_child(function, *args):
+            replay.api_searches = 0  # Every stage starts with the full quota
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                return pool.submit(function, overrides, *args).result()
+
+        results, seconds, memory_mb = in_child(run_serp, queries, True)
+        rows.append(('SERP (API)', len(queries), 'queries', seconds, memory_mb))
+        urls = [r['url'] for r in results]
+        _, seconds, memory_mb = in_child(run_serp, queries, False)
+        rows.append(('SERP (scraping)', len(queries), 'queries', seconds, memory_mb))
+        _, seconds, memory_mb, scheduled = in_child(run_scheduler, queries)
+        rows.append(('SERP (scheduler)', len(queries), 'queries', seconds, memory_mb))
+
+        documents, seconds, memory_mb, parse_time, parsed_mb, parsed = in_child(run_content, urls)
+        rows.append(('Content', len(urls), 'URLs', seconds, memory_mb))
+        streamed, seconds, memory_mb = in_child(run_streamed, queries)
+        rows.append(('SERP+Content', len(queries), 'queries, streamed', seconds, memory_mb))
+
+        if corpus.reddit_posts:
+            items, seconds, memory_mb = in_child(run_reddit, queries, 30)
+            rows.append(('Reddit', len(items), 'items', seconds, memory_mb))
+        request_count = replay.request_count
+
+        # Throughput 429s on every attempt of the first query (the first try and MAX_RETRIES retries)
+        replay.api_rate_limited = 3
+        outcomes = in_child(run_api_refusals, queries[:2])
+        assert outcomes == [(False, False), (True, False)], f"throughput 429: {outcomes}"
+        quota, replay.api_quota = replay.api_quota, 0
+        outcomes = in_child(run_api_refusals, queries[:2])
+        replay.api_quota = quota
+        assert outcomes == [(False, True), (False, True)], f"quota used up: {outcomes}"
+
+    print(f"{'Stage':<16} {'Items':>7} {'Seconds':>9} {'Items/sec':>10} {'Peak +MB':>9}")
+    for stage, count, unit, seconds, memory_mb in rows:
+        print(f"{stage:<16} {count:>7} {seconds:>9.2f} {count / max(seconds, 1e-9):>10.1f} {memory_mb:>9.1f}  ({unit})")
+    print(f"\nScheduler: {scheduled['api']} queries via API, {scheduled['scraping']} via scraping fallback")
+    print(f"Content: {len(documents)}/{len(urls)} documents extracted ({len(streamed)} when streamed)")
+    print(f"Parsing alone: {parse_time / max(parsed, 1) * 1000:.2f} ms/page, "
+          f"{parsed_mb / max(parse_time, 1e-9):.1f} MB/s of HTML")
+    print(f"Replay answered {request_count} requests")
+    print("SerpAPI throughput 429 fails one query, a used-up quota stops the API ✓")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Benchmark: content extraction with and without the per-domain strategy memo
+Generated sites each keep one page template, as real news sites do. Checks that the
+memo extracts the same documents while skipping the strategies that never match
+
+Usage: python -m benchmarks.bench_strategy_memo [num_domains] [pages_per_domain]
+"""
+import sys
+import time
+
+from lxml import etree
+
+from scraping.enhanced_content_scraper import EnhancedContentScraper, parse_tree, UNWANTED_TAGS
+from scraping.strategy_memo import DomainStrategyMemo
+from benchmarks.standin_server import news_page_html
+
+LAYOUTS = 4  # news_page_html picks its template from page_id % 4
+
+def make_corpus(num_domains, pages_per_domain):
+    """(url, cleaned lxml tree) pairs; domain d always uses template d % LAYOUTS"""
+    corpus = []
+    for d in range(num_domains):
+        for k in range(pages_per_domain):
+            tree = parse_tree(news_page_html(d % LAYOUTS + LAYOUTS * k))
+            etree.strip_elements(tree, *UNWANTED_TAGS, with_tail=False)
+            corpus.append((f"https://site{d}.example.com/news/{k}", tree))
+    return corpus
+
+def extract_all(scraper, corpus):
+    start = time.perf_counter()
+    results = [scraper.extract_article_content(tree, url) for url, tree in corpus]
+    return results, time.perf_counter() - start
+
+def main():
+    num_domains = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    pages_per_domain = int(sys.argv[2]) if len(sys.argv) > 2 else 25
+    corpus = make_corpus(num_domains, pages_per_domain)
+    print(f"Corpus: {len(corpus)} pages over {num_domains} domains\n")
+
+    scraper = EnhancedContentScraper(use_cache=False, use_memo=False, use_frontier=False,
+                                     use_url_index=False)
+    baseline, baseline_time = extract_all(scraper, corpus)
+
+    # Learn from the first page of every domain, then extract everything with the memo
+    scraper.strategy_memo = DomainStrategyMemo()
+    for (url, _), (content, strategy) in zip(corpus, baseline):
+        if content and strategy and url.endswith('/news/0'):
+            scraper.strategy_memo.record(url.split('/')[2], strategy)
+    memoized, memo_time = extract_all(scraper, corpus)
+
+    same = sum(a[0] == b[0] for a, b in zip(baseline, memoized))
+    print(f"  Full strategy chain: {len(corpus)/baseline_time:8.1f} pages/sec")
+    print(f"  With domain memo:    {len(corpus)/memo_time:8.1f} pages/sec ({baseline_time/memo_time:.1f}x)")
+    print(f"  Identical content: {same}/{len(corpus)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Micro-benchmark: per-string re.sub cleaning vs the shared batch cleaning pipeline
+Checks that both produce identical output before timing them
+
+Usage: python -m benchmarks.bench_text_cleaning [num_texts]
+"""
+import random
+import re
+import sys
+import time
+
+from processing.text_cleaning import clean_document_texts, clean_statement_texts
+
+def reference_clean_text(text):
+    """Original EnhancedContentScraper.clean_text"""
+    if not text:
+        return ""
+    text = re.sub(r'\s+', ' ', text)
+    text = re.sub(r'http\S+|www\.\S+', '', text)
+    text = re.sub(r'[^\w\s\.\,\!\?\;\:\-\'\"]', '', text)
+    return text.strip()
+
+def reference_clean_statement(text):
+    """Original EnhancedStatementExtractor.clean_statement"""
+    text = re.sub(r'\s+', ' ', text)
+    text = re.sub(r'http\S+|www\.\S+', '', text)
+    text = text.replace('\n', ' ').replace('\t', ' ')
+    text = text.strip(',.;:- ')
+    return text.strip()
+
+def make_corpus(count, min_words, max_words, seed=42):
+    """Synthetic scraped text: URLs, odd whitespace, symbols, Devanagari, edge punctuation"""
+    rng = random.Random(seed)
+    words = ['farmers', 'MSP', 'wheat', 'paddy', '₹2,275', 'quintal', 'subsidy', '(PM-KISAN)',
+             'mandi', '"reform"', 'crore', '15%', 'किसान', '—', 'www.pib.gov.in/release',
+             'https://thehindu.com/news?id=1', 'loan-waiver', '#farmers', '@PIB_India', '🌾',
+             'irrigation;', 'protest:', "farmers'", 'a', 'the', 'of', 'is']
+    separators = [' ', ' ', ' ', '  ', '\n', '\t', ' \n\n ', '\xa0']
+    corpus = []
+    for _ in range(count):
+        n = rng.randint(min_words, max_words)
+        parts = []
+        for _ in range(n):
+            parts.append(rng.choice(words))
+            parts.append(rng.choice(separators))
+        corpus.append(rng.choice(['', ' ', '- ', ', ']) + ''.join(parts) + rng.choice(['.', ' ', ';', '']))
+    corpus.append('')
+    return corpus
+
+def time_it(func, repeat=3):
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+def run(name, corpus, reference, batch):
+    ref_time, expected = time_it(lambda: [reference(t) for t in corpus])
+    batch_time, actual = time_it(lambda: batch(corpus))
+    assert actual == expected, f"{name}: batch output differs from reference"
+
+    total_chars = sum(len(t) for t in corpus)
+    print(f"\n{name} ({len(corpus):,} texts, {total_chars/1e6:.1f}M chars)")
+    print(f"  Per-string re.sub: {ref_time:.3f}s ({len(corpus)/ref_time:,.0f} texts/s)")
+    print(f"  Batch pipeline:    {batch_time:.3f}s ({len(corpus)/batch_time:,.0f} texts/s)")
+    print(f"  Speed-up: {ref_time/batch_time:.2f}x, output identical ✓")
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    run("Statements", make_corpus(count, 5, 40), reference_clean_statement, clean_statement_texts)
+    run("Documents", make_corpus(max(count // 50, 1), 300, 1500), reference_clean_text, clean_document_texts)
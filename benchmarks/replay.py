@@ -0,0 +1,412 @@
+"""
+Offline crawl replay harness
+A ReplayCorpus holds pages, SerpAPI results and Reddit posts and comments, either
+recorded by an earlier pipeline run or generated. A ReplayServer serves it from local
+stand-in hosts with configurable latency, error rate and page size, and its endpoints()
+point the SERP, content and Reddit scrapers at it, so whole scraping stages run with
+no network
+
+Corpus directory layout (ReplayCorpus.save / ReplayCorpus.load):
+  pages/index.json    {original url: file name}, pages/<n>.html
+  serpapi.json        {query: [{'link', 'title', 'snippet', 'position'}, ...]}
+  reddit.json         {'posts': [Reddit t3 data], 'comments': {post id: [t1 data]}}
+"""
+import csv
+import html
+import json
+import random
+import re
+import threading
+import zlib
+from datetime import datetime
+from pathlib import Path
+from urllib.parse import urlsplit, quote
+
+import config
+from benchmarks.standin_server import StandInServer, PARAGRAPHS, article_html, news_page_html
+
+SUBREDDITS = ['india', 'IndiaSpeaks', 'IndianAgriculture', 'agriculture', 'farming', 'IndianNews']
+NEWS_DOMAINS = ['thehindu.com', 'indianexpress.com', 'economictimes.indiatimes.com', 'downtoearth.org.in',
+                'business-standard.com', 'krishijagran.com', 'thewire.in', 'pib.gov.in']
+
+def _base36(number):
+    digits = '0123456789abcdefghijklmnopqrstuvwxyz'
+    text = ''
+    while True:
+        number, rest = divmod(number, 36)
+        text = digits[rest] + text
+        if not number:
+            return text
+
+def _timestamp(value):
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except (TypeError, ValueError):
+        return 0.0
+
+def pad_html(page, size):
+    """Grow a page to about `size` bytes with sidebar markup (boilerplate the parser must skip)"""
+    filler = ('<div class="related-card"><a href="/related"><img src="/img/r.jpg" alt="">'
+              '<span class="headline">More agriculture news from around the country</span></a></div>')
+    missing = size - len(page.encode('utf-8'))
+    if missing <= 0:
+        return page
+    sidebar = f'<aside class="sidebar">{filler * (missing // len(filler) + 1)}</aside>'
+    index = page.rfind('</body>')
+    return page[:index] + sidebar + page[index:] if index >= 0 else page + sidebar
+
+class ReplayCorpus:
+    def __init__(self, pages=None, serp=None, reddit_posts=None, reddit_comments=None):
+        self.pages = pages or {}  # original url -> html
+        self.serp = serp or {}  # query -> list of result dicts
+        self.reddit_posts = reddit_posts or []  # Reddit t3 data dicts
+        self.reddit_comments = reddit_comments or {}  # post id -> list of t1 data dicts
+
+    @property
+    def queries(self):
+        return list(self.serp)
+
+    @classmethod
+    def generate(cls, num_pages=200, num_queries=10, results_per_query=10, posts_per_query=12,
+                 comments_per_post=15, seed=0):
+        """A deterministic synthetic corpus of news pages, search results and Reddit threads"""
+        rng = random.Random(seed)
+        pages = {}
+        for i in range(num_pages):
+            domain = NEWS_DOMAINS[i % len(NEWS_DOMAINS)]
+            url = f"https://www.{domain}/news/agriculture/farm-story-{i}"
+            pages[url] = news_page_html(i) if i % 4 else article_html(i)
+
+        urls = list(pages)
+        queries = config.AGRICULTURE_QUERIES[:num_queries]
+        serp = {}
+        for query in queries:
+            serp[query] = [{
+                'link': url,
+                'title': f"Farm news {urls.index(url)} | Agriculture Daily",
+                'snippet': rng.choice(PARAGRAPHS),
+                'position': position
+            } for position, url in enumerate(rng.sample(urls, min(results_per_query, len(urls))), 1)]
+
+        posts, comments = [], {}
+        for query in queries:
+            for _ in range(posts_per_query):
+                post_id = _base36(rng.getrandbits(32))
+                subreddit = rng.choice(SUBREDDITS)
+                posts.append({
+                    'id': post_id,
+                    'name': f't3_{post_id}',
+                    'title': f"{query.capitalize()}?",
+                    'selftext': ' '.join(rng.choice(PARAGRAPHS) for _ in range(rng.randint(0, 4))),
+                    'subreddit': subreddit,
+                    'permalink': f"/r/{subreddit}/comments/{post_id}/{query.replace(' ', '_')[:40]}/",
+                    'author': f"user{rng.randint(1, 500)}",
+                    'created_utc': 1.7e9 + rng.randint(0, 3e7),
+                    'score': rng.randint(0, 2000),
+                    'num_comments': comments_per_post
+                })
+                thread = []
+                for i in range(comments_per_post):
+                    # A few top-level comments; the rest reply to an earlier comment
+                    parent = thread[rng.randrange(i)]['id'] if i >= 3 else None
+                    thread.append({
+                        'id': _base36(rng.getrandbits(32)),
+                        'parent': parent,
+                        'body': ' '.join(rng.choice(PARAGRAPHS) for _ in range(rng.randint(1, 3))),
+                        'author': f"user{rng.randint(1, 500)}",
+                        'created_utc': 1.7e9 + rng.randint(0, 3e7),
+                        'score': rng.randint(-5, 500)
+                    })
+                comments[post_id] = thread
+        return cls(pages, serp, posts, comments)
+
+    @classmethod
+    def from_run(cls, raw_dir=None, cache=None):
+        """
+        The corpus an earlier pipeline run recorded: pages from the HTTP response cache,
+        search results from search_results.csv and Reddit items from reddit_content.json
+        """
+        from scraping.http_cache import ResponseCache
+        raw_dir = Path(raw_dir or config.RAW_DATA_PATH)
+        cache = cache or ResponseCache()
+
+        pages = {}
+        for entry in cache.iter_entries():
+            try:
+                pages[entry['url']] = cache.read_body(entry)
+            except OSError:
+                continue
+
+        serp = {}
+        search_path = raw_dir / 'search_results.csv'
+        if search_path.exists():
+            with open(search_path, newline='', encoding='utf-8') as f:
+                for row in csv.DictReader(f):
+                    results = serp.setdefault(row.get('query', ''), [])
+                    results.append({
+                        'link': row['url'],
+                        'title': row.get('title', ''),
+                        'snippet': row.get('snippet', ''),
+                        'position': int(float(row['position'])) if row.get('position') else len(results) + 1
+                    })
+
+        posts, comments = [], {}
+        reddit_path = raw_dir / 'reddit_content.json'
+        if reddit_path.exists():
+            with open(reddit_path, 'r', encoding='utf-8') as f:
+                items = json.load(f)
+            for item in items:
+                if item.get('type') == 'post':
+                    parts = urlsplit(item['url']).path.strip('/').split('/')  # r/<sub>/comments/<id>/<slug>
+                    title, _, selftext = item['text'].partition('. ')
+                    posts.append({
+                        'id': parts[3], 'name': f't3_{parts[3]}', 'title': title, 'selftext': selftext,
+                        'subreddit': item.get('subreddit') or parts[1],
+                        'permalink': '/' + '/'.join(parts) + '/',
+                        'author': item.get('author'), 'created_utc': _timestamp(item.get('date')),
+                        'score': item.get('score', 0), 'num_comments': item.get('num_comments', 0)
+                    })
+                elif item.get('type') == 'comment':
+                    post_id = urlsplit(item['parent_post']).path.strip('/').split('/')[3]
+                    comments.setdefault(post_id, []).append({
+                        'id': item['url'][len(item['parent_post']):], 'body': item['text'],
+                        'author': item.get('author'), 'created_utc': _timestamp(item.get('date')),
+                        'score': item.get('score', 0)
+                    })
+        return cls(pages, serp, posts, comments)
+
+    @classmethod
+    def load(cls, path):
+        """Read a corpus saved with save()"""
+        path = Path(path)
+        with open(path / 'pages' / 'index.json', 'r', encoding='utf-8') as f:
+            index = json.load(f)
+        pages = {url: (path / 'pages' / name).read_text(encoding='utf-8', errors='replace')
+                 for url, name in index.items()}
+        serp, reddit = {}, {}
+        if (path / 'serpapi.json').exists():
+            with open(path / 'serpapi.json', 'r', encoding='utf-8') as f:
+                serp = json.load(f)
+        if (path / 'reddit.json').exists():
+            with open(path / 'reddit.json', 'r', encoding='utf-8') as f:
+                reddit = json.load(f)
+        return cls(pages, serp, reddit.get('posts'), reddit.get('comments'))
+
+    def save(self, path):
+        """Write the corpus as fixture files"""
+        path = Path(path)
+        (path / 'pages').mkdir(parents=True, exist_ok=True)
+        index = {}
+        for i, (url, page) in enumerate(self.pages.items()):
+            index[url] = f'{i}.html'
+            (path / 'pages' / index[url]).write_text(page, encoding='utf-8')
+        with open(path / 'pages' / 'index.json', 'w', encoding='utf-8') as f:
+            json.dump(index, f, indent=1)
+        with open(path / 'serpapi.json', 'w', encoding='utf-8') as f:
+            json.dump(self.serp, f, indent=1)
+        with open(path / 'reddit.json', 'w', encoding='utf-8') as f:
+            json.dump({'posts': self.reddit_posts, 'comments': self.reddit_comments}, f)
+
+def _listing(kind, items):
+    return {'kind': 'Listing', 'data': {
+        'after': None, 'before': None, 'dist': len(items),
+        'children': [{'kind': kind, 'data': item} for item in items]
+    }}
+
+class ReplayServer:
+    def __init__(self, corpus, hosts=4, latency=0.0, error_rate=0.0, page_bytes=None, seed=0, api_quota=None):
+        """
+        hosts: stand-in servers (one port each, so each counts as a domain); the corpus'
+               sites are spread over them by domain
+        page_bytes: pad every page to at least this size
+        api_quota: SerpAPI searches answered before further ones get a 429 (None = unlimited)
+        api_rate_limited (attribute): upcoming SerpAPI searches refused with a throughput 429
+        """
+        self.corpus = corpus
+        self.page_bytes = page_bytes
+        self.api_quota = api_quota
+        self.api_searches = 0
+        self.api_rate_limited = 0
+        self.lock = threading.Lock()
+        self.servers = [StandInServer(latency=latency, error_rate=error_rate, seed=seed + i) for i in range(hosts)]
+        self.replay_urls = {}  # original url -> replay url
+        self.pages = {}  # (server index, path) -> html
+
+        for url, page in corpus.pages.items():
+            parts = urlsplit(url)
+            slot = zlib.crc32(parts.netloc.encode('utf-8')) % hosts
+            path = '/' + quote(parts.netloc + parts.path, safe='/-._~') + (f'%3F{quote(parts.query)}' if parts.query else '')
+            self.replay_urls[url] = self.servers[slot].base_url + path
+            self.pages[slot, path] = page
+
+        for slot, server in enumerate(self.servers):
+            server.add_handler('/', lambda method, path, query, slot=slot: self._serve(slot, method, path, query))
+
+        # Posts by lower-cased subreddit, with search text
+        self.subreddit_posts = {}
+        for post in corpus.reddit_posts:
+            self.subreddit_posts.setdefault(post['subreddit'].lower(), []).append(post)
+        self.posts_by_id = {post['id']: post for post in corpus.reddit_posts}
+
+    @property
+    def base_url(self):
+        """URL of the host that also answers search and Reddit API requests"""
+        return self.servers[0].base_url
+
+    @property
+    def request_count(self):
+        return sum(server.request_count for server in self.servers)
+
+    def replay_url(self, url):
+        """Where the replay serves a corpus page"""
+        return self.replay_urls[url]
+
+    def endpoints(self):
+        """config overrides pointing the SERP and Reddit scrapers at the replay"""
+        return {
+            'SERP_API_URL': f"{self.base_url}/search",
+            'SERP_ACCOUNT_URL': f"{self.base_url}/account.json",
+            'GOOGLE_SEARCH_URL': f"{self.base_url}/search",
+            'REDDIT_URL': self.base_url,
+            'REDDIT_OAUTH_URL': self.base_url
+        }
+
+    def add_reddit_post(self, post, comments=()):
+        """Publish a new Reddit post (t3 data) with its comments"""
+        self.corpus.reddit_posts.append(post)
+        self.corpus.reddit_comments[post['id']] = []
+        self.subreddit_posts.setdefault(post['subreddit'].lower(), []).append(post)
+        self.posts_by_id[post['id']] = post
+        self.add_reddit_comments(post['id'], comments)
+
+    def add_reddit_comments(self, post_id, comments):
+        """Publish new comments (t1 data, optional 'parent' comment id) on a post"""
+        post = self.posts_by_id[post_id]
+        thread = self.corpus.reddit_comments.setdefault(post_id, [])
+        thread.extend(comments)
+        post['num_comments'] = len(thread)
+
+    def _serve(self, slot, method, path, query):
+        if (slot, path) in self.pages:
+            page = self.pages[slot, path]
+            if self.page_bytes:
+                page = pad_html(page, self.page_bytes)
+            return 200, 'text/html; charset=utf-8', page
+        if slot == 0:
+            if path == '/search':
+                return self._search(query)
+            if path == '/account.json':
+                left = 1_000_000 if self.api_quota is None else max(0, self.api_quota - self.api_searches)
+                return 200, 'application/json', json.dumps({'total_searches_left': left})
+            if path == '/api/v1/access_token' and method == 'POST':
+                token = {'access_token': 'replay', 'token_type': 'bearer', 'expires_in': 86400, 'scope': '*'}
+                return 200, 'application/json', json.dumps(token)
+            if re.fullmatch(r'/api/info/?', path):
+                posts = [self.posts_by_id[name[3:]] for name in query.get('id', '').split(',')
+                         if name[3:] in self.posts_by_id]
+                return 200, 'application/json', json.dumps(_listing('t3', posts))
+            match = re.fullmatch(r'/r/([^/]+)/search/?', path)
+            if match:
+                return self._reddit_search(match.group(1), query)
+            match = re.fullmatch(r'/comments/([^/]+)/?', path)
+            if match:
+                return self._reddit_comments(match.group(1), query)
+        return 404, 'text/plain', 'not found'
+
+    def _results(self, query, num):
+        """Recorded results for the query, or a deterministic sample of corpus pages"""
+        results = self.corpus.serp.get(query)
+        if results is None:
+            rng = random.Random(query)
+            urls = list(self.corpus.pages)
+            results = [{'link': url, 'title': f"Result {i}", 'snippet': '', 'position': i}
+                       for i, url in enumerate(rng.sample(urls, min(num, len(urls))), 1)]
+        # Links outside the corpus stay unreachable instead of leaking to the live web
+        return [dict(result, link=self.replay_urls.get(result['link'], f"{self.base_url}/missing/{i}"))
+                for i, result in enumerate(results[:num])]
+
+    def _search(self, query):
+        results = self._results(query.get('q', ''), int(query.get('num', 10)))
+        if 'api_key' in query:
+            with self.lock:
+                if self.api_rate_limited:
+                    self.api_rate_limited -= 1
+                    return 429, 'application/json', '{"error": "Too many requests, slow down."}'
+                if self.api_quota is not None and self.api_searches >= self.api_quota:
+                    return 429, 'application/json', '{"error": "Your account has run out of searches."}'
+                self.api_searches += 1
+            data = {'search_parameters': {'q': query.get('q')}, 'organic_results': results}
+            return 200, 'application/json', json.dumps(data)
+        # Google results page, as the scraping fallback parses it
+        blocks = ''.join(
+            f'<div class="g"><a href="{html.escape(r["link"])}"><h3>{html.escape(r["title"])}</h3></a>'
+            f'<div class="VwiC3b">{html.escape(r.get("snippet") or "")}</div></div>' for r in results
+        )
+        return 200, 'text/html; charset=utf-8', f'<html><body><div id="search">{blocks}</div></body></html>'
+
+    def _reddit_search(self, subreddit, query):
+        words = [word for word in re.findall(r'[a-z0-9]+', query.get('q', '').lower()) if len(word) > 3]
+        posts = [
+            post for post in self.subreddit_posts.get(subreddit.lower(), [])
+            if any(word in f"{post['title']} {post['selftext']}".lower() for word in words)
+        ]
+        if query.get('sort') == 'new':
+            posts = sorted(posts, key=lambda post: post['created_utc'], reverse=True)
+        return 200, 'application/json', json.dumps(_listing('t3', posts[:int(query.get('limit', 25))]))
+
+    def _reddit_comments(self, post_id, query):
+        """
+        The post's comment tree (comments carry an optional 'parent' comment id), cut to
+        the first `limit` comments breadth-first with a "load more" stub for the rest
+        """
+        post = self.posts_by_id.get(post_id)
+        if not post:
+            return 404, 'application/json', '{"message": "Not Found", "error": 404}'
+        comments = self.corpus.reddit_comments.get(post_id, [])
+        replies = {}
+        for comment in comments:
+            replies.setdefault(comment.get('parent'), []).append(comment)
+
+        order = []
+        queue = list(replies.get(None, []))
+        while queue:
+            comment = queue.pop(0)
+            order.append(comment)
+            queue.extend(replies.get(comment['id'], []))
+        limit = int(query.get('limit') or len(order))
+        sent = {comment['id'] for comment in order[:limit]}
+
+        def children(parent_id, parent_name, depth):
+            items = []
+            for comment in replies.get(parent_id, []):
+                if comment['id'] in sent:
+                    data = {key: value for key, value in comment.items() if key != 'parent'}
+                    data.update(name=f"t1_{comment['id']}", parent_id=parent_name, link_id=post['name'], depth=depth)
+                    nested = children(comment['id'], data['name'], depth + 1)
+                    data['replies'] = _listing('t1', nested) if nested else ''
+                    items.append(data)
+            return items
+
+        listing = _listing('t1', children(None, post['name'], 0))
+        rest = [comment['id'] for comment in order[limit:]]
+        if rest:
+            listing['data']['children'].append({'kind': 'more', 'data': {
+                'count': len(rest), 'name': 't1__', 'id': '_', 'parent_id': post['name'], 'depth': 0,
+                'children': rest
+            }})
+        return 200, 'application/json', json.dumps([_listing('t3', [post]), listing])
+
+    def start(self):
+        for server in self.servers:
+            server.start()
+        return self
+
+    def stop(self):
+        for server in self.servers:
+            server.stop()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -0,0 +1,178 @@
+"""
+Local HTTP stand-in for scraper tests and benchmarks
+Serves generated agriculture article pages (/article/<n> light, /news/<n> news-site
+sized) and any registered routes or handlers with configurable latency and error rate,
+so fetch-layer changes can be exercised without touching the live web
+"""
+import hashlib
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl
+
+PARAGRAPHS = [
+    "Farmers in Punjab said the MSP for wheat should be raised to Rs 2,500 per quintal this year.",
+    "The government claims procurement of paddy has increased by 12% compared to last season.",
+    "Agricultural economists argue that the APMC mandi system needs reform to help small farmers.",
+    "Crop insurance claims under PMFBY were rejected for many cotton growers, activists said.",
+    "Fertilizer subsidy cuts could hurt farmers already struggling with rising input costs.",
+    "Officials believe drone spraying of pesticide will reduce costs for farmers in the long run.",
+]
+
+def article_html(page_id, paragraphs=8):
+    """A deterministic article page for the given id"""
+    rng = random.Random(page_id)
+    body = '\n'.join(f"<p>{rng.choice(PARAGRAPHS)}</p>" for _ in range(paragraphs))
+    return f"""<html><head><title>Agriculture report {page_id}</title>
+<meta name="author" content="Reporter {page_id % 7}">
+<meta property="article:published_time" content="2024-0{page_id % 9 + 1}-15">
+<script>var tracking = true;</script></head>
+<body><nav><a href="/">Home</a></nav>
+<article>{body}</article>
+<footer>Copyright agriculture news</footer></body></html>"""
+
+def news_page_html(page_id, paragraphs=12):
+    """
+    A heavier, news-site-like page: menus, scripts, sidebars, a content div and
+    inline markup inside paragraphs, closer to real scraped pages than article_html
+    """
+    rng = random.Random(page_id)
+    menu = ''.join(f'<li class="menu-item"><a href="/section/{i}">Section {i}</a></li>' for i in range(40))
+    scripts = ''.join(f'<script type="text/javascript">window.slot{i} = {{"id": {i}, "size": [300, 250]}};</script>'
+                      for i in range(15))
+    related = ''.join(f'<div class="related-card"><a href="/news/{page_id + i}"><img src="/img/{i}.jpg" alt="">'
+                      f'<span class="headline">Related story {i}</span></a></div>' for i in range(20))
+    body = '\n'.join(
+        f'<p>{rng.choice(PARAGRAPHS)} <a href="/topic/{j}">Read more</a> <em>{rng.choice(PARAGRAPHS)}</em></p>'
+        for j in range(paragraphs)
+    )
+    layouts = [
+        f'<article class="story">{body}</article>',
+        f'<div class="article-body story-content">{body}</div>',
+        f'<main><section>{body}</section></main>',
+        f'<div class="wrapper">{body}</div>',
+    ]
+    return f"""<!DOCTYPE html><html lang="en"><head><meta charset="utf-8">
+<title>Farm news {page_id} | Agriculture Daily</title>
+<meta property="article:published_time" content="2024-0{page_id % 9 + 1}-1{page_id % 10}T08:30:00+05:30">
+<style>.menu-item {{ display: inline; }} .related-card {{ width: 300px; }}</style>{scripts}</head>
+<body><header><ul class="menu">{menu}</ul></header>
+<nav class="breadcrumb"><a href="/">Home</a> &raquo; <a href="/agriculture">Agriculture</a></nav>
+<div class="container"><h1>Farm news {page_id}</h1>
+<span class="author-name">By Correspondent {page_id % 5}</span>
+{layouts[page_id % len(layouts)]}
+<aside class="sidebar">{related}</aside></div>
+<footer><p>Copyright Agriculture Daily. All rights reserved.</p></footer>
+<iframe src="/ads/frame"></iframe></body></html>"""
+
+class StandInServer:
+    def __init__(self, latency=0.0, error_rate=0.0, paragraphs=8, seed=0, retry_after=None):
+        self.latency = latency  # Seconds added to every response
+        self.error_rate = error_rate  # Fraction of requests answered with HTTP 503
+        self.retry_after = retry_after  # Retry-After seconds sent with those 503s
+        self.paragraphs = paragraphs
+        self.rng = random.Random(seed)
+        self.request_count = 0
+        self.not_modified_count = 0  # Conditional requests answered with 304
+        self.routes = {}  # path -> (status, content_type, body bytes)
+        self.handlers = []  # (path prefix, handler(method, path, query) -> (status, content_type, body))
+        self.lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), self._make_handler())
+        self.httpd.daemon_threads = True
+        self.thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address
+        return f"http://{host}:{port}"
+
+    def add_route(self, path, body, content_type='text/html; charset=utf-8', status=200):
+        """Serve fixed content at path"""
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+        self.routes[path] = (status, content_type, body)
+
+    def add_handler(self, prefix, handler):
+        """Answer requests under prefix with handler(method, path, query dict)"""
+        self.handlers.append((prefix, handler))
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                self.respond('GET')
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                self.rfile.read(length)
+                self.respond('POST')
+
+            def respond(self, method):
+                with server.lock:
+                    server.request_count += 1
+                    fail = server.rng.random() < server.error_rate
+                if server.latency:
+                    time.sleep(server.latency)
+
+                path, _, query = self.path.partition('?')
+                handler = next((h for prefix, h in server.handlers if path.startswith(prefix)), None)
+                if fail:
+                    status, content_type, body = 503, 'text/plain', b'unavailable'
+                elif handler:
+                    status, content_type, body = handler(method, path, dict(parse_qsl(query)))
+                    if isinstance(body, str):
+                        body = body.encode('utf-8')
+                elif path in server.routes:
+                    status, content_type, body = server.routes[path]
+                elif path.startswith('/article/'):
+                    page_id = int(path.rsplit('/', 1)[-1] or 0)
+                    status, content_type = 200, 'text/html; charset=utf-8'
+                    body = article_html(page_id, server.paragraphs).encode('utf-8')
+                elif path.startswith('/news/'):
+                    page_id = int(path.rsplit('/', 1)[-1] or 0)
+                    status, content_type = 200, 'text/html; charset=utf-8'
+                    body = news_page_html(page_id).encode('utf-8')
+                else:
+                    status, content_type, body = 404, 'text/plain', b'not found'
+
+                # Content-derived ETag so cached clients can revalidate with a 304
+                etag = '"%s"' % hashlib.md5(body).hexdigest()
+                if status == 200 and self.headers.get('If-None-Match') == etag:
+                    with server.lock:
+                        server.not_modified_count += 1
+                    self.send_response(304)
+                    self.send_header('ETag', etag)
+                    self.end_headers()
+                    return
+
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                if fail and server.retry_after is not None:
+                    self.send_header('Retry-After', str(server.retry_after))
+                if status == 200:
+                    self.send_header('ETag', etag)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
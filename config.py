@@ -94,12 +94,33 @@ TARGET_DOMAINS = [
 
 # Database configuration
 DATABASE_PATH = "data/agriculture_statements.db"
+DATABASE_CACHE_MB = 64  # SQLite page cache of the long-lived connection
+DATABASE_INSERT_BATCH = 500  # Rows per multi-row INSERT in the bulk insert APIs
 
 # Processing parameters
 MAX_STATEMENT_LENGTH = 500  # Maximum characters per statement
 MIN_STATEMENT_LENGTH = 20   # Minimum characters per statement
 SIMILARITY_THRESHOLD = 0.3  # Minimum similarity for pairing (0-1)
 MAX_PAIRS_PER_SOURCE = 100  # Maximum pairs from single source
+EXTRACTION_CHUNK_SIZE = 100000  # Maximum characters handed to SpaCy at once
+
+# Language prefilter (runs before SpaCy)
+LANGUAGE_PREFILTER_ENABLED = True
+MIN_LATIN_SCRIPT_RATIO = 0.8  # Paragraphs with fewer Latin letters are skipped
+LANGUAGE_ID_ENABLED = True  # Also detect romanised Hindi (Hinglish)
+NON_ENGLISH_ACTION = "drop"  # "drop" or "route" (keep aside for other pipelines)
+
+# Near-duplicate documents (wire-service copies across sites, runs before SpaCy)
+NEAR_DUPLICATE_ENABLED = True
+NEAR_DUPLICATE_DISTANCE = 7  # Max differing SimHash bits (of 64) between copies of one story (unrelated texts differ in ~32)
+NEAR_DUPLICATE_MIN_WORDS = 50  # Shorter documents are not fingerprinted
+NEAR_DUPLICATE_ACTION = "merge"  # "merge" (keep longest copy, record mirror URLs) or "drop" (keep first)
+
+# Numeric fact index (factual inconsistency candidates)
+FACT_VALUE_TOLERANCE = 0.01  # Relative difference below which two values are equal
+FACT_PAIR_FANOUT = 3  # Partners per fact from neighbouring value buckets
+MAX_FACT_PAIRS_PER_KEY = 50  # Cap per (key, unit, year) group
+FACTUAL_PAIR_SHARE = 0.10  # Share of sampled pairs reserved for numeric conflicts
 
 # Sentence Transformer model
 SENTENCE_TRANSFORMER_MODEL = "all-MiniLM-L12-v2"
@@ -111,11 +132,107 @@ SPACY_MODEL = "en_core_web_sm"
 MAX_PAGES_PER_QUERY = 1  # First page only
 SCRAPE_DELAY = 2  # Seconds between requests
 USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+SERP_BATCH_PAUSE = 10  # Seconds to pause after every 5 search queries
+REDDIT_WORKERS = 4  # Reddit requests in flight (one PRAW client per worker thread)
+REDDIT_REQUEST_RATE = 1.5  # Requests/sec shared by all workers (Reddit allows 100/min per OAuth client)
+REDDIT_MAX_COMMENTS = 100  # Comments read per post (breadth-first)
+
+# Service endpoints (benchmarks point these at the offline replay server)
+SERP_API_URL = "https://serpapi.com/search"
+SERP_ACCOUNT_URL = "https://serpapi.com/account.json"  # Remaining searches (free to query)
+GOOGLE_SEARCH_URL = "https://www.google.com/search"
+REDDIT_URL = "https://www.reddit.com"
+REDDIT_OAUTH_URL = "https://oauth.reddit.com"
+
+# Download guards (responses are streamed and checked before the body is read)
+ALLOWED_CONTENT_TYPES = ("text/html", "application/xhtml+xml")
+MAX_RESPONSE_BYTES = 5 * 1024 * 1024  # Abort bodies larger than this
+CONNECT_TIMEOUT = 5  # Seconds to establish a connection
+DOWNLOAD_DEADLINE = 30  # Total seconds allowed for reading one body
+
+# Retries and per-host circuit breaker
+MAX_RETRIES = 2  # Retries for 429/5xx and connection errors (exponential backoff with jitter)
+RETRY_BASE_DELAY = 1.0  # Seconds; the backoff window doubles with each retry
+RETRY_MAX_DELAY = 30  # Cap on a single backoff
+MAX_RETRY_AFTER = 120  # Longer Retry-After values open the host's circuit instead of waiting
+HOST_FAILURE_THRESHOLD = 5  # Consecutive failures before a host's remaining URLs are skipped
+HOST_COOLDOWN = 300  # Seconds a host stays skipped before it is tried again
+
+# Concurrent content fetching
+CONCURRENT_FETCHING = True  # False = fetch one URL at a time with SCRAPE_DELAY
+MAX_CONCURRENT_FETCHES = 16  # Total requests in flight
+PER_DOMAIN_RATE = 1 / SCRAPE_DELAY  # Requests per second per domain (token bucket refill)
+PER_DOMAIN_BURST = 2  # Requests a domain may receive back to back
+
+# HTTP response cache (compressed bodies + SQLite index)
+HTTP_CACHE_ENABLED = True
+HTTP_CACHE_DIR = "data/cache/http/"
+HTTP_CACHE_TTL = 7 * 24 * 3600  # Seconds before an entry is revalidated
+HTTP_CACHE_MODE = "default"  # "default", "refresh" (revalidate all) or "offline" (replay only)
+
+# SERP result cache (saves SerpAPI quota on reruns)
+SERP_CACHE_ENABLED = True
+SERP_CACHE_PATH = "data/cache/serp.db"
+SERP_CACHE_TTL = 3 * 24 * 3600  # Seconds before a query is searched again
+SERP_CACHE_MODE = "default"  # "default" (re-search only stale queries), "refresh" (re-search all) or "offline" (cache only)
+SERP_GL = "in"  # Search country
+SERP_HL = "en"  # Search language
+
+# SERP query scheduling (queries run concurrently; results stream to the content scraper)
+SERP_CONCURRENCY = 4  # Searches in flight
+SERP_API_RATE = 2  # SerpAPI searches started per second
+SERP_SCRAPE_RATE = 1 / SCRAPE_DELAY  # Google scraping fallback searches per second
+SERP_API_QUOTA = None  # SerpAPI searches left (None = ask the account API at startup)
+SERP_QUOTA_RESERVE = 0  # Searches kept back; queries past this use the scraping fallback
+
+# Incremental Reddit scraping (high-water mark per subreddit and query, comment cache per thread)
+REDDIT_STATE_ENABLED = True
+REDDIT_STATE_PATH = "data/cache/reddit.db"
+
+# Crawl frontier (SQLite URL queue; interrupted runs resume where they stopped)
+CRAWL_FRONTIER_ENABLED = True
+CRAWL_FRONTIER_PATH = "data/cache/frontier.db"
+FRONTIER_MAX_ATTEMPTS = 3  # Failed downloads are retried by later runs up to this many times
+FRONTIER_CLAIM_BATCH = 256  # URLs a process claims at a time
+FRONTIER_LEASE = 600  # Seconds before another process may take over a claimed URL
+
+# URL index (canonical URLs collected by any source; variants and repeats are not refetched)
+URL_INDEX_ENABLED = True
+URL_INDEX_PATH = "data/cache/url_index"
+URL_INDEX_MODE = "exact"  # "exact" (8 bytes per URL) or "bloom" (fixed size, for large crawls)
+URL_INDEX_CAPACITY = 1_000_000  # URLs the Bloom filter is sized for
+URL_INDEX_ERROR_RATE = 0.001  # Bloom filter false-positive rate at capacity
+
+# Sitemap/RSS discovery on TARGET_DOMAINS (article URLs without spending search quota)
+DISCOVERY_ENABLED = True
+DISCOVERY_STATE_PATH = "data/cache/discovery_state.json"  # Newest lastmod seen per sitemap/feed
+DISCOVERY_KEYWORDS = [  # Matched at word starts in the URL path or entry title
+    "agri", "farm", "kisan", "krishi", "crop", "kharif", "rabi", "msp", "mandi", "apmc",
+    "fertili", "pesticide", "irrigat", "monsoon", "drought", "harvest", "wheat", "paddy",
+    "rice", "pulses", "sugarcane", "cotton", "horticult", "dairy", "livestock", "fisher",
+    "food processing", "procurement", "seed", "rural"
+]
+DISCOVERY_FEEDS = {}  # Extra feed URLs per domain, e.g. {"www.thehindu.com": ["https://.../feeder/default.rss"]}
+DISCOVERY_MAX_SITEMAPS = 20  # Child sitemaps read per domain per run (newest first)
+DISCOVERY_MAX_URLS_PER_DOMAIN = 500  # Newest matching URLs kept per domain per run
+DISCOVERY_MAX_AGE_DAYS = 365  # Older entries are ignored (undated ones are kept)
+DISCOVERY_CONTENT_TYPES = (  # robots.txt, homepages, sitemaps (plain or gzipped) and feeds
+    "text/plain", "text/html", "text/xml", "application/xml", "application/rss+xml", "application/atom+xml",
+    "application/rdf+xml", "application/x-gzip", "application/gzip", "application/octet-stream"
+)
+DISCOVERY_MAX_BYTES = 50 * 1024 * 1024  # Per sitemap or feed, as downloaded and after gunzip (the sitemap limit)
+
+# HTML parsing
+ARTICLE_EXTRACTOR = "heuristic"  # "heuristic" (built-in lxml strategies), "trafilatura" or "newspaper"
+EXTRACTION_MEMO_ENABLED = True  # Try each domain's last working content strategy first
+EXTRACTION_MEMO_PATH = "data/cache/extraction_strategies.json"
+PARSE_WORKERS = None  # Processes parsing pages alongside fetching (None = one per CPU, 0 = parse on the fetch thread)
 
 # Output paths
 RAW_DATA_PATH = "data/raw/"
 PROCESSED_DATA_PATH = "data/processed/"
 FINAL_DATA_PATH = "data/final/"
+EXPORT_CHUNK_SIZE = 10000  # Pairs read and written per chunk by the annotation exporters
 
 # API Keys - Load from secrets.toml
 # Create secrets.toml file with your API keys (see secrets.toml.example)
@@ -12,7 +12,6 @@ Output:
     - data/final/pairs_for_annotation_[timestamp].csv
 """
 
-import json
 import pandas as pd
 import numpy as np
 import torch
@@ -22,6 +21,9 @@ from datetime import datetime
 import os
 import sys
 
+from processing.statement_store import StatementStore
+from processing.numeric_facts import NumericFactIndex
+
 
 # ============================================================================
 # CONFIGURATION 
@@ -35,6 +37,12 @@ class Config:
     SIMILARITY_THRESHOLD = 0.3  # Minimum similarity for pairing
     MAX_PAIRS_PER_SOURCE = 100  # Max pairs from same URL combination
     
+    # Numeric conflicts (factual inconsistency candidates)
+    FACT_VALUE_TOLERANCE = 0.01  # Relative difference below which values are equal
+    FACT_PAIR_FANOUT = 3  # Partners per fact from neighbouring value buckets
+    MAX_FACT_PAIRS_PER_KEY = 50  # Cap per (key, unit, year) group
+    FACTUAL_PAIR_SHARE = 0.10  # Share of target reserved for numeric conflicts
+    
     # Target
     TARGET_PAIRS = 1000  # Generate 1000 pairs (annotate 300+)
     
@@ -88,34 +96,35 @@ def main():
         print(f"❌ Error: File not found: {config.STATEMENTS_PATH}")
         sys.exit(1)
     
-    with open(config.STATEMENTS_PATH, 'r', encoding='utf-8') as f:
-        statements = json.load(f)
+    # Columnar store: dictionary-encoded metadata, one text buffer
+    statements = StatementStore.from_json(config.STATEMENTS_PATH)
     print(f"✓ Loaded {len(statements)} statements")
     
     # Apply limit if set
     if config.MAX_STATEMENTS and len(statements) > config.MAX_STATEMENTS:
         print(f"⚠️  Limiting to {config.MAX_STATEMENTS} statements for testing")
-        statements = statements[:config.MAX_STATEMENTS]
+        statements = statements.take(range(config.MAX_STATEMENTS))
     
     # Show statistics
     print("\nDataset Statistics:")
     print("="*50)
     print(f"Total statements: {len(statements)}")
     
-    opinion_count = sum(1 for s in statements if s.get('has_opinion', False))
+    opinion_count = statements.opinion_count()
     print(f"Opinion statements: {opinion_count} ({opinion_count/len(statements)*100:.1f}%)")
     
-    unique_sources = len(set(s['source_url'] for s in statements if s.get('source_url')))
+    unique_sources = sum(1 for url in statements.categories('source_url') if url)
     print(f"Unique sources: {unique_sources}")
     
-    domains = set(s.get('domain') for s in statements if s.get('domain'))
+    domains = [d for d in statements.categories('domain') if d]
     print(f"Unique domains: {len(domains)}")
     
     # Show samples
     print("\nSample statements:")
     print("="*50)
-    for i, stmt in enumerate(statements[:3], 1):
-        print(f"{i}. {stmt['text'][:100]}...")
+    for i in range(min(3, len(statements))):
+        stmt = statements[i]
+        print(f"{i + 1}. {stmt['text'][:100]}...")
         print(f"   Source: {stmt.get('domain', 'Unknown')}")
         print(f"   Opinion: {stmt.get('has_opinion', False)}")
         print()
@@ -131,7 +140,7 @@ def main():
         print("✓ Model loaded on CPU")
     
     # Compute embeddings
-    texts = [s['text'] for s in statements]
+    texts = list(statements.texts())
     print(f"\nComputing embeddings for {len(texts)} statements...")
     print("This may take 5-10 minutes with GPU...")
     
@@ -159,36 +168,35 @@ def main():
     n = len(statements)
     
     for i in tqdm(range(n), desc="Processing statements"):
-        for j in range(i+1, n):
-            similarity_score = similarity_matrix[i][j].item()
-            
-            if similarity_score >= config.SIMILARITY_THRESHOLD:
-                stmt_a = statements[i]
-                stmt_b = statements[j]
-                
-                same_source = (stmt_a.get('source_url') == stmt_b.get('source_url'))
-                same_author = (stmt_a.get('author') == stmt_b.get('author'))
-                both_have_opinions = (stmt_a.get('has_opinion', False) and 
-                                     stmt_b.get('has_opinion', False))
-                
-                # Calculate quality score
-                quality_score = similarity_score
-                if same_source:
-                    quality_score += 0.2
-                if same_author:
-                    quality_score += 0.1
-                if both_have_opinions:
-                    quality_score += 0.15
-                
-                pairs.append({
-                    'statement_a': stmt_a,
-                    'statement_b': stmt_b,
-                    'similarity_score': similarity_score,
-                    'quality_score': quality_score,
-                    'same_source': same_source,
-                    'same_author': same_author,
-                    'both_have_opinions': both_have_opinions
-                })
+        row = similarity_matrix[i][i+1:].cpu().numpy()
+        
+        for offset in np.nonzero(row >= config.SIMILARITY_THRESHOLD)[0]:
+            # Quality score: similarity plus same-source/author and opinion bonuses
+            pairs.append(statements.score_pair(i, i + 1 + int(offset), float(row[offset])))
+    
+    # Numeric-fact join: same crop/scheme/unit/year, differing values
+    print("\nMining numeric-conflict pairs...")
+    fact_index = NumericFactIndex.from_store(statements, value_tolerance=config.FACT_VALUE_TOLERANCE,
+                                             fanout=config.FACT_PAIR_FANOUT,
+                                             max_per_group=config.MAX_FACT_PAIRS_PER_KEY)
+    candidates = fact_index.candidate_pairs()
+    pending = {(a, b): key for a, b, key in candidates}
+    for pair in pairs:
+        key = pending.pop((pair['index_a'], pair['index_b']), None)
+        if key:
+            pair['factual_candidate'] = True
+            pair['fact_key'] = key
+    
+    if pending:
+        indices_a = [a for a, _ in pending]
+        indices_b = [b for _, b in pending]
+        scores = util.pairwise_cos_sim(embeddings[indices_a], embeddings[indices_b]).tolist()
+        for ((i, j), key), similarity_score in zip(pending.items(), scores):
+            pair = statements.score_pair(i, j, similarity_score)
+            pair['factual_candidate'] = True
+            pair['fact_key'] = key
+            pairs.append(pair)
+    print(f"✓ {fact_index.fact_count} numeric facts, {len(candidates)} numeric-conflict pairs")
     
     print(f"\n✓ Generated {len(pairs)} candidate pairs")
     same_source_count = sum(1 for p in pairs if p['same_source'])
@@ -202,23 +210,30 @@ def main():
     print("\nApplying stratified sampling...")
     print("="*50)
     
-    same_source_opinion = [p for p in pairs if p['same_source'] and p['both_have_opinions']]
-    same_source_mixed = [p for p in pairs if p['same_source'] and not p['both_have_opinions']]
-    diff_source_opinion = [p for p in pairs if not p['same_source'] and p['both_have_opinions']]
-    diff_source_mixed = [p for p in pairs if not p['same_source'] and not p['both_have_opinions']]
+    factual = [p for p in pairs if p.get('factual_candidate')]
+    n_factual = int(config.TARGET_PAIRS * config.FACTUAL_PAIR_SHARE)
+    selected = factual[:n_factual]
+    chosen = set(id(p) for p in selected)
+    rest = [p for p in pairs if id(p) not in chosen]
+    
+    same_source_opinion = [p for p in rest if p['same_source'] and p['both_have_opinions']]
+    same_source_mixed = [p for p in rest if p['same_source'] and not p['both_have_opinions']]
+    diff_source_opinion = [p for p in rest if not p['same_source'] and p['both_have_opinions']]
+    diff_source_mixed = [p for p in rest if not p['same_source'] and not p['both_have_opinions']]
     
     print(f"\n📊 Pair Distribution (Before Sampling):")
+    print(f"  Numeric conflicts: {len(factual)}")
     print(f"  Same source + opinions: {len(same_source_opinion)}")
     print(f"  Same source + mixed: {len(same_source_mixed)}")
     print(f"  Diff source + opinions: {len(diff_source_opinion)}")
     print(f"  Diff source + mixed: {len(diff_source_mixed)}")
     
-    target = config.TARGET_PAIRS
-    selected = []
+    print(f"\n✓ Selected {len(selected)} numeric-conflict pairs (target: {n_factual}, {config.FACTUAL_PAIR_SHARE:.0%})")
+    target = config.TARGET_PAIRS - len(selected)
     
     n_same_opinion = int(target * 0.5)
     selected.extend(same_source_opinion[:n_same_opinion])
-    print(f"\n✓ Selected {len(selected)} same-source opinion pairs (target: {n_same_opinion}, 50%)")
+    print(f"✓ Added {min(len(same_source_opinion), n_same_opinion)} same-source opinion pairs (target: {n_same_opinion}, 50%)")
     
     n_same_mixed = int(target * 0.25)
     selected.extend(same_source_mixed[:n_same_mixed])
@@ -232,8 +247,10 @@ def main():
     selected.extend(diff_source_mixed[:n_diff_mixed])
     print(f"✓ Added {min(len(diff_source_mixed), n_diff_mixed)} diff-source mixed pairs (target: {n_diff_mixed}, 10%)")
     
+    target = config.TARGET_PAIRS
     if len(selected) < target:
-        remaining = [p for p in pairs if p not in selected]
+        chosen = set(id(p) for p in selected)
+        remaining = [p for p in pairs if id(p) not in chosen]
         needed = target - len(selected)
         selected.extend(remaining[:needed])
         print(f"✓ Added {min(len(remaining), needed)} remaining high-quality pairs")
@@ -244,13 +261,14 @@ def main():
     print("\nApplying diversity filtering...")
     print("="*50)
     
+    source_codes = statements.codes('source_url')
     url_combination_counts = {}
     source_counts = {}
     diverse_pairs = []
     
     for pair in selected:
-        url_a = pair['statement_a'].get('source_url', '')
-        url_b = pair['statement_b'].get('source_url', '')
+        url_a = int(source_codes[pair['index_a']])
+        url_b = int(source_codes[pair['index_b']])
         
         url_key = tuple(sorted([url_a, url_b]))
         url_count = url_combination_counts.get(url_key, 0)
@@ -276,20 +294,22 @@ def main():
     
     export_data = []
     for i, pair in enumerate(final_pairs, 1):
+        a, b = pair['index_a'], pair['index_b']
         export_data.append({
             'id': i,
-            'statement_a': pair['statement_a']['text'],
-            'statement_b': pair['statement_b']['text'],
+            'statement_a': statements.text(a),
+            'statement_b': statements.text(b),
             'similarity_score': round(pair['similarity_score'], 3),
             'quality_score': round(pair['quality_score'], 3),
             'same_source': pair['same_source'],
             'both_have_opinions': pair['both_have_opinions'],
-            'source_a': pair['statement_a'].get('source_url', ''),
-            'source_b': pair['statement_b'].get('source_url', ''),
-            'domain_a': pair['statement_a'].get('domain', ''),
-            'domain_b': pair['statement_b'].get('domain', ''),
-            'author_a': pair['statement_a'].get('author', ''),
-            'author_b': pair['statement_b'].get('author', ''),
+            'factual_candidate': pair.get('factual_candidate', False),
+            'source_a': statements.value('source_url', a),
+            'source_b': statements.value('source_url', b),
+            'domain_a': statements.value('domain', a),
+            'domain_b': statements.value('domain', b),
+            'author_a': statements.value('author', a),
+            'author_b': statements.value('author', b),
             'relationship_label': '',
             'inconsistency_subtype': '',
             'notes': ''
@@ -10,9 +10,11 @@ from pathlib import Path
 from datetime import datetime
 
 # Import enhanced modules
-from scraping.enhanced_serp_scraper import EnhancedSERPScraper
+from scraping.serp_scheduler import SerpScheduler
 from scraping.enhanced_content_scraper import EnhancedContentScraper
 from scraping.reddit_scraper import RedditScraper
+from scraping.discovery import DiscoveryCrawler
+from scraping.url_index import url_key
 from processing.enhanced_statement_extractor import EnhancedStatementExtractor
 from processing.enhanced_pair_generator import EnhancedPairGenerator
 from storage.database import StatementDatabase
@@ -57,9 +59,10 @@ def main():
     db = StatementDatabase()
     print("✓ Database ready")
     
-    # STEP 1: SERP Scraping
-    print_header("STEP 1: Google Search (SERP)")
-    serp_scraper = EnhancedSERPScraper()
+    # STEP 1-2: SERP Scraping, with content scraping starting as each query's results arrive
+    print_header("STEP 1-2: Google Search (SERP) + Content Scraping")
+    serp_scheduler = SerpScheduler()
+    content_scraper = EnhancedContentScraper()
     
     # Select queries
     queries = config.AGRICULTURE_QUERIES[:NUM_QUERIES]
@@ -67,11 +70,12 @@ def main():
     for i, q in enumerate(queries, 1):
         print(f"  {i}. {q}")
     
-    # Scrape search results WITHOUT strict domain filtering for better diversity
-    search_results = serp_scraper.scrape_all_queries(queries, num_results=MAX_URLS_PER_QUERY, filter_domains=False)
-    
-    # Apply diversity filter
-    search_results = serp_scraper.get_diverse_results(search_results, max_per_domain=20)
+    # Search WITHOUT strict domain filtering for better diversity (at most 20 URLs per domain),
+    # fetching each query's URLs while the remaining queries are still being searched
+    search_batches = serp_scheduler.stream(queries, num_results=MAX_URLS_PER_QUERY, filter_domains=False,
+                                           max_per_domain=20)
+    documents = content_scraper.scrape_url_stream(search_batches, key=lambda r: r['url'])
+    search_results = serp_scheduler.results
     print(f"✓ Collected {len(search_results)} diverse URLs")
     
     # Save search results
@@ -79,13 +83,22 @@ def main():
     search_df.to_csv(f"{config.RAW_DATA_PATH}search_results.csv", index=False)
     print(f"✓ Saved to: {config.RAW_DATA_PATH}search_results.csv")
     
-    # STEP 2: Content Scraping
-    print_header("STEP 2: Content Scraping")
-    content_scraper = EnhancedContentScraper()
-    
-    urls = [r['url'] for r in search_results]
-    print(f"Scraping {len(urls)} URLs...")
-    documents = content_scraper.scrape_multiple_urls(urls)
+    # STEP 2b: Sitemap/RSS discovery on the target sites (no search quota)
+    discovered_urls = []
+    if config.DISCOVERY_ENABLED:
+        print_header("STEP 2b: Sitemap/RSS Discovery")
+        discovery = DiscoveryCrawler()
+        discovered = discovery.discover()
+        pd.DataFrame(discovered).to_csv(f"{config.RAW_DATA_PATH}discovered_urls.csv", index=False)
+        print(f"✓ Saved to: {config.RAW_DATA_PATH}discovered_urls.csv")
+        
+        # Articles the search already returned are scraped once
+        searched = {url_key(r['url']) for r in search_results}
+        discovered_urls = [d['url'] for d in discovered if url_key(d['url']) not in searched]
+        print(f"Scraping {len(discovered_urls)} discovered URLs...")
+        documents.extend(content_scraper.scrape_multiple_urls(discovered_urls))
+        discovery.save()  # Watermarks move only once the discovered URLs are scraped
+    content_scraper.close()
     
     # Save raw documents
     save_json(documents, f"{config.RAW_DATA_PATH}documents.json", "documents")
@@ -117,22 +130,19 @@ def main():
         print("❌ No statements extracted. Exiting.")
         return
     
-    # Save statements
-    save_json(statements, f"{config.PROCESSED_DATA_PATH}statements.json", "statements")
+    # Save statements (streamed from the columnar store)
+    statements.write_json(f"{config.PROCESSED_DATA_PATH}statements.json")
+    print(f"✓ Saved statements to: {config.PROCESSED_DATA_PATH}statements.json")
     
     # STEP 5: Save to Database
     print_header("STEP 5: Database Storage")
     print("Saving statements to database...")
     
-    statement_ids = []
-    for stmt in statements:
-        stmt_id = db.insert_statement(
-            text=stmt['text'],
-            source_url=stmt['source_url'],
-            author=stmt.get('author'),
-            topic='agriculture'
-        )
-        statement_ids.append(stmt_id)
+    statement_ids = db.insert_statements_bulk(
+        ({'text': stmt['text'], 'source_url': stmt['source_url'], 'author': stmt.get('author')}
+         for stmt in statements),
+        topic='agriculture'
+    )
     
     print(f"✓ Saved {len(statement_ids)} statements to database")
     
@@ -148,7 +158,8 @@ def main():
         statements, 
         embeddings, 
         max_pairs=TARGET_PAIRS,
-        use_stratified=True
+        use_stratified=True,
+        fact_index=statement_extractor.fact_index
     )
     
     if not pairs:
@@ -159,31 +170,13 @@ def main():
     print_header("STEP 7: Save Pairs to Database")
     print("Saving pairs to database...")
     
-    saved_count = 0
-    for pair in pairs:
-        # Get or create statement IDs
-        stmt_a_id = db.insert_statement(
-            text=pair['statement_a']['text'],
-            source_url=pair['statement_a']['source_url'],
-            author=pair['statement_a'].get('author'),
-            topic='agriculture'
-        )
-        stmt_b_id = db.insert_statement(
-            text=pair['statement_b']['text'],
-            source_url=pair['statement_b']['source_url'],
-            author=pair['statement_b'].get('author'),
-            topic='agriculture'
-        )
-        
-        pair_id = db.insert_pair(
-            stmt_a_id, 
-            stmt_b_id, 
-            pair['similarity_score'],
-            pair['same_source']
-        )
-        
-        if pair_id:
-            saved_count += 1
+    # Pairs index into the statement store, whose DB ids Step 5 returned in order
+    pair_ids = db.insert_pairs_bulk(
+        (statement_ids[pair['index_a']], statement_ids[pair['index_b']], pair['similarity_score'],
+         pair['same_source'])
+        for pair in pairs
+    )
+    saved_count = sum(1 for pair_id in pair_ids if pair_id is not None)
     
     print(f"✓ Saved {saved_count} pairs to database")
     
@@ -197,9 +190,9 @@ def main():
     print(f"Completed at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     print(f"\n📊 Collection Statistics:")
     print(f"  Queries used: {len(queries)}")
-    print(f"  URLs found: {len(search_results)}")
+    print(f"  URLs found: {len(search_results)} (search) + {len(discovered_urls)} (sitemaps/feeds)")
     print(f"  Documents scraped: {len(documents)}")
-    print(f"  Success rate: {len(documents)/max(len(search_results),1)*100:.1f}%")
+    print(f"  Success rate: {len(documents)/max(len(search_results) + len(discovered_urls),1)*100:.1f}%")
     
     print(f"\n📝 Statement Statistics:")
     print(f"  Total statements: {extraction_stats['total_statements']}")
@@ -210,6 +203,7 @@ def main():
     print(f"  Total pairs generated: {len(pairs)}")
     print(f"  Same-source pairs: {sum(1 for p in pairs if p['same_source'])}")
     print(f"  Opinion pairs: {sum(1 for p in pairs if p['both_have_opinions'])}")
+    print(f"  Numeric-conflict pairs: {sum(1 for p in pairs if p.get('factual_candidate'))}")
     print(f"  Avg similarity: {sum(p['similarity_score'] for p in pairs)/max(len(pairs),1):.3f}")
     
     print(f"\n📁 Output Files:")
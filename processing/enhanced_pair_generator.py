@@ -5,6 +5,7 @@ Prioritizes same-source pairs and controversial topics
 from sentence_transformers import SentenceTransformer, util
 import numpy as np
 import config
+from processing.statement_store import StatementStore, as_statement_store
 
 class EnhancedPairGenerator:
     def __init__(self):
@@ -15,7 +16,8 @@ class EnhancedPairGenerator:
         """
         Compute embeddings for all statements
         """
-        texts = [s['text'] for s in statements]
+        statements = as_statement_store(statements)
+        texts = list(statements.texts())
         print(f"Computing embeddings for {len(texts)} statements...")
         embeddings = self.model.encode(texts, show_progress_bar=True, convert_to_tensor=True)
         return embeddings
@@ -23,7 +25,9 @@ class EnhancedPairGenerator:
     def generate_all_pairs(self, statements, embeddings, similarity_threshold=None):
         """
         Generate all valid statement pairs based on semantic similarity
+        Pairs reference statements by index into the StatementStore
         """
+        statements = as_statement_store(statements)
         threshold = similarity_threshold or config.SIMILARITY_THRESHOLD
         print(f"Generating statement pairs (threshold: {threshold})...")
         
@@ -34,41 +38,11 @@ class EnhancedPairGenerator:
         n = len(statements)
         
         for i in range(n):
-            for j in range(i+1, n):
-                similarity_score = similarity_matrix[i][j].item()
-                
-                # Check if similarity is above threshold
-                if similarity_score >= threshold:
-                    
-                    stmt_a = statements[i]
-                    stmt_b = statements[j]
-                    
-                    # Check if from same source
-                    same_source = (stmt_a.get('source_url') == stmt_b.get('source_url'))
-                    same_author = (stmt_a.get('author') == stmt_b.get('author'))
-                    
-                    # Both have opinions (better for inconsistency detection)
-                    both_have_opinions = (stmt_a.get('has_opinion', False) and 
-                                         stmt_b.get('has_opinion', False))
-                    
-                    # Calculate pair quality score
-                    quality_score = similarity_score
-                    if same_source:
-                        quality_score += 0.2  # Bonus for same source (self-inconsistency)
-                    if same_author:
-                        quality_score += 0.1  # Bonus for same author
-                    if both_have_opinions:
-                        quality_score += 0.15  # Bonus for opinion statements
-                    
-                    pairs.append({
-                        'statement_a': stmt_a,
-                        'statement_b': stmt_b,
-                        'similarity_score': similarity_score,
-                        'quality_score': quality_score,
-                        'same_source': same_source,
-                        'same_author': same_author,
-                        'both_have_opinions': both_have_opinions
-                    })
+            row = similarity_matrix[i][i+1:].cpu().numpy()
+            
+            # Only visit pairs above threshold
+            for offset in np.nonzero(row >= threshold)[0]:
+                pairs.append(statements.score_pair(i, i + 1 + int(offset), float(row[offset])))
         
         # Sort by quality score (descending)
         pairs.sort(key=lambda x: x['quality_score'], reverse=True)
@@ -83,19 +57,65 @@ class EnhancedPairGenerator:
         
         return pairs
     
-    def filter_diverse_pairs(self, pairs, max_pairs=500, max_per_source=None):
+    def generate_fact_pairs(self, statements, embeddings, fact_index):
+        """
+        Generate factual-inconsistency candidates from the numeric fact index
+        (same crop/scheme/entity, unit and year, but differing values)
+        """
+        statements = as_statement_store(statements)
+        candidates = fact_index.candidate_pairs()
+        if not candidates:
+            return []
+        
+        indices_a = [a for a, _, _ in candidates]
+        indices_b = [b for _, b, _ in candidates]
+        scores = util.pairwise_cos_sim(embeddings[indices_a], embeddings[indices_b]).tolist()
+        
+        pairs = []
+        for (i, j, fact_key), similarity_score in zip(candidates, scores):
+            pair = statements.score_pair(i, j, similarity_score)
+            pair['factual_candidate'] = True
+            pair['fact_key'] = fact_key
+            pairs.append(pair)
+        
+        print(f"Generated {len(pairs)} numeric-conflict candidate pairs")
+        return pairs
+    
+    def merge_fact_pairs(self, pairs, fact_pairs):
+        """
+        Flag similarity pairs that are also numeric conflicts and append the rest
+        """
+        pending = {(p['index_a'], p['index_b']): p for p in fact_pairs}
+        for pair in pairs:
+            fact_pair = pending.pop((pair['index_a'], pair['index_b']), None)
+            if fact_pair:
+                pair['factual_candidate'] = True
+                pair['fact_key'] = fact_pair['fact_key']
+        
+        pairs.extend(pending.values())
+        pairs.sort(key=lambda x: x['quality_score'], reverse=True)
+        return pairs
+    
+    def filter_diverse_pairs(self, pairs, max_pairs=500, max_per_source=None, statements=None):
         """
         Filter pairs to ensure diversity while prioritizing quality
+        With statements (a StatementStore), sources are compared by code through the pair
+        indices; otherwise pairs must carry statement_a/statement_b dicts
         """
         max_per_source = max_per_source or config.MAX_PAIRS_PER_SOURCE
+        if statements is not None:
+            source_codes = as_statement_store(statements).codes('source_url')
+            source_of = lambda pair, side: int(source_codes[pair[f'index_{side}']])
+        else:
+            source_of = lambda pair, side: pair[f'statement_{side}']['source_url']
         
         selected_pairs = []
         url_combination_counts = {}
         source_counts = {}
         
         for pair in pairs:
-            url_a = pair['statement_a']['source_url']
-            url_b = pair['statement_b']['source_url']
+            url_a = source_of(pair, 'a')
+            url_b = source_of(pair, 'b')
             
             # Create a unique key for this URL combination
             url_key = tuple(sorted([url_a, url_b]))
@@ -122,48 +142,71 @@ class EnhancedPairGenerator:
         """
         Sample pairs ensuring good distribution of different types
         """
-        # Separate into categories
-        same_source_opinion = [p for p in pairs if p['same_source'] and p['both_have_opinions']]
-        same_source_mixed = [p for p in pairs if p['same_source'] and not p['both_have_opinions']]
-        diff_source_opinion = [p for p in pairs if not p['same_source'] and p['both_have_opinions']]
-        diff_source_mixed = [p for p in pairs if not p['same_source'] and not p['both_have_opinions']]
+        # Numeric conflicts get their own reserved share (factual inconsistency)
+        factual = [p for p in pairs if p.get('factual_candidate')]
+        selected = factual[:int(target_count * config.FACTUAL_PAIR_SHARE)]
+        chosen = set(id(p) for p in selected)
+        remaining_target = target_count - len(selected)
+        
+        # Separate the rest into categories
+        rest = [p for p in pairs if id(p) not in chosen]
+        same_source_opinion = [p for p in rest if p['same_source'] and p['both_have_opinions']]
+        same_source_mixed = [p for p in rest if p['same_source'] and not p['both_have_opinions']]
+        diff_source_opinion = [p for p in rest if not p['same_source'] and p['both_have_opinions']]
+        diff_source_mixed = [p for p in rest if not p['same_source'] and not p['both_have_opinions']]
         
         print(f"\n📊 Pair Distribution:")
+        print(f"  Numeric conflicts: {len(factual)}")
         print(f"  Same source + opinions: {len(same_source_opinion)}")
         print(f"  Same source + mixed: {len(same_source_mixed)}")
         print(f"  Diff source + opinions: {len(diff_source_opinion)}")
         print(f"  Diff source + mixed: {len(diff_source_mixed)}")
         
         # Prioritize same-source pairs with opinions (best for inconsistency detection)
-        selected = []
-        
         # 50% from same source with opinions
-        selected.extend(same_source_opinion[:int(target_count * 0.5)])
+        selected.extend(same_source_opinion[:int(remaining_target * 0.5)])
         
         # 25% from same source mixed
-        selected.extend(same_source_mixed[:int(target_count * 0.25)])
+        selected.extend(same_source_mixed[:int(remaining_target * 0.25)])
         
         # 15% from different source with opinions
-        selected.extend(diff_source_opinion[:int(target_count * 0.15)])
+        selected.extend(diff_source_opinion[:int(remaining_target * 0.15)])
         
         # 10% from different source mixed
-        selected.extend(diff_source_mixed[:int(target_count * 0.10)])
+        selected.extend(diff_source_mixed[:int(remaining_target * 0.10)])
         
         # If we don't have enough, fill with remaining high-quality pairs
         if len(selected) < target_count:
-            remaining = [p for p in pairs if p not in selected]
+            chosen = set(id(p) for p in selected)
+            remaining = [p for p in pairs if id(p) not in chosen]
             selected.extend(remaining[:target_count - len(selected)])
         
         print(f"\n✓ Stratified sampling selected {len(selected)} pairs")
         return selected
     
-    def generate_pairs(self, statements, embeddings, max_pairs=500, use_stratified=True):
+    def attach_statements(self, statements, pairs):
+        """
+        Materialize statement dicts for the selected pairs only
+        """
+        for pair in pairs:
+            pair['statement_a'] = statements[pair['index_a']]
+            pair['statement_b'] = statements[pair['index_b']]
+        return pairs
+    
+    def generate_pairs(self, statements, embeddings, max_pairs=500, use_stratified=True, fact_index=None):
         """
         Main method to generate pairs with all enhancements
+        fact_index (NumericFactIndex) adds numeric-conflict candidates
         """
+        statements = as_statement_store(statements)
+        
         # Generate all candidate pairs
         all_pairs = self.generate_all_pairs(statements, embeddings)
         
+        if fact_index is not None:
+            fact_pairs = self.generate_fact_pairs(statements, embeddings, fact_index)
+            all_pairs = self.merge_fact_pairs(all_pairs, fact_pairs)
+        
         if not all_pairs:
             print("⚠️  No pairs found above similarity threshold")
             return []
@@ -172,20 +215,20 @@ class EnhancedPairGenerator:
         if use_stratified and len(all_pairs) > max_pairs:
             final_pairs = self.stratified_sampling(all_pairs, max_pairs)
         else:
-            final_pairs = self.filter_diverse_pairs(all_pairs, max_pairs)
+            final_pairs = self.filter_diverse_pairs(all_pairs, max_pairs, statements=statements)
         
-        return final_pairs
+        return self.attach_statements(statements, final_pairs)
 
 if __name__ == "__main__":
     # Test the pair generator
     print("Enhanced Pair Generator - Test Mode")
     
     # Mock statements for testing
-    test_statements = [
+    test_statements = StatementStore.from_records([
         {'text': 'Farmers need better MSP', 'source_url': 'url1', 'has_opinion': True},
         {'text': 'MSP should be increased', 'source_url': 'url1', 'has_opinion': True},
         {'text': 'Agriculture is important', 'source_url': 'url2', 'has_opinion': False},
-    ]
+    ])
     
     generator = EnhancedPairGenerator()
     embeddings = generator.compute_embeddings(test_statements)
@@ -4,6 +4,11 @@ Enhanced statement extractor with better filtering and opinion detection
 import spacy
 import re
 import config
+from processing.language_filter import LanguagePrefilter
+from processing.statement_store import StatementStoreBuilder
+from processing.numeric_facts import NumericFactIndex
+from processing.near_duplicates import DocumentDeduplicator
+from processing.text_cleaning import clean_statement_text, clean_statement_texts
 
 class EnhancedStatementExtractor:
     def __init__(self):
@@ -29,6 +34,15 @@ class EnhancedStatementExtractor:
             'msp', 'apmc', 'mandi', 'subsidy', 'loan', 'kisan', 'agricultural',
             'rural', 'wheat', 'rice', 'paddy', 'sugarcane', 'cotton', 'dairy'
         ]
+        
+        # Drops Hindi/Hinglish paragraphs before they reach SpaCy
+        self.prefilter = LanguagePrefilter() if config.LANGUAGE_PREFILTER_ENABLED else None
+        
+        # Sends one copy of each wire-service story through SpaCy
+        self.deduplicator = DocumentDeduplicator() if config.NEAR_DUPLICATE_ENABLED else None
+        
+        # (key, unit, value, year) facts of the last extraction run
+        self.fact_index = NumericFactIndex()
     
     def is_relevant_to_agriculture(self, text):
         """
@@ -79,20 +93,77 @@ class EnhancedStatementExtractor:
         
         return True
     
-    def extract_statements(self, text):
+    def iter_text_chunks(self, text, chunk_size=None):
+        """
+        Split text into bounded chunks, preferring paragraph boundaries
+        Falls back to line breaks, sentence ends and spaces for oversized paragraphs
+        """
+        chunk_size = chunk_size or config.EXTRACTION_CHUNK_SIZE
+        start = 0
+        text_length = len(text)
+        
+        while text_length - start > chunk_size:
+            end = start + chunk_size
+            cut = -1
+            for separator in ('\n\n', '\n', '. ', '? ', '! ', ' '):
+                position = text.rfind(separator, start + 1, end)
+                if position != -1:
+                    cut = position + len(separator)
+                    break
+            if cut == -1:
+                cut = end  # No boundary at all, hard cut
+            
+            yield text[start:cut]
+            start = cut
+        
+        if start < text_length:
+            yield text[start:]
+    
+    def iter_sentences(self, text):
+        """
+        Stream sentences from text one chunk at a time
+        The last sentence of each chunk is carried into the next chunk so that
+        sentences straddling a chunk edge are parsed whole
+        """
+        chunks = self.iter_text_chunks(text)
+        chunk = next(chunks, None)
+        carry = ''
+        
+        while chunk is not None:
+            next_chunk = next(chunks, None)
+            doc = self.nlp(carry + chunk)
+            sents = list(doc.sents)
+            carry = ''
+            
+            if next_chunk is not None and sents:
+                last = sents.pop()
+                carry = doc.text[last.start_char:]
+                # A sentence this long can never become a valid statement
+                if len(carry.strip()) > config.MAX_STATEMENT_LENGTH:
+                    carry = ''
+            
+            for sent in sents:
+                yield sent.text.strip()
+            
+            # Release the Doc before parsing the next chunk
+            del doc, sents
+            chunk = next_chunk
+    
+    def extract_statements(self, text, source_url=None):
         """
         Extract individual statements with enhanced filtering
         """
         if not text or len(text) < config.MIN_STATEMENT_LENGTH:
             return []
         
-        # Process with SpaCy
-        doc = self.nlp(text[:1000000])  # Limit text length for processing
+        # Skip non-English paragraphs before any NLP work
+        if self.prefilter:
+            text = self.prefilter.filter_text(text, source_url=source_url)
+            if len(text) < config.MIN_STATEMENT_LENGTH:
+                return []
         
-        statements = []
-        for sent in doc.sents:
-            sent_text = sent.text.strip()
-            
+        candidates = []
+        for sent_text in self.iter_sentences(text):
             # Basic validation
             if not self.is_valid_statement(sent_text):
                 continue
@@ -101,9 +172,11 @@ class EnhancedStatementExtractor:
             if not self.is_relevant_to_agriculture(sent_text):
                 continue
             
-            # Clean the statement
-            sent_text = self.clean_statement(sent_text)
-            
+            candidates.append(sent_text)
+        
+        statements = []
+        # Clean all kept sentences in one batch
+        for sent_text in clean_statement_texts(candidates):
             # Add metadata about statement type
             statement_info = {
                 'text': sent_text,
@@ -119,26 +192,15 @@ class EnhancedStatementExtractor:
     def clean_statement(self, text):
         """
         Clean and normalize statement text
+        (whitespace, URLs, leading/trailing punctuation)
         """
-        # Remove extra whitespace
-        text = re.sub(r'\s+', ' ', text)
-        
-        # Remove URLs
-        text = re.sub(r'http\S+|www\.\S+', '', text)
-        
-        # Fix common issues
-        text = text.replace('\n', ' ').replace('\t', ' ')
-        
-        # Remove leading/trailing punctuation except sentence-ending ones
-        text = text.strip(',.;:- ')
-        
-        return text.strip()
+        return clean_statement_text(text)
     
     def extract_from_document(self, document):
         """
         Extract statements from a document dict with metadata
         """
-        statements = self.extract_statements(document.get('text', ''))
+        statements = self.extract_statements(document.get('text', ''), source_url=document.get('url'))
         
         # Add document metadata to each statement
         result = []
@@ -159,19 +221,31 @@ class EnhancedStatementExtractor:
     def extract_from_multiple_documents(self, documents, verbose=True):
         """
         Extract statements from multiple documents with statistics
+        Returns a columnar StatementStore
         """
-        all_statements = []
+        all_statements = StatementStoreBuilder()
+        self.fact_index = NumericFactIndex()
         stats = {
             'total_documents': len(documents),
             'documents_processed': 0,
             'total_statements': 0,
             'opinion_statements': 0,
+            'numeric_facts': 0,
             'statements_per_source': {}
         }
         
+        if self.deduplicator:
+            self.deduplicator.reset_stats()
+            documents = self.deduplicator.deduplicate(documents)
+            stats['near_duplicates'] = self.deduplicator.stats['duplicates_removed']
+        
         for doc in documents:
             statements = self.extract_from_document(doc)
-            all_statements.extend(statements)
+            
+            # Index numeric facts under each statement's position in the store
+            for stmt in statements:
+                self.fact_index.add(len(all_statements), stmt['text'])
+                all_statements.append(stmt)
             
             if statements:
                 stats['documents_processed'] += 1
@@ -185,6 +259,8 @@ class EnhancedStatementExtractor:
                     opinion_count = sum(1 for s in statements if s['has_opinion'])
                     print(f"  ✓ {len(statements)} statements ({opinion_count} with opinions) from {doc['url'][:50]}...")
         
+        stats['numeric_facts'] = self.fact_index.fact_count
+        
         if verbose:
             print(f"\n📊 Extraction Statistics:")
             print(f"  Total documents: {stats['total_documents']}")
@@ -192,8 +268,17 @@ class EnhancedStatementExtractor:
             print(f"  Total statements: {stats['total_statements']}")
             print(f"  Statements with opinions: {stats['opinion_statements']} ({stats['opinion_statements']/max(stats['total_statements'],1)*100:.1f}%)")
             print(f"  Avg statements per document: {stats['total_statements']/max(stats['documents_processed'],1):.1f}")
+            print(f"  Numeric facts indexed: {stats['numeric_facts']}")
+        
+        if self.prefilter:
+            stats['prefilter'] = self.prefilter.stats
+            if verbose:
+                self.prefilter.print_stats()
+        
+        if self.deduplicator and verbose:
+            self.deduplicator.print_stats()
         
-        return all_statements, stats
+        return all_statements.build(), stats
 
 if __name__ == "__main__":
     # Test the extractor
@@ -0,0 +1,168 @@
+"""
+Cheap script and language prefilter that runs before SpaCy
+Drops (or routes aside) Hindi and Hinglish paragraphs the English pipeline would discard anyway
+Scraped text reaches it cleaned onto one line, so paragraphs are checked sentence by sentence
+"""
+import re
+import numpy as np
+import config
+
+class LanguagePrefilter:
+    def __init__(self, action=None, use_language_id=None):
+        self.action = action or config.NON_ENGLISH_ACTION  # 'drop' or 'route'
+        if use_language_id is None:
+            use_language_id = config.LANGUAGE_ID_ENABLED
+        self.use_language_id = use_language_id
+
+        # Very common English function words
+        self.english_markers = {
+            'the', 'a', 'an', 'and', 'or', 'of', 'to', 'in', 'on', 'for', 'with',
+            'is', 'are', 'was', 'were', 'be', 'been', 'it', 'this', 'that', 'they',
+            'he', 'she', 'we', 'you', 'not', 'by', 'from', 'at', 'as', 'has', 'have',
+            'will', 'would', 'can', 'their', 'which', 'but', 'if', 'should'
+        }
+
+        # Romanised Hindi function words that rarely occur in English text
+        self.hinglish_markers = {
+            'hai', 'hain', 'nahi', 'nahin', 'kya', 'aur', 'ke', 'ki', 'ko', 'se',
+            'bhi', 'toh', 'mein', 'yeh', 'ye', 'woh', 'wo', 'kar', 'karna', 'raha',
+            'rahe', 'rahi', 'tha', 'thi', 'the', 'bahut', 'sab', 'kuch', 'lekin',
+            'apne', 'unka', 'unki', 'hum', 'humko', 'tum', 'aap', 'kyun', 'kaise',
+            'sirf', 'abhi', 'jab', 'tab', 'agar', 'wala', 'wali', 'gaya', 'diya'
+        }
+        # 'the' is shared with Hindi ("was"), so it never counts towards Hinglish
+        self.hinglish_markers -= self.english_markers
+
+        self.word_pattern = re.compile(r"[a-z']+")
+        self.paragraph_pattern = re.compile(r'\n+')
+        # Sentence ends; cleaning strips the danda, so a Devanagari word followed by a
+        # capitalised Latin one also ends a sentence
+        self.sentence_pattern = re.compile(r'(?<=[.!?\u0964\u0965])\s+|(?<=[\u0900-\u097F])\s+(?=[A-Z])')
+
+        self.routed = []  # Non-English sentences kept aside when action == 'route'
+        self.reset_stats()
+
+    def reset_stats(self):
+        """Reset skip counters"""
+        self.stats = {
+            'paragraphs_checked': 0,
+            'paragraphs_skipped': 0,
+            'chars_checked': 0,
+            'chars_skipped': 0,
+            'skipped_by_reason': {'script': 0, 'language_id': 0}
+        }
+
+    def script_ratios(self, paragraphs):
+        """
+        Compute Latin and Devanagari letter ratios for many paragraphs at once
+        Counts character classes over one code point array, then sums per paragraph
+        """
+        if not paragraphs:
+            return np.zeros(0), np.zeros(0)
+
+        codes = np.frombuffer(''.join(paragraphs).encode('utf-32-le'), dtype=np.uint32)
+        lengths = np.fromiter((len(p) for p in paragraphs), dtype=np.int64, count=len(paragraphs))
+        offsets = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+
+        latin = ((codes >= 0x41) & (codes <= 0x5A)) | ((codes >= 0x61) & (codes <= 0x7A))
+        devanagari = ((codes >= 0x0900) & (codes <= 0x097F)) | ((codes >= 0xA8E0) & (codes <= 0xA8FF))
+        # Letters of any other script (skips Latin-1 accents, punctuation blocks and emoji)
+        other = ((codes >= 0x0370) & ~devanagari
+                 & ~((codes >= 0x2000) & (codes <= 0x2BFF))
+                 & (codes < 0x1F000))
+
+        # reduceat misbehaves on empty trailing segments, so pad one sentinel element
+        latin_counts = np.add.reduceat(np.append(latin, False).astype(np.int64), offsets)
+        devanagari_counts = np.add.reduceat(np.append(devanagari, False).astype(np.int64), offsets)
+        other_counts = np.add.reduceat(np.append(other, False).astype(np.int64), offsets)
+        empty = lengths == 0
+        latin_counts[empty] = devanagari_counts[empty] = other_counts[empty] = 0
+
+        letters = np.maximum(latin_counts + devanagari_counts + other_counts, 1)
+        return latin_counts / letters, devanagari_counts / letters
+
+    def looks_hinglish(self, paragraph):
+        """
+        Lightweight language ID: compare English and romanised Hindi function word hits
+        """
+        words = self.word_pattern.findall(paragraph.lower())
+        if len(words) < 8:
+            return False
+
+        english_hits = sum(1 for w in words if w in self.english_markers)
+        hinglish_hits = sum(1 for w in words if w in self.hinglish_markers)
+        return hinglish_hits > english_hits
+
+    def filter_text(self, text, source_url=None):
+        """
+        Return only the English sentences of text, paragraphs joined by newlines
+        """
+        sentences = []
+        paragraph_of = []  # Paragraph number of each sentence
+        for number, paragraph in enumerate(self.paragraph_pattern.split(text)):
+            for sentence in self.sentence_pattern.split(paragraph):
+                if sentence.strip():
+                    sentences.append(sentence)
+                    paragraph_of.append(number)
+        if not sentences:
+            return ''
+
+        if text.isascii():
+            # No Devanagari possible, skip the code point pass
+            latin_ratios = devanagari_ratios = None
+        else:
+            latin_ratios, devanagari_ratios = self.script_ratios(sentences)
+
+        kept = []
+        for i, sentence in enumerate(sentences):
+            self.stats['paragraphs_checked'] += 1
+            self.stats['chars_checked'] += len(sentence)
+
+            reason = None
+            if latin_ratios is not None and latin_ratios[i] < config.MIN_LATIN_SCRIPT_RATIO:
+                reason = 'script'
+            elif self.use_language_id and self.looks_hinglish(sentence):
+                reason = 'language_id'
+
+            if reason is None:
+                kept.append((paragraph_of[i], sentence))
+                continue
+
+            self.stats['paragraphs_skipped'] += 1
+            self.stats['chars_skipped'] += len(sentence)
+            self.stats['skipped_by_reason'][reason] += 1
+
+            if self.action == 'route':
+                self.routed.append({
+                    'text': sentence,
+                    'source_url': source_url,
+                    'reason': reason,
+                    'devanagari_ratio': float(devanagari_ratios[i]) if devanagari_ratios is not None else 0.0
+                })
+
+        paragraphs = {}
+        for number, sentence in kept:
+            paragraphs.setdefault(number, []).append(sentence)
+        return '\n'.join(' '.join(paragraph) for paragraph in paragraphs.values())
+
+    def print_stats(self):
+        """Print how much NLP work the prefilter saved"""
+        stats = self.stats
+        print(f"\n🌐 Language Prefilter:")
+        print(f"  Sentences checked: {stats['paragraphs_checked']}")
+        print(f"  Sentences skipped: {stats['paragraphs_skipped']} "
+              f"(script: {stats['skipped_by_reason']['script']}, "
+              f"language ID: {stats['skipped_by_reason']['language_id']})")
+        print(f"  NLP characters skipped: {stats['chars_skipped']:,} "
+              f"({stats['chars_skipped']/max(stats['chars_checked'],1)*100:.1f}%)")
+        if self.action == 'route':
+            print(f"  Routed non-English sentences: {len(self.routed)}")
+
+if __name__ == "__main__":
+    # Test the prefilter
+    prefilter = LanguagePrefilter(action='route', use_language_id=True)
+    test_text = """MSP for wheat should be increased to support farmers in Punjab.
+किसानों को फसल का उचित मूल्य मिलना चाहिए।
+Bhai MSP toh kabhi nahi milta, sab kuch sirf kaagaz pe hai aur kisan pareshan hai."""
+    print(prefilter.filter_text(test_text))
+    prefilter.print_stats()
@@ -0,0 +1,158 @@
+"""
+Near-duplicate document detection with SimHash
+Wire-service stories (PTI, IANS, Reuters) are republished almost verbatim by many sites;
+every copy would go through SpaCy and yield the same statements. Documents whose 64-bit
+SimHash fingerprints are within a few bits of an earlier one are dropped or merged into it
+"""
+import re
+import zlib
+import numpy as np
+import config
+
+FINGERPRINT_BITS = 64
+
+# Bit i of a fingerprint, as a row of 0/1 per byte (little-endian)
+_BIT_TABLE = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1, bitorder='little')
+
+def _mix64(values):
+    """splitmix64 finalizer: spreads every input bit over the whole 64-bit word"""
+    values = values ^ (values >> np.uint64(30))
+    values = values * np.uint64(0xbf58476d1ce4e5b9)
+    values = values ^ (values >> np.uint64(27))
+    values = values * np.uint64(0x94d049bb133111eb)
+    return values ^ (values >> np.uint64(31))
+
+def simhash(text, shingle_size=3):
+    """
+    64-bit SimHash of a text over word shingles, weighted by shingle frequency
+    Texts that share most shingles get fingerprints a few bits apart
+    """
+    words = re.findall(r"[a-z0-9]+", text.lower())
+    if not words:
+        return 0
+
+    # Hash each distinct word once, then combine neighbouring word hashes into shingle hashes
+    word_ids = {}
+    ids = np.fromiter((word_ids.setdefault(word, len(word_ids)) for word in words), dtype=np.int64, count=len(words))
+    crcs = np.fromiter((zlib.crc32(word.encode('utf-8')) for word in word_ids), dtype=np.uint64, count=len(word_ids))
+    word_hashes = _mix64(crcs)[ids]
+
+    size = min(shingle_size, len(words))
+    shingles = np.zeros(len(words) - size + 1, dtype=np.uint64)
+    for offset in range(size):
+        shingles = _mix64(shingles + word_hashes[offset:len(word_hashes) - size + 1 + offset])
+    shingles, weights = np.unique(shingles, return_counts=True)
+
+    # (shingles, 64) matrix of hash bits -> weighted vote per bit
+    bits = _BIT_TABLE[shingles.view(np.uint8)].reshape(len(shingles), FINGERPRINT_BITS)
+    # A bit is set when the shingles having it outweigh the ones that do not
+    ones = weights.astype(np.float32) @ bits.astype(np.float32)
+    fingerprint = np.packbits(ones * 2 > weights.sum(), bitorder='little')
+    return int.from_bytes(fingerprint.tobytes(), 'little')
+
+def hamming_distance(a, b):
+    return (a ^ b).bit_count()
+
+class NearDuplicateIndex:
+    def __init__(self, max_distance=None):
+        """
+        max_distance: fingerprints at most this many bits apart are near-duplicates
+        Fingerprints are split into max_distance + 1 bands; two fingerprints within
+        max_distance bits agree exactly on at least one band, so lookups only compare
+        against fingerprints sharing a band
+        """
+        self.max_distance = config.NEAR_DUPLICATE_DISTANCE if max_distance is None else max_distance
+        num_bands = self.max_distance + 1
+        edges = np.linspace(0, FINGERPRINT_BITS, num_bands + 1).astype(int)
+        self.bands = [(int(lo), (1 << int(hi - lo)) - 1) for lo, hi in zip(edges[:-1], edges[1:])]
+        self.tables = [{} for _ in self.bands]  # band value -> list of item ids
+        self.fingerprints = []
+
+    def _band_values(self, fingerprint):
+        return [(fingerprint >> shift) & mask for shift, mask in self.bands]
+
+    def find(self, fingerprint):
+        """Id of the closest indexed fingerprint within max_distance, or None"""
+        best, best_distance = None, self.max_distance + 1
+        for table, value in zip(self.tables, self._band_values(fingerprint)):
+            for item in table.get(value, ()):
+                distance = hamming_distance(fingerprint, self.fingerprints[item])
+                if distance < best_distance:
+                    best, best_distance = item, distance
+        return best
+
+    def add(self, fingerprint):
+        """Index a fingerprint; returns its id"""
+        item = len(self.fingerprints)
+        self.fingerprints.append(fingerprint)
+        for table, value in zip(self.tables, self._band_values(fingerprint)):
+            table.setdefault(value, []).append(item)
+        return item
+
+class DocumentDeduplicator:
+    def __init__(self, action=None, max_distance=None, min_words=None):
+        """
+        action: 'merge' keeps the longest copy of each story and lists the other copies'
+                URLs under its 'mirror_urls'; 'drop' keeps the first copy as is
+        min_words: shorter documents (e.g. Reddit comments) are too small to fingerprint
+                   reliably and always pass through
+        """
+        self.action = action or config.NEAR_DUPLICATE_ACTION
+        self.max_distance = max_distance
+        self.min_words = config.NEAR_DUPLICATE_MIN_WORDS if min_words is None else min_words
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.stats = {
+            'documents_checked': 0,
+            'duplicates_removed': 0,
+            'chars_checked': 0,
+            'chars_skipped': 0
+        }
+
+    def deduplicate(self, documents):
+        """
+        Return documents with near-duplicates removed, in first-seen order
+        Documents are not copied; with action 'merge' kept documents gain 'mirror_urls'
+        """
+        index = NearDuplicateIndex(self.max_distance)
+        kept = []
+        positions = []  # index id -> position of its document in kept
+        for doc in documents:
+            text = doc.get('text') or ''
+            self.stats['documents_checked'] += 1
+            self.stats['chars_checked'] += len(text)
+            if len(text.split()) < self.min_words:
+                kept.append(doc)
+                continue
+
+            fingerprint = simhash(text)
+            match = index.find(fingerprint)
+            if match is None:
+                index.add(fingerprint)
+                positions.append(len(kept))
+                kept.append(doc)
+                continue
+
+            # Near-duplicate of an earlier document: only one copy goes to SpaCy
+            position = positions[match]
+            original = kept[position]
+            self.stats['duplicates_removed'] += 1
+            if self.action == 'merge':
+                keep, other = (doc, original) if len(text) > len(original.get('text') or '') else (original, doc)
+                keep['mirror_urls'] = (keep.get('mirror_urls', []) + [other.get('url')]
+                                       + other.pop('mirror_urls', []))
+                kept[position] = keep
+                self.stats['chars_skipped'] += len(other.get('text') or '')
+            else:
+                self.stats['chars_skipped'] += len(text)
+        return kept
+
+    def print_stats(self):
+        """Print how much extraction work near-duplicate removal saved"""
+        stats = self.stats
+        print(f"\n🧬 Near-duplicate documents:")
+        print(f"  Documents checked: {stats['documents_checked']}")
+        print(f"  Near-duplicates removed: {stats['duplicates_removed']} ({self.action})")
+        print(f"  NLP characters skipped: {stats['chars_skipped']:,} "
+              f"({stats['chars_skipped']/max(stats['chars_checked'],1)*100:.1f}%)")
@@ -0,0 +1,210 @@
+"""
+Numeric fact index for factual-inconsistency candidate mining
+Pulls (key, unit, value, year) facts out of statements at extraction time and joins them
+to find statements that state different numbers for the same crop, scheme or entity
+Thresholds come from config unless passed in, so the standalone GPU script can use the
+index without loading the pipeline config
+"""
+import re
+
+# Surface forms -> normalized key. Crops take precedence over topics, so
+# "MSP for wheat" and "wheat MSP" both key on wheat
+CROP_KEYS = {
+    'wheat': 'wheat', 'rice': 'rice', 'paddy': 'rice', 'pulses': 'pulses',
+    'sugarcane': 'sugarcane', 'cotton': 'cotton', 'maize': 'maize', 'mustard': 'mustard',
+    'soybean': 'soybean', 'onion': 'onion', 'onions': 'onion', 'tomato': 'tomato',
+    'potato': 'potato', 'jowar': 'jowar', 'bajra': 'bajra', 'ragi': 'ragi',
+    'tur': 'tur', 'arhar': 'tur', 'moong': 'moong', 'urad': 'urad', 'chana': 'gram'
+}
+
+TOPIC_KEYS = {
+    'msp': 'msp', 'minimum support price': 'msp',
+    'pm-kisan': 'pm_kisan', 'pm kisan': 'pm_kisan', 'pmkisan': 'pm_kisan',
+    'pmfby': 'pmfby', 'crop insurance': 'pmfby', 'kisan credit card': 'kcc', 'kcc': 'kcc',
+    'loan waiver': 'loan_waiver', 'farm loan': 'farm_loan', 'subsidy': 'subsidy',
+    'fertilizer': 'fertilizer', 'fertiliser': 'fertilizer', 'urea': 'urea', 'dap': 'dap',
+    'procurement': 'procurement', 'export': 'exports', 'exports': 'exports',
+    'farmer income': 'farmer_income', 'farmers income': 'farmer_income',
+    "farmers' income": 'farmer_income', 'suicide': 'farmer_suicide', 'suicides': 'farmer_suicide',
+    'gdp': 'agri_gdp', 'groundwater': 'groundwater', 'irrigation': 'irrigation',
+    'stubble': 'stubble_burning', 'apmc': 'apmc', 'mandi': 'apmc'
+}
+
+FACT_KEYS = {**TOPIC_KEYS, **CROP_KEYS}
+
+SCALES = {
+    'crore': 1e7, 'crores': 1e7, 'cr': 1e7, 'lakh': 1e5, 'lakhs': 1e5, 'lac': 1e5,
+    'billion': 1e9, 'bn': 1e9, 'million': 1e6, 'mn': 1e6, 'thousand': 1e3
+}
+
+KEY_PATTERN = re.compile(
+    r'\b(' + '|'.join(re.escape(k) for k in sorted(FACT_KEYS, key=len, reverse=True)) + r')\b',
+    re.I
+)
+
+SCALE_WORD = r'(?:crores?|cr|lakhs?|lac|billion|bn|million|mn|thousand)\b'
+
+# One pass over the statement: optional currency, number, optional scale (compound
+# ones like "lakh crore" multiply), optional unit
+NUMBER_PATTERN = re.compile(
+    r'(?P<currency>₹|rs\.?|inr|rupees?)?\s*'
+    r'(?P<number>\d{1,3}(?:,\d{2,3})+(?:\.\d+)?|\d+(?:\.\d+)?)'
+    r'\s*(?P<scale>' + SCALE_WORD + r'(?:\s+' + SCALE_WORD + r')*)?\b'
+    r'\s*(?P<unit>%|per\s*cent|percent|(?:per|/)\s*quintal|(?:million\s+|lakh\s+)?tonnes?|tons?|'
+    r'quintals?|hectares?|ha\b|acres?|rupees?)?',
+    re.I
+)
+
+YEAR_PATTERN = re.compile(r'\b(19[5-9]\d|20[0-4]\d)(?:\s*[-–/]\s*\d{2,4})?\b')
+
+class NumericFactIndex:
+    def __init__(self, value_tolerance=None, fanout=None, max_per_group=None):
+        """
+        value_tolerance, fanout, max_per_group: default to config.FACT_VALUE_TOLERANCE,
+        config.FACT_PAIR_FANOUT and config.MAX_FACT_PAIRS_PER_KEY
+        """
+        if None in (value_tolerance, fanout, max_per_group):
+            import config  # Only needed for thresholds left to the pipeline config
+            value_tolerance = value_tolerance or config.FACT_VALUE_TOLERANCE
+            fanout = fanout or config.FACT_PAIR_FANOUT
+            max_per_group = max_per_group or config.MAX_FACT_PAIRS_PER_KEY
+        self.value_tolerance = value_tolerance
+        self.fanout = fanout
+        self.max_per_group = max_per_group
+        self.groups = {}  # (key, unit, year) -> list of (value, statement_index)
+        self.fact_count = 0
+
+    @classmethod
+    def from_store(cls, statements, **thresholds):
+        """Build an index over every statement of a StatementStore"""
+        index = cls(**thresholds)
+        for i, text in enumerate(statements.texts()):
+            index.add(i, text)
+        return index
+
+    def extract_facts(self, text):
+        """
+        Extract (key, unit, value, year) tuples from a statement
+        Each number is attached to the closest crop mention, or the closest
+        scheme/entity mention when no crop is named
+        """
+        mentions = [(m.start(), m.group(1).lower()) for m in KEY_PATTERN.finditer(text)]
+        if not mentions:
+            return []
+        keys = [(pos, CROP_KEYS[word]) for pos, word in mentions if word in CROP_KEYS]
+        keys = keys or [(pos, TOPIC_KEYS[word]) for pos, word in mentions]
+
+        year_match = YEAR_PATTERN.search(text)
+        year = int(year_match.group(1)) if year_match else None
+        year_spans = [m.span(1) for m in YEAR_PATTERN.finditer(text)]
+
+        facts = []
+        for match in NUMBER_PATTERN.finditer(text):
+            currency, scale, unit = match.group('currency'), match.group('scale'), match.group('unit')
+            if not (currency or scale or unit):
+                continue  # Bare numbers are too ambiguous
+            if match.span('number') in year_spans:
+                continue
+
+            value = float(match.group('number').replace(',', ''))
+            for word in (scale or '').lower().split():
+                value *= SCALES[word]
+
+            unit = (unit or '').lower()
+            if unit in ('%', 'percent') or unit.startswith('per') and 'cent' in unit:
+                unit = 'percent'
+            elif 'quintal' in unit and ('per' in unit or '/' in unit):
+                unit = 'inr_per_quintal'
+            elif 'ton' in unit:
+                if unit.startswith('million'):
+                    value *= 1e6
+                elif unit.startswith('lakh'):
+                    value *= 1e5
+                unit = 'tonnes'
+            elif 'quintal' in unit:
+                unit = 'quintal'
+            elif unit.startswith('ha') or unit.startswith('hectare'):
+                unit = 'hectare'
+            elif unit.startswith('acre'):
+                unit = 'acre'
+            elif currency or unit.startswith('rupee'):
+                unit = 'inr'
+            else:
+                unit = 'count'
+
+            position = match.start('number')
+            key = min(keys, key=lambda k: abs(k[0] - position))[1]
+            facts.append((key, unit, value, year))
+
+        return facts
+
+    def add(self, statement_index, text):
+        """Index all facts of one statement"""
+        for key, unit, value, year in self.extract_facts(text):
+            self.groups.setdefault((key, unit, year), []).append((value, statement_index))
+            self.fact_count += 1
+
+    def _same_value(self, a, b):
+        return abs(a - b) <= self.value_tolerance * max(abs(a), abs(b), 1e-9)
+
+    def candidate_pairs(self, fanout=None, max_per_group=None):
+        """
+        Join facts on (key, unit, year) and emit statement pairs with differing values
+        Facts are sorted by value and each one is paired with up to `fanout` facts from
+        the neighbouring value buckets, so the join stays near-linear
+        Returns a list of (index_a, index_b, fact_key) with index_a < index_b
+        """
+        fanout = fanout or self.fanout
+        max_per_group = max_per_group or self.max_per_group
+        seen = set()
+        candidates = []
+
+        for (key, unit, year), facts in self.groups.items():
+            if len(facts) < 2:
+                continue
+
+            # Bucket equal values together
+            facts = sorted(facts)
+            buckets = [[facts[0]]]
+            for fact in facts[1:]:
+                if self._same_value(fact[0], buckets[-1][0][0]):
+                    buckets[-1].append(fact)
+                else:
+                    buckets.append([fact])
+            if len(buckets) < 2:
+                continue
+
+            group_count = 0
+            for b, bucket in enumerate(buckets):
+                partners = [f for nb in buckets[b + 1:b + 1 + fanout] for f in nb[:fanout]]
+                for _, stmt_a in bucket[:fanout]:
+                    for _, stmt_b in partners[:fanout]:
+                        if stmt_a == stmt_b:
+                            continue
+                        pair = (min(stmt_a, stmt_b), max(stmt_a, stmt_b))
+                        if pair in seen:
+                            continue
+                        seen.add(pair)
+                        candidates.append((pair[0], pair[1], key))
+                        group_count += 1
+                    if group_count >= max_per_group:
+                        break
+                if group_count >= max_per_group:
+                    break
+
+        return candidates
+
+if __name__ == "__main__":
+    # Test the index
+    index = NumericFactIndex()
+    test_statements = [
+        "The MSP for wheat was raised to ₹2,275 per quintal for 2023-24.",
+        "Farmers say the wheat MSP of Rs 2,125 per quintal in 2023 is too low.",
+        "PM-KISAN has transferred over ₹2.8 lakh crore to farmers.",
+        "Only ₹2 lakh crore has reached farmers under PM Kisan so far.",
+        "Paddy procurement rose 12% this season.",
+    ]
+    for i, text in enumerate(test_statements):
+        index.add(i, text)
+        print(f"{i}: {index.extract_facts(text)}")
+    print(f"\nCandidate pairs: {index.candidate_pairs()}")
@@ -0,0 +1,251 @@
+"""
+Compact columnar storage for extracted statements
+Replaces lists of 8-key dicts with NumPy columns: one UTF-8 text buffer with offsets,
+dictionary-encoded metadata and a packed opinion bitmask
+"""
+import json
+from array import array
+import numpy as np
+
+STATEMENT_FIELDS = ('text', 'source_url', 'author', 'date', 'domain',
+                    'source_type', 'has_opinion', 'word_count')
+
+# Low-cardinality columns stored as int32 codes into a category list (-1 = None)
+CATEGORICAL_FIELDS = ('source_url', 'domain', 'author', 'source_type', 'date')
+
+# Pair quality score = similarity plus these bonuses
+SAME_SOURCE_BONUS = 0.2  # Same article (self-inconsistency)
+SAME_AUTHOR_BONUS = 0.1
+OPINION_BONUS = 0.15  # Both statements carry opinions
+
+class StatementStore:
+    def __init__(self, text_buffer, text_offsets, codes, categories, opinion_bits, word_counts):
+        self._text = text_buffer  # bytes, all statement texts back to back
+        self._offsets = text_offsets  # int64, len(store) + 1 entries
+        self._codes = codes  # field -> int32 code array
+        self._categories = categories  # field -> list of distinct values
+        self._opinion_bits = opinion_bits  # uint8, np.packbits of has_opinion
+        self._word_counts = word_counts  # int32
+        self._count = len(text_offsets) - 1
+        self._opinion_mask = None
+
+    @classmethod
+    def from_records(cls, records):
+        """Build a store from an iterable of statement dicts"""
+        builder = StatementStoreBuilder()
+        builder.extend(records)
+        return builder.build()
+
+    @classmethod
+    def from_json(cls, filepath):
+        """Load a statements.json file (list of statement dicts)"""
+        with open(filepath, 'r', encoding='utf-8') as f:
+            return cls.from_records(json.load(f))
+
+    @classmethod
+    def load(cls, filepath):
+        """Load a store written by save()"""
+        with np.load(filepath, allow_pickle=False) as data:
+            categories = json.loads(data['categories'].tobytes().decode('utf-8'))
+            codes = {field: data[f'{field}_codes'] for field in CATEGORICAL_FIELDS}
+            return cls(
+                data['text'].tobytes(),
+                data['offsets'],
+                codes,
+                categories,
+                data['opinion_bits'],
+                data['word_counts']
+            )
+
+    def save(self, filepath):
+        """Save the store as a compressed .npz file"""
+        arrays = {
+            'text': np.frombuffer(self._text, dtype=np.uint8),
+            'offsets': self._offsets,
+            'opinion_bits': self._opinion_bits,
+            'word_counts': self._word_counts,
+            'categories': np.frombuffer(json.dumps(self._categories).encode('utf-8'), dtype=np.uint8)
+        }
+        for field in CATEGORICAL_FIELDS:
+            arrays[f'{field}_codes'] = self._codes[field]
+        np.savez_compressed(filepath, **arrays)
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, index):
+        """Materialize one statement as a dict (same shape as the extractor output)"""
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError('statement index out of range')
+
+        record = {'text': self.text(index)}
+        for field in CATEGORICAL_FIELDS:
+            record[field] = self.value(field, index)
+        record['has_opinion'] = bool(self.opinion_mask[index])
+        record['word_count'] = int(self._word_counts[index])
+        return {field: record[field] for field in STATEMENT_FIELDS}
+
+    def __iter__(self):
+        for i in range(self._count):
+            yield self[i]
+
+    def text_view(self, index):
+        """Zero-copy view of a statement's UTF-8 bytes"""
+        return memoryview(self._text)[self._offsets[index]:self._offsets[index + 1]]
+
+    def text(self, index):
+        """Decoded text of a single statement"""
+        return self._text[self._offsets[index]:self._offsets[index + 1]].decode('utf-8')
+
+    def texts(self):
+        """Iterate over all statement texts"""
+        text, offsets = self._text, self._offsets
+        for i in range(self._count):
+            yield text[offsets[i]:offsets[i + 1]].decode('utf-8')
+
+    def codes(self, field):
+        """Integer codes of a dictionary-encoded column (-1 means None)"""
+        return self._codes[field]
+
+    def categories(self, field):
+        """Distinct values of a dictionary-encoded column"""
+        return self._categories[field]
+
+    def value(self, field, index):
+        """Decoded value of a dictionary-encoded column for one statement"""
+        code = self._codes[field][index]
+        return self._categories[field][code] if code >= 0 else None
+
+    @property
+    def opinion_mask(self):
+        """Boolean has_opinion array, unpacked from the bitmask on first use"""
+        if self._opinion_mask is None:
+            self._opinion_mask = np.unpackbits(self._opinion_bits, count=self._count).astype(bool)
+        return self._opinion_mask
+
+    @property
+    def word_counts(self):
+        return self._word_counts
+
+    def opinion_count(self):
+        """Number of statements with opinions"""
+        return int(self.opinion_mask.sum())
+
+    def score_pair(self, i, j, similarity_score):
+        """Candidate pair of statements i and j, with its quality score and the flags behind it"""
+        source_codes = self._codes['source_url']
+        author_codes = self._codes['author']
+        same_source = bool(source_codes[i] == source_codes[j])
+        same_author = bool(author_codes[i] == author_codes[j])
+        both_have_opinions = bool(self.opinion_mask[i] and self.opinion_mask[j])
+        
+        quality_score = similarity_score
+        if same_source:
+            quality_score += SAME_SOURCE_BONUS
+        if same_author:
+            quality_score += SAME_AUTHOR_BONUS
+        if both_have_opinions:
+            quality_score += OPINION_BONUS
+        
+        return {
+            'index_a': i,
+            'index_b': j,
+            'similarity_score': similarity_score,
+            'quality_score': quality_score,
+            'same_source': same_source,
+            'same_author': same_author,
+            'both_have_opinions': both_have_opinions
+        }
+
+    def take(self, indices):
+        """Return a new store holding only the given statements, in order"""
+        builder = StatementStoreBuilder()
+        for i in indices:
+            builder.append(self[int(i)])
+        return builder.build()
+
+    def to_records(self):
+        """Materialize every statement as a dict"""
+        return list(self)
+
+    def write_json(self, filepath):
+        """Stream the store to a statements.json-compatible file, one record at a time"""
+        with open(filepath, 'w', encoding='utf-8') as f:
+            f.write('[')
+            for i, record in enumerate(self):
+                f.write(',\n  ' if i else '\n  ')
+                f.write(json.dumps(record, ensure_ascii=False))
+            f.write('\n]' if self._count else ']')
+
+class StatementStoreBuilder:
+    """Append-only builder that keeps rows in compact buffers until build()"""
+
+    def __init__(self):
+        self._text = bytearray()
+        self._offsets = array('q', [0])
+        self._codes = {field: array('i') for field in CATEGORICAL_FIELDS}
+        self._lookup = {field: {} for field in CATEGORICAL_FIELDS}
+        self._opinions = bytearray()
+        self._word_counts = array('i')
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def append(self, record):
+        """Add one statement dict"""
+        self._text += record['text'].encode('utf-8')
+        self._offsets.append(len(self._text))
+
+        for field in CATEGORICAL_FIELDS:
+            value = record.get(field)
+            if value is None:
+                self._codes[field].append(-1)
+                continue
+            lookup = self._lookup[field]
+            code = lookup.get(value)
+            if code is None:
+                code = lookup[value] = len(lookup)
+            self._codes[field].append(code)
+
+        self._opinions.append(1 if record.get('has_opinion', False) else 0)
+        word_count = record.get('word_count')
+        self._word_counts.append(word_count if word_count is not None else len(record['text'].split()))
+
+    def extend(self, records):
+        """Add many statement dicts"""
+        for record in records:
+            self.append(record)
+
+    def build(self):
+        """Freeze the buffers into a StatementStore"""
+        codes = {field: np.frombuffer(self._codes[field], dtype=np.int32).copy()
+                 for field in CATEGORICAL_FIELDS}
+        categories = {field: list(self._lookup[field]) for field in CATEGORICAL_FIELDS}
+        return StatementStore(
+            bytes(self._text),
+            np.frombuffer(self._offsets, dtype=np.int64).copy(),
+            codes,
+            categories,
+            np.packbits(np.frombuffer(bytes(self._opinions), dtype=np.uint8)),
+            np.frombuffer(self._word_counts, dtype=np.int32).copy()
+        )
+
+def as_statement_store(statements):
+    """Accept either a StatementStore or a list of statement dicts"""
+    if isinstance(statements, StatementStore):
+        return statements
+    return StatementStore.from_records(statements)
+
+if __name__ == "__main__":
+    # Test the store
+    store = StatementStore.from_records([
+        {'text': 'Farmers need better MSP', 'source_url': 'url1', 'domain': 'a.com', 'has_opinion': True},
+        {'text': 'MSP should be increased', 'source_url': 'url1', 'domain': 'a.com', 'has_opinion': True},
+        {'text': 'Agriculture is important', 'source_url': 'url2', 'domain': 'b.com', 'has_opinion': False},
+    ])
+    print(f"{len(store)} statements, {store.opinion_count()} with opinions")
+    print(f"Sources: {store.categories('source_url')}")
+    for s in store:
+        print(f"  - {s}")
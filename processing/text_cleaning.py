@@ -0,0 +1,78 @@
+"""
+Shared text normalization for scraped documents and extracted statements
+Patterns are compiled once, and the batch functions run each pass over a whole
+column joined into one buffer instead of once per string, using str/bytes kernels
+where they give the same result as the regex
+"""
+import re
+
+WHITESPACE_PATTERN = re.compile(r'\s+')
+URL_PATTERN = re.compile(r'http\S+|www\.\S+')
+SPECIAL_CHARS_PATTERN = re.compile(r'[^\w\s\.\,\!\?\;\:\-\'\"]')
+
+# ASCII characters removed by SPECIAL_CHARS_PATTERN, for the bytes.translate fast path
+ASCII_SPECIAL_BYTES = bytes(b for b in range(128) if SPECIAL_CHARS_PATTERN.match(chr(b)))
+ALL_ASCII_BYTES = bytes(range(128))
+
+# More distinct non-ASCII symbols than this and one regex pass is cheaper than str.replace
+MAX_REPLACE_PASSES = 32
+
+def clean_document_text(text):
+    """Clean scraped article text (whitespace, URLs, special characters)"""
+    if not text:
+        return ""
+
+    text = WHITESPACE_PATTERN.sub(' ', text)
+    text = URL_PATTERN.sub('', text)
+    text = SPECIAL_CHARS_PATTERN.sub('', text)
+    return text.strip()
+
+def clean_statement_text(text):
+    """Clean a single extracted statement (whitespace, URLs, edge punctuation)"""
+    text = WHITESPACE_PATTERN.sub(' ', text)
+    text = URL_PATTERN.sub('', text)
+    text = text.strip(',.;:- ')
+    return text.strip()
+
+def _remove_special_chars(text):
+    """
+    Same result as SPECIAL_CHARS_PATTERN.sub('', text), without a per-character regex scan
+    ASCII symbols are deleted with bytes.translate (UTF-8 continuation bytes are never
+    ASCII), then each distinct non-ASCII symbol actually present is removed with str.replace
+    """
+    data = text.encode('utf-8', 'surrogatepass').translate(None, ASCII_SPECIAL_BYTES)
+    text = data.decode('utf-8', 'surrogatepass')
+    if text.isascii():
+        return text
+
+    non_ascii = set(data.translate(None, ALL_ASCII_BYTES).decode('utf-8', 'surrogatepass'))
+    special = [char for char in non_ascii if SPECIAL_CHARS_PATTERN.match(char)]
+    if len(special) > MAX_REPLACE_PASSES:
+        return SPECIAL_CHARS_PATTERN.sub('', text)
+    for char in special:
+        text = text.replace(char, '')
+    return text
+
+def _normalize_column(texts, remove_special_chars):
+    """
+    Run the shared passes over a whole column joined into one buffer
+    Returns one normalized (unstripped) string per input
+    """
+    # str.split() splits on exactly the characters \s matches, so this equals the
+    # \s+ -> ' ' substitution up to edge spaces, which every caller strips. It also
+    # leaves no newlines behind, which makes '\n' a safe column separator
+    joined = '\n'.join(' '.join(text.split()) if text else '' for text in texts)
+
+    if 'http' in joined or 'www.' in joined:
+        joined = URL_PATTERN.sub('', joined)
+    if remove_special_chars:
+        joined = _remove_special_chars(joined)
+    return joined.split('\n')
+
+def clean_document_texts(texts):
+    """Batch version of clean_document_text, same output for every element"""
+    return [text.strip() for text in _normalize_column(texts, remove_special_chars=True)]
+
+def clean_statement_texts(texts):
+    """Batch version of clean_statement_text, same output for every element"""
+    return [text.strip(',.;:- ').strip() for text in _normalize_column(texts, remove_special_chars=False)]
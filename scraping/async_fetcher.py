@@ -0,0 +1,161 @@
+"""
+Asyncio content fetcher with per-domain rate limiting
+Keeps many requests in flight across different hosts while each host only sees
+a polite, token-bucket-limited request rate. Downloaded pages are parsed in a
+process pool so HTML parsing overlaps with network I/O. URLs can also arrive in
+batches (e.g. per search query) and are fetched as each batch comes in
+"""
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+import config
+
+class DomainRateLimiter:
+    """
+    Token bucket per domain: `burst` requests back to back, then `rate` per second
+    """
+
+    def __init__(self, rate=None, burst=None):
+        self.rate = rate or config.PER_DOMAIN_RATE
+        self.burst = burst or config.PER_DOMAIN_BURST
+        self.buckets = {}  # domain -> (tokens, last refill time); below 0, tokens reserved ahead
+
+    def reserve(self, domain):
+        """
+        Take the domain's next token and return the seconds until it may be used
+        Each caller is queued behind earlier reservations, so nothing waits under a lock
+        (call on the event loop thread)
+        """
+        now = time.monotonic()
+        tokens, last = self.buckets.get(domain, (self.burst, now))
+        tokens = min(self.burst, tokens + (now - last) * self.rate) - 1
+        self.buckets[domain] = (tokens, now)
+        return max(0.0, -tokens / self.rate)
+
+    async def acquire(self, domain):
+        """Wait until the domain has a token, then take it"""
+        wait = self.reserve(domain)
+        if wait:
+            await asyncio.sleep(wait)
+
+class AsyncContentFetcher:
+    def __init__(self, scraper, max_concurrency=None, rate_limiter=None, timeout=15, parse_workers=None):
+        """
+        scraper: EnhancedContentScraper providing cached_html(), try_download() and parse_html()
+        parse_workers: parser processes (None = config.PARSE_WORKERS, 0 = parse on the fetch threads),
+                       taken from the scraper's pool so they outlive this fetcher
+        """
+        self.scraper = scraper
+        self.max_concurrency = max_concurrency or config.MAX_CONCURRENT_FETCHES
+        self.rate_limiter = rate_limiter or DomainRateLimiter()
+        self.timeout = timeout
+        if parse_workers is None:
+            parse_workers = config.PARSE_WORKERS
+        self.parse_workers = (os.cpu_count() or 1) if parse_workers is None else parse_workers
+
+    async def _parse(self, url, html, executor, parse_pool):
+        loop = asyncio.get_running_loop()
+        if parse_pool is None:
+            return await loop.run_in_executor(executor, self.scraper.parse_html, url, html, False)
+
+        from scraping.enhanced_content_scraper import parse_document
+        document = await loop.run_in_executor(parse_pool, parse_document, url, html, self.scraper.extractor_name)
+        if document:
+            # Workers learn strategies in their own memo; fold them into the scraper's
+            self.scraper.record_strategy(document)
+        return document
+
+    async def _fetch_one(self, url, position, total, semaphore, executor, parse_pool, on_result):
+        loop = asyncio.get_running_loop()
+        domain = urlparse(url).netloc
+
+        # Cached pages need no request and no politeness delay
+        html = await loop.run_in_executor(executor, self.scraper.cached_html, url)
+        
+        attempt = 0
+        while html is None:
+            # Wait for the domain's reserved send time without holding a slot, so a
+            # busy domain's queue never keeps other hosts from fetching; the slot is
+            # taken only once the request may go. Hosts with an open circuit fail
+            # immediately and need no token
+            if self.scraper.host_health.available(domain):
+                await self.rate_limiter.acquire(domain)
+            async with semaphore:
+                html, delay = await loop.run_in_executor(
+                    executor, self.scraper.try_download, url, self.timeout, attempt
+                )
+            if delay is None:
+                break
+            # Back off without holding a slot, so other hosts keep fetching
+            await asyncio.sleep(delay)
+            attempt += 1
+
+        if html is None:
+            if on_result:
+                on_result(url, None, self.scraper.last_errors.pop(url, 'download failed'))
+            return None
+
+        document = await self._parse(url, html, executor, parse_pool)
+        if on_result:
+            on_result(url, document, None)
+        if document:
+            print(f"[{position}/{total or '?'}] ✓ Extracted {document['word_count']} words from {url[:60]}")
+        return document
+
+    async def _fetch_stream(self, batches, on_batch, on_result, total=None):
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        parse_pool = self.scraper.parse_pool(self.parse_workers) if self.parse_workers else None
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+            # Start on each batch as it arrives; earlier batches keep fetching meanwhile
+            tasks = []
+            async for batch in iterate_batches(batches):
+                for url in (on_batch(batch) if on_batch else batch):
+                    tasks.append(asyncio.ensure_future(self._fetch_one(
+                        url, len(tasks) + 1, total, semaphore, executor, parse_pool, on_result
+                    )))
+            documents = await asyncio.gather(*tasks)
+        return [doc for doc in documents if doc]
+
+    def fetch_all(self, urls, on_result=None):
+        """
+        Fetch and parse all URLs concurrently, returning documents in input order
+        Document text is left uncleaned so the caller can clean it in one batch
+        on_result(url, document, error) is called on the event loop as each URL finishes
+        """
+        urls = list(urls)
+        if not urls:
+            return []
+
+        print(f"Fetching {len(urls)} URLs ({self.max_concurrency} in flight, "
+              f"{self.rate_limiter.rate:g} req/s per domain, {self.parse_workers or 'no'} parser processes)...")
+        start = time.monotonic()
+        documents = asyncio.run(self._fetch_stream([urls], None, on_result, total=len(urls)))
+        elapsed = time.monotonic() - start
+        print(f"  ⏱️  {elapsed:.1f}s ({len(urls)/max(elapsed, 1e-9):.1f} URLs/sec)")
+        return documents
+
+    def fetch_stream(self, batches, on_batch=None, on_result=None):
+        """
+        Fetch and parse URLs that arrive in batches (a list or an async iterable such as
+        SerpScheduler.stream), starting on each batch as soon as it arrives
+        Returns documents in arrival order, text uncleaned like fetch_all
+        on_batch(batch) -> URLs to fetch from it, called on the event loop thread
+        """
+        print(f"Fetching URLs as they arrive ({self.max_concurrency} in flight, "
+              f"{self.rate_limiter.rate:g} req/s per domain, {self.parse_workers or 'no'} parser processes)...")
+        start = time.monotonic()
+        documents = asyncio.run(self._fetch_stream(batches, on_batch, on_result))
+        elapsed = time.monotonic() - start
+        print(f"  ⏱️  {elapsed:.1f}s ({len(documents)/max(elapsed, 1e-9):.1f} documents/sec)")
+        return documents
+
+async def iterate_batches(batches):
+    """Iterate an async iterable or a plain one"""
+    if hasattr(batches, '__aiter__'):
+        async for batch in batches:
+            yield batch
+    else:
+        for batch in batches:
+            yield batch
@@ -0,0 +1,220 @@
+"""
+Persistent crawl frontier for the content scraper
+Every URL is a SQLite row with its status, attempt count, last error and a pointer to
+the extracted document on disk. Results are committed as they arrive, so a restarted
+run only fetches what is still pending or failed, and several fetcher processes can
+share one frontier by claiming URLs atomically
+"""
+import hashlib
+import json
+import os
+import socket
+import sqlite3
+import time
+from pathlib import Path
+from urllib.parse import urlparse
+import config
+
+# pending -> in_progress -> done | empty (no usable content, or rejected unread) | failed (retried)
+# | pending (skipped unsent, e.g. on an open host circuit, with the attempt given back)
+STATUSES = ('pending', 'in_progress', 'done', 'empty', 'failed')
+
+class CrawlFrontier:
+    def __init__(self, path=None, max_attempts=None, lease=None):
+        self.path = Path(path or config.CRAWL_FRONTIER_PATH)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.document_dir = self.path.parent / f'{self.path.stem}_documents'
+        self.max_attempts = max_attempts or config.FRONTIER_MAX_ATTEMPTS
+        self.lease = lease or config.FRONTIER_LEASE
+        self.host = socket.gethostname()
+        self.worker_id = f"{self.host}:{os.getpid()}"
+
+        # Autocommit mode: every status change is durable as soon as it is made
+        self.conn = sqlite3.connect(str(self.path), timeout=30, isolation_level=None)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS frontier (
+                url TEXT PRIMARY KEY,
+                domain TEXT,
+                status TEXT NOT NULL DEFAULT 'pending',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                last_error TEXT,
+                content_path TEXT,
+                claimed_by TEXT,
+                claimed_at REAL,
+                updated_at REAL
+            )
+        ''')
+        self.conn.execute('CREATE INDEX IF NOT EXISTS idx_frontier_status ON frontier(status)')
+
+    def add(self, urls):
+        """Enqueue URLs; ones already in the frontier keep their status"""
+        now = time.time()
+        self.conn.execute('BEGIN IMMEDIATE')
+        self.conn.executemany(
+            'INSERT OR IGNORE INTO frontier (url, domain, updated_at) VALUES (?, ?, ?)',
+            [(url, urlparse(url).netloc, now) for url in urls]
+        )
+        self.conn.execute('COMMIT')
+
+    def release_dead_claims(self):
+        """
+        Return URLs claimed by crashed processes on this host to the queue, so a
+        restart picks them up immediately instead of waiting for the lease to expire
+        """
+        owners = [row[0] for row in self.conn.execute(
+            "SELECT DISTINCT claimed_by FROM frontier WHERE status='in_progress' AND claimed_by LIKE ?",
+            (f"{self.host}:%",)
+        )]
+        for owner in owners:
+            pid = int(owner.rsplit(':', 1)[1])
+            if pid == os.getpid() or _process_alive(pid):
+                continue
+            self.conn.execute(
+                "UPDATE frontier SET status='pending', claimed_by=NULL WHERE status='in_progress' AND claimed_by=?",
+                (owner,)
+            )
+
+    def claim(self, urls, limit):
+        """
+        Atomically take up to `limit` of the given URLs that still need fetching
+        (pending, failed with attempts left, or claimed by a worker whose lease expired)
+        """
+        now = time.time()
+        claimed = []
+        urls = list(urls)
+        for start in range(0, len(urls), 500):
+            if len(claimed) >= limit:
+                break
+            chunk = urls[start:start + 500]
+            placeholders = ','.join('?' * len(chunk))
+            rows = self.conn.execute(f'''
+                UPDATE frontier
+                SET status='in_progress', attempts=attempts + 1, claimed_by=?, claimed_at=?, updated_at=?
+                WHERE url IN (
+                    SELECT url FROM frontier
+                    WHERE url IN ({placeholders})
+                      AND (status='pending'
+                           OR (status='failed' AND attempts < ?)
+                           OR (status='in_progress' AND claimed_at < ?))
+                    LIMIT ?
+                )
+                RETURNING url
+            ''', (self.worker_id, now, now, *chunk, self.max_attempts, now - self.lease,
+                  limit - len(claimed))).fetchall()
+            claimed.extend(row[0] for row in rows)
+
+        # RETURNING gives no order guarantee; keep the caller's order
+        claimed = set(claimed)
+        return [url for url in urls if url in claimed]
+
+    def _document_path(self, url):
+        key = hashlib.sha1(url.encode('utf-8')).hexdigest()
+        return Path(key[:2]) / f'{key}.json'
+
+    def mark_done(self, url, document):
+        """Store the extracted document and point the URL's row at it"""
+        relative_path = self._document_path(url)
+        full_path = self.document_dir / relative_path
+        full_path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = full_path.with_suffix('.tmp')
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(document, f, ensure_ascii=False)
+        os.replace(temp_path, full_path)
+
+        self.conn.execute(
+            "UPDATE frontier SET status='done', last_error=NULL, content_path=?, claimed_by=NULL, updated_at=? "
+            "WHERE url=?",
+            (str(relative_path), time.time(), url)
+        )
+
+    def mark_empty(self, url, reason='insufficient content'):
+        """Page has no usable article text, or was rejected before download (not retried)"""
+        self.conn.execute(
+            "UPDATE frontier SET status='empty', last_error=?, claimed_by=NULL, updated_at=? WHERE url=?",
+            (reason, time.time(), url)
+        )
+
+    def mark_failed(self, url, error):
+        """Download failed; retried by later runs until max_attempts"""
+        self.conn.execute(
+            "UPDATE frontier SET status='failed', last_error=?, claimed_by=NULL, updated_at=? WHERE url=?",
+            (str(error)[:500], time.time(), url)
+        )
+
+    def mark_skipped(self, url, reason):
+        """Nothing was fetched (e.g. the host's circuit is open): back to pending, attempt not counted"""
+        self.conn.execute(
+            "UPDATE frontier SET status='pending', attempts=MAX(attempts - 1, 0), last_error=?, claimed_by=NULL, "
+            "updated_at=? WHERE url=?",
+            (str(reason)[:500], time.time(), url)
+        )
+
+    def record(self, url, document, error=None):
+        """
+        Commit one fetch outcome: a document, an empty page, or a download error
+        Errors marked permanent (e.g. a PDF behind the link) are not retried, and
+        ones marked unattempted (nothing was sent) cost no attempt
+        """
+        if document:
+            self.mark_done(url, document)
+        elif getattr(error, 'permanent', False):
+            self.mark_empty(url, str(error))
+        elif getattr(error, 'unattempted', False):
+            self.mark_skipped(url, error)
+        elif error:
+            self.mark_failed(url, error)
+        else:
+            self.mark_empty(url)
+
+    def documents(self, urls):
+        """Stored documents of the given URLs that are done, in the given order"""
+        pointers = {}
+        urls = list(urls)
+        for start in range(0, len(urls), 500):
+            chunk = urls[start:start + 500]
+            placeholders = ','.join('?' * len(chunk))
+            pointers.update(self.conn.execute(
+                f"SELECT url, content_path FROM frontier WHERE status='done' AND url IN ({placeholders})", chunk
+            ))
+
+        documents = []
+        for url in urls:
+            if url in pointers:
+                with open(self.document_dir / pointers.pop(url), 'r', encoding='utf-8') as f:
+                    documents.append(json.load(f))
+        return documents
+
+    def status_counts(self, urls=None):
+        """Number of URLs per status (all URLs, or only the given ones)"""
+        counts = dict.fromkeys(STATUSES, 0)
+        if urls is None:
+            counts.update(self.conn.execute('SELECT status, COUNT(*) FROM frontier GROUP BY status'))
+            return counts
+        urls = list(urls)
+        for start in range(0, len(urls), 500):
+            chunk = urls[start:start + 500]
+            placeholders = ','.join('?' * len(chunk))
+            for status, count in self.conn.execute(
+                f'SELECT status, COUNT(*) FROM frontier WHERE url IN ({placeholders}) GROUP BY status', chunk
+            ):
+                counts[status] += count
+        return counts
+
+    def print_stats(self, urls=None):
+        counts = self.status_counts(urls)
+        print(f"\n🗂️  Crawl frontier ({self.path}):")
+        print("  " + ", ".join(f"{status}: {counts[status]}" for status in STATUSES))
+
+    def close(self):
+        self.conn.close()
+
+def _process_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
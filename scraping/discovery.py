@@ -0,0 +1,360 @@
+"""
+Sitemap and RSS/Atom discovery for the target sites
+Reads each domain's robots.txt, its sitemaps (indexes, gzipped and news sitemaps) and
+its feeds (autodiscovered from the homepage, plus DISCOVERY_FEEDS), and keeps entries
+whose URL or title mentions agriculture. Article URLs come straight from the sites, so
+no search quota is spent. The newest lastmod returned per sitemap and feed is
+remembered, so later runs skip unchanged sitemaps and return only entries added since
+(or left out by an earlier run's per-domain cap)
+"""
+import gzip
+import io
+import json
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from urllib.parse import urljoin, urlparse
+from urllib.robotparser import RobotFileParser
+import lxml.html
+import requests
+from lxml import etree
+import config
+from scraping.enhanced_content_scraper import RejectedContent, iter_body
+from scraping.host_health import HostHealth
+
+FEED_TYPES = ('application/rss+xml', 'application/atom+xml', 'application/rdf+xml')
+
+# Sitemaps are data, not markup: never resolve entities or fetch DTDs
+XML_PARSER = etree.XMLParser(recover=True, huge_tree=True, resolve_entities=False, no_network=True)
+
+def parse_date(value):
+    """Epoch seconds from a W3C datetime (sitemaps, Atom) or RFC 822 date (RSS), or None"""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        try:
+            parsed = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+def _localname(element):
+    return etree.QName(element).localname if isinstance(element.tag, str) else None
+
+def _child_text(element, *names):
+    """Text of the first descendant with one of the local names"""
+    for child in element.iter():
+        if _localname(child) in names and child.text and child.text.strip():
+            return child.text.strip()
+    return None
+
+def parse_listing(content, max_bytes=None):
+    """
+    Parse a sitemap, sitemap index, RSS or Atom document
+    Returns (kind, entries): kind is 'index' for sitemap indexes (entries are child
+    sitemaps) and 'urls' otherwise; entries are {'url', 'title', 'lastmod'} dicts
+    Gzipped documents are rejected once they inflate past max_bytes (DISCOVERY_MAX_BYTES)
+    """
+    if content[:2] == b'\x1f\x8b':
+        max_bytes = max_bytes or config.DISCOVERY_MAX_BYTES
+        with gzip.GzipFile(fileobj=io.BytesIO(content)) as f:
+            content = f.read(max_bytes + 1)
+        if len(content) > max_bytes:
+            raise RejectedContent(f"inflates past {max_bytes:,} bytes")
+    root = etree.fromstring(content, parser=XML_PARSER)
+    if root is None:
+        return 'urls', []
+
+    kind = _localname(root)
+    entries = []
+    if kind in ('sitemapindex', 'urlset'):
+        for element in root:
+            if _localname(element) not in ('sitemap', 'url'):
+                continue
+            url = _child_text(element, 'loc')
+            if url:
+                # News sitemaps carry the headline
+                entries.append({'url': url, 'title': _child_text(element, 'title'),
+                                'lastmod': parse_date(_child_text(element, 'lastmod', 'publication_date'))})
+        return ('index' if kind == 'sitemapindex' else 'urls'), entries
+
+    if kind == 'feed':
+        for element in root:
+            if _localname(element) != 'entry':
+                continue
+            links = [link for link in element if _localname(link) == 'link' and link.get('href')]
+            link = next((l for l in links if l.get('rel', 'alternate') == 'alternate'), None)
+            if link is not None:
+                entries.append({'url': link.get('href').strip(), 'title': _child_text(element, 'title'),
+                                'lastmod': parse_date(_child_text(element, 'updated', 'published'))})
+        return 'urls', entries
+
+    # RSS 2.0 and RSS 1.0 (RDF)
+    for element in root.iter():
+        if _localname(element) != 'item':
+            continue
+        url = _child_text(element, 'link')
+        if url:
+            entries.append({'url': url, 'title': _child_text(element, 'title'),
+                            'lastmod': parse_date(_child_text(element, 'pubDate', 'date', 'updated'))})
+    return 'urls', entries
+
+class DiscoveryCrawler:
+    def __init__(self, domains=None, state_path=None, keywords=None, max_sitemaps=None,
+                 max_urls_per_domain=None, max_age_days=None):
+        """
+        domains: host names (fetched over https) or base URLs such as a local stand-in
+                 server's (defaults to config.TARGET_DOMAINS)
+        state_path: JSON file with the newest lastmod seen per sitemap and feed
+                    (None = config.DISCOVERY_STATE_PATH, False = no incremental state)
+        """
+        self.domains = domains or config.TARGET_DOMAINS
+        if state_path is None:
+            state_path = config.DISCOVERY_STATE_PATH
+        self.state_path = Path(state_path) if state_path else None
+        keywords = keywords or config.DISCOVERY_KEYWORDS
+        self.keyword_pattern = re.compile(r'\b(?:%s)' % '|'.join(re.escape(k) for k in keywords), re.IGNORECASE)
+        self.max_sitemaps = max_sitemaps or config.DISCOVERY_MAX_SITEMAPS
+        self.max_urls_per_domain = max_urls_per_domain or config.DISCOVERY_MAX_URLS_PER_DOMAIN
+        max_age_days = max_age_days or config.DISCOVERY_MAX_AGE_DAYS
+        self.min_lastmod = time.time() - max_age_days * 86400 if max_age_days else None
+
+        self.host_health = HostHealth()
+        self.lock = threading.Lock()
+        # source URL -> {'lastmod': date the sitemap index gave it, 'newest': newest entry seen}
+        self.state = {}
+        if self.state_path and self.state_path.exists():
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                self.state = json.load(f)
+        self.stats = {'sitemaps': 0, 'feeds': 0, 'unchanged': 0, 'entries': 0, 'matched': 0,
+                      'disallowed': 0, 'errors': 0}
+        self.domain_counts = {}
+
+    def _root(self, domain):
+        return domain.rstrip('/') if '://' in domain else f"https://{domain}"
+
+    def _fetch(self, url):
+        """
+        Body of url, or None on failure (waits 1/PER_DOMAIN_RATE before each request)
+        Streamed under the download guards, with DISCOVERY_CONTENT_TYPES and DISCOVERY_MAX_BYTES
+        """
+        host = urlparse(url).netloc
+        if not self.host_health.available(host):
+            return None
+        time.sleep(1 / config.PER_DOMAIN_RATE)
+        try:
+            response = self.host_health.call(host, lambda: requests.get(
+                url, headers={'User-Agent': config.USER_AGENT},
+                timeout=(config.CONNECT_TIMEOUT, config.DOWNLOAD_DEADLINE), stream=True
+            ))
+            with response:
+                if response.status_code != 200:
+                    if response.status_code != 404:
+                        self._count('errors')
+                    return None
+                return b''.join(iter_body(response, config.DISCOVERY_CONTENT_TYPES, config.DISCOVERY_MAX_BYTES))
+        except Exception as e:
+            print(f"  ❌ {url[:70]}: {e}")
+            self._count('errors')
+            return None
+
+    def _count(self, stat, amount=1):
+        with self.lock:
+            self.stats[stat] += amount
+
+    def _robots(self, root):
+        """(RobotFileParser, sitemap URLs listed in robots.txt)"""
+        robots = RobotFileParser()
+        content = self._fetch(f"{root}/robots.txt")
+        robots.parse(content.decode('utf-8', 'replace').splitlines() if content else [])
+        return robots, robots.site_maps() or []
+
+    def _feeds(self, root, domain):
+        """Feed URLs linked from the homepage, plus the configured ones"""
+        feeds = list(config.DISCOVERY_FEEDS.get(domain, []))
+        content = self._fetch(f"{root}/")
+        if content:
+            try:
+                page = lxml.html.fromstring(content)
+                for link in page.iterfind('.//link[@rel="alternate"]'):
+                    if link.get('type', '').lower() in FEED_TYPES and link.get('href'):
+                        feeds.append(urljoin(f"{root}/", link.get('href')))
+            except (etree.ParserError, ValueError):
+                pass
+        return list(dict.fromkeys(feeds))
+
+    def matches(self, entry):
+        """Whether the entry's URL path (slug words) or title mentions agriculture"""
+        slug = re.sub(r'[-_/.+]+', ' ', urlparse(entry['url']).path)
+        return bool(self.keyword_pattern.search(slug) or (entry['title'] and self.keyword_pattern.search(entry['title'])))
+
+    def _read(self, url, listings, budget, depth=0, lastmod=None):
+        """
+        Read a sitemap or feed, following sitemap indexes (newest child sitemaps first, at
+        most budget[0] of them). Each sitemap or feed read appends a listing to listings:
+        its entries newer than its watermark that mention agriculture, and what is needed
+        to move its watermark once discover_domain knows which entries were returned
+        lastmod: date the parent sitemap index gave this sitemap
+        Returns False if the document could not be fetched or parsed
+        """
+        content = self._fetch(url)
+        if content is None:
+            return False
+        try:
+            kind, entries = parse_listing(content)
+        except (etree.XMLSyntaxError, OSError, EOFError, RejectedContent) as e:
+            print(f"  ⚠️  Unreadable sitemap or feed {url[:70]}: {e}")
+            self._count('errors')
+            return False
+        state = self.state.get(url, {})
+
+        if kind == 'index':
+            if depth >= 2:
+                return True
+            children = sorted(entries, key=lambda e: e['lastmod'] or 0, reverse=True)
+            for child in children:
+                if budget[0] <= 0:
+                    break
+                known = self.state.get(child['url'], {}).get('lastmod')
+                if child['lastmod'] and known and child['lastmod'] <= known:
+                    self._count('unchanged')
+                    continue
+                if child['lastmod'] and self.min_lastmod and child['lastmod'] < self.min_lastmod:
+                    continue
+                budget[0] -= 1
+                self._count('sitemaps')
+                # Failed children add no listing, so they are retried next run
+                self._read(child['url'], listings, budget, depth + 1, lastmod=child['lastmod'])
+            return True
+
+        watermark = state.get('newest')
+        listing = {'url': url, 'lastmod': lastmod, 'watermark': watermark, 'newest': watermark,
+                   'dates': [], 'entries': []}
+        self._count('entries', len(entries))
+        for entry in entries:
+            entry_lastmod = entry['lastmod']
+            if entry_lastmod:
+                listing['dates'].append(entry_lastmod)
+                listing['newest'] = max(listing['newest'] or entry_lastmod, entry_lastmod)
+                if (watermark and entry_lastmod <= watermark) or \
+                        (self.min_lastmod and entry_lastmod < self.min_lastmod):
+                    continue
+            if self.matches(entry):
+                listing['entries'].append(entry)
+        listings.append(listing)
+        return True
+
+    def _mark(self, listings, left_out):
+        """
+        Move each listing's watermark past the entries this run returned, but not past
+        any entry it left out (left_out: URLs cut by max_urls_per_domain). A sitemap
+        with left-out entries keeps its old index lastmod, so it is read again
+        """
+        for listing in listings:
+            left_dates = [e['lastmod'] for e in listing['entries'] if e['lastmod'] and e['url'] in left_out]
+            newest = listing['newest']
+            if left_dates:
+                first_left = min(left_dates)
+                newest = max([date for date in listing['dates'] if date < first_left]
+                             + ([listing['watermark']] if listing['watermark'] else []), default=None)
+            with self.lock:
+                state = self.state.setdefault(listing['url'], {})
+                if newest:
+                    state['newest'] = newest
+                if listing['lastmod'] and not left_dates:
+                    state['lastmod'] = listing['lastmod']
+
+    def discover_domain(self, domain):
+        """New agriculture URLs from one domain's sitemaps and feeds, newest first"""
+        root = self._root(domain)
+        host = urlparse(root).netloc
+        robots, sitemaps = self._robots(root)
+        if not sitemaps:
+            sitemaps = [f"{root}/sitemap.xml"]
+
+        listings = []
+        budget = [self.max_sitemaps]
+        for sitemap in sitemaps:
+            self._count('sitemaps')
+            self._read(sitemap, listings, budget)
+        for feed in self._feeds(root, host):
+            self._count('feeds')
+            self._read(feed, listings, budget)
+
+        entries = {}
+        for entry in (entry for listing in listings for entry in listing['entries']):
+            if urlparse(entry['url']).scheme not in ('http', 'https'):
+                continue
+            if not robots.can_fetch(config.USER_AGENT, entry['url']):
+                self._count('disallowed')
+                continue
+            # The same article is often in a sitemap and a feed; keep the dated, titled copy
+            known = entries.get(entry['url'])
+            if known is None or (entry['lastmod'] or 0, bool(entry['title'])) > (known['lastmod'] or 0, bool(known['title'])):
+                entries[entry['url']] = entry
+
+        # Over the cap, the oldest entries are returned: watermarks then move up to them
+        # and the next run continues with the newer rest. Entries dated like the last
+        # one kept stay in (a watermark cannot split a date); undated ones go last
+        candidates = sorted(entries.values(), key=lambda e: (e['lastmod'] is None, e['lastmod'] or 0))
+        kept = candidates[:self.max_urls_per_domain]
+        if len(candidates) > len(kept) and kept and kept[-1]['lastmod']:
+            kept += [e for e in candidates[len(kept):] if e['lastmod'] == kept[-1]['lastmod']]
+        self._mark(listings, {e['url'] for e in candidates[len(kept):]})
+
+        entries = sorted(kept, key=lambda e: e['lastmod'] or 0, reverse=True)
+        with self.lock:
+            self.domain_counts[host] = len(entries)
+        self._count('matched', len(entries))
+        return [{**entry, 'domain': host, 'source': 'discovery'} for entry in entries]
+
+    def discover(self):
+        """
+        New agriculture URLs from all domains (one thread per domain)
+        Call save() once they are scraped, so an interrupted run finds them again
+        """
+        print(f"Discovering URLs from sitemaps and feeds of {len(self.domains)} domains...")
+        start = time.monotonic()
+        with ThreadPoolExecutor(max_workers=min(len(self.domains), config.MAX_CONCURRENT_FETCHES) or 1) as pool:
+            results = list(pool.map(self.discover_domain, self.domains))
+        self.print_stats(time.monotonic() - start)
+        return [entry for entries in results for entry in entries]
+
+    def save(self):
+        """Persist the lastmod watermarks (no-op without a state path)"""
+        if not self.state_path:
+            return
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = self.state_path.with_suffix('.tmp')
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.state, f, indent=2, sort_keys=True)
+        os.replace(temp_path, self.state_path)
+
+    def print_stats(self, elapsed):
+        stats = self.stats
+        print(f"\n🗺️  Discovery ({elapsed:.1f}s):")
+        print(f"  Sitemaps read: {stats['sitemaps']} ({stats['unchanged']} unchanged since last run), "
+              f"feeds: {stats['feeds']}")
+        print(f"  Entries: {stats['entries']}, new agriculture URLs: {stats['matched']} "
+              f"({stats['disallowed']} disallowed by robots.txt)")
+        if stats['errors']:
+            print(f"  Failed sitemaps/feeds: {stats['errors']}")
+        for host, count in sorted(self.domain_counts.items(), key=lambda item: -item[1]):
+            if count:
+                print(f"    {host}: {count}")
+
+if __name__ == "__main__":
+    # Test discovery on a couple of target sites
+    crawler = DiscoveryCrawler(domains=["www.downtoearth.org.in", "krishijagran.com"], state_path=False)
+    for entry in crawler.discover()[:10]:
+        print(f"  - {entry['title'] or ''} {entry['url']}")
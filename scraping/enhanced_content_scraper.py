@@ -2,72 +2,235 @@
 Enhanced content scraper with support for multiple content types
 Includes better extraction for articles, blogs, and social media
 """
+import asyncio
 import requests
-from bs4 import BeautifulSoup
+import codecs
+import lxml.html
+from lxml import etree
+from itertools import islice
 from urllib.parse import urlparse
 import config
 import time
 import re
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from processing.text_cleaning import clean_document_text, clean_document_texts
+from scraping.async_fetcher import AsyncContentFetcher, iterate_batches
+from scraping.http_cache import ResponseCache, OfflineCacheMiss
+from scraping.extraction_backends import get_backend
+from scraping.strategy_memo import DomainStrategyMemo
+from scraping.crawl_frontier import CrawlFrontier
+from scraping.host_health import HostHealth, HostUnavailable, TransientHTTPError, RETRY_STATUSES, REFUSED_STATUSES
+from scraping.url_index import UrlIndex, dedupe_urls, url_key
+
+UNWANTED_TAGS = ('script', 'style', 'nav', 'footer', 'header', 'aside', 'iframe')
+
+CONTENT_CLASSES = [
+    'article-content', 'post-content', 'entry-content', 
+    'story-content', 'content', 'main-content',
+    'article-body', 'post-body', 'entry-body'
+]
+CONTENT_CLASS_PATTERNS = {f'class:{class_name}': re.compile(class_name, re.I) for class_name in CONTENT_CLASSES}
+
+# Content strategies in fallback order: <article>, content class names, <main>, all <p>
+CONTENT_STRATEGIES = ['article', *CONTENT_CLASS_PATTERNS, 'main', 'paragraphs']
+
+# Pages with less article text than this are rejected
+MIN_CONTENT_LENGTH = 100
+AUTHOR_CLASS_PATTERN = re.compile('author', re.I)
+DATE_CLASS_PATTERN = re.compile('date|time', re.I)
+
+META_CHARSET_PATTERN = re.compile(rb'<meta[^>]+charset\s*=\s*["\']?\s*([\w.:-]+)', re.I)
+
+class RejectedContent(Exception):
+    """Response is not worth downloading (not HTML, or too large); retrying will not help"""
+    permanent = True
+
+def iter_body(response, allowed_types=None, max_bytes=None):
+    """
+    Stream a response body in chunks under the download guards: content types outside
+    allowed_types (default ALLOWED_CONTENT_TYPES) are rejected before reading, and the
+    download aborts once it passes max_bytes (default MAX_RESPONSE_BYTES) or DOWNLOAD_DEADLINE
+    """
+    allowed_types = allowed_types or config.ALLOWED_CONTENT_TYPES
+    max_bytes = max_bytes or config.MAX_RESPONSE_BYTES
+    mime_type = response.headers.get('Content-Type', '').split(';')[0].strip().lower()
+    if mime_type and mime_type not in allowed_types:
+        raise RejectedContent(f"content type {mime_type}")
+    
+    length = response.headers.get('Content-Length', '')
+    if length.isdigit() and int(length) > max_bytes:
+        raise RejectedContent(f"body of {int(length):,} bytes exceeds {max_bytes:,}")
+    
+    deadline = time.monotonic() + config.DOWNLOAD_DEADLINE
+    received = 0
+    for chunk in response.iter_content(chunk_size=64 * 1024):
+        received += len(chunk)
+        if received > max_bytes:
+            raise RejectedContent(f"body exceeds {max_bytes:,} bytes")
+        if time.monotonic() > deadline:
+            raise requests.exceptions.Timeout(f"download took over {config.DOWNLOAD_DEADLINE}s")
+        yield chunk
+
+def sniff_encoding(content_type, head):
+    """
+    Charset from the Content-Type header, else from a <meta> tag or BOM in the
+    first bytes of the body, else UTF-8
+    """
+    for parameter in content_type.split(';')[1:]:
+        name, _, value = parameter.partition('=')
+        if name.strip().lower() == 'charset' and value.strip():
+            candidates = [value.strip().strip('"\'')]
+            break
+    else:
+        candidates = []
+    
+    if head.startswith(codecs.BOM_UTF8):
+        candidates.append('utf-8-sig')
+    match = META_CHARSET_PATTERN.search(head[:4096])
+    if match:
+        candidates.append(match.group(1).decode('ascii', 'ignore'))
+    
+    for candidate in candidates:
+        try:
+            return codecs.lookup(candidate).name
+        except LookupError:
+            continue
+    return 'utf-8'
+
+# Pages are decoded by requests already, so re-encode as UTF-8 and tell libxml2 so
+# (a str containing an XML encoding declaration is rejected by lxml)
+UTF8_HTML_PARSER = lxml.html.HTMLParser(encoding='utf-8')
+
+def parse_tree(html):
+    """Parse a page into an lxml element tree"""
+    return lxml.html.document_fromstring(html.encode('utf-8', 'replace'), parser=UTF8_HTML_PARSER)
+
+def find_first(tree, tag, attribute=None, match=None):
+    """
+    First element with this tag in document order, optionally filtered on an attribute:
+    a string must equal one of its space-separated values, a compiled pattern must
+    search() the attribute value
+    """
+    for element in tree.iter(tag):
+        if attribute is None:
+            return element
+        value = element.get(attribute)
+        if not value:
+            continue
+        if isinstance(match, str):
+            if value == match or match in value.split():
+                return element
+        elif match.search(value):
+            return element
+    return None
+
+def apply_strategy(tree, strategy):
+    """
+    Joined paragraph text found by one content strategy, or None if the strategy's
+    container (or any paragraph) is missing from the page
+    """
+    if strategy == 'paragraphs':
+        paragraphs = list(islice(tree.iter('p'), 20))  # Limit to first 20
+    else:
+        if strategy in ('article', 'main'):
+            container = find_first(tree, strategy)
+        else:
+            container = find_first(tree, 'div', 'class', CONTENT_CLASS_PATTERNS[strategy])
+        if container is None:
+            return None
+        paragraphs = list(container.iter('p'))
+    
+    if not paragraphs:
+        return None
+    return ' '.join([p.text_content().strip() for p in paragraphs])
 
 class EnhancedContentScraper:
-    def __init__(self):
+    def __init__(self, use_cache=None, extractor=None, use_memo=None, use_frontier=None, use_url_index=None):
+        """
+        extractor: article extraction backend name (see scraping.extraction_backends),
+                   defaults to config.ARTICLE_EXTRACTOR
+        use_memo: learn and persist each domain's content strategy
+                  (defaults to config.EXTRACTION_MEMO_ENABLED)
+        use_frontier: track URLs in the persistent crawl frontier so interrupted runs
+                      resume (defaults to config.CRAWL_FRONTIER_ENABLED)
+        use_url_index: skip URL variants and URLs collected before, by any source
+                       (defaults to config.URL_INDEX_ENABLED)
+        """
         self.session = requests.Session()
         self.session.headers.update({'User-Agent': config.USER_AGENT})
-    
-    def clean_text(self, text):
-        """Clean extracted text"""
-        if not text:
-            return ""
+        self._local = threading.local()
+        self.last_errors = {}  # url -> why its last download failed
+        self.host_health = HostHealth()
+        self.extractor_name = extractor or config.ARTICLE_EXTRACTOR
+        self.extractor = get_backend(self.extractor_name, self)
+        
+        if use_memo is None:
+            use_memo = config.EXTRACTION_MEMO_ENABLED
+        self.strategy_memo = DomainStrategyMemo.from_config() if use_memo else None
+        
+        if use_frontier is None:
+            use_frontier = config.CRAWL_FRONTIER_ENABLED
+        self.frontier = CrawlFrontier() if use_frontier else None
+        
+        if use_url_index is None:
+            use_url_index = config.URL_INDEX_ENABLED
+        self.url_index = UrlIndex.from_config() if use_url_index else None
         
-        # Remove extra whitespace
-        text = re.sub(r'\s+', ' ', text)
-        # Remove URLs
-        text = re.sub(r'http\S+|www\.\S+', '', text)
-        # Remove special characters but keep punctuation
-        text = re.sub(r'[^\w\s\.\,\!\?\;\:\-\'\"]', '', text)
+        if use_cache is None:
+            use_cache = config.HTTP_CACHE_ENABLED
+        self.cache = ResponseCache() if use_cache else None
         
-        return text.strip()
+        self._parse_pool = None  # Started on first use, shared by all of this scraper's fetches
     
-    def extract_article_content(self, soup, url):
+    def parse_pool(self, workers):
+        """
+        Parser processes for the asyncio fetcher, kept until close()
+        Workers start from a forkserver (spawn where there is none): forking while
+        fetch threads run could copy a lock some thread holds into the child
+        """
+        if self._parse_pool is None:
+            method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+            memo = self.strategy_memo
+            self._parse_pool = ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context(method),
+                initializer=init_parse_worker, initargs=(memo.snapshot() if memo else None,)
+            )
+        return self._parse_pool
+    
+    def close(self):
+        """Shut down the parser processes"""
+        if self._parse_pool:
+            self._parse_pool.shutdown()
+            self._parse_pool = None
+    
+    def clean_text(self, text):
+        """Clean extracted text (whitespace, URLs, special characters)"""
+        return clean_document_text(text)
+    
+    def extract_article_content(self, tree, url):
         """
         Extract main article content using multiple strategies
+        The domain's memoized strategy is tried first; the full chain runs only when
+        it finds too little. Returns (content, strategy)
         """
-        # Strategy 1: Look for article tag
-        article = soup.find('article')
-        if article:
-            paragraphs = article.find_all('p')
-            if paragraphs:
-                return ' '.join([p.get_text().strip() for p in paragraphs])
-        
-        # Strategy 2: Common content class names
-        content_classes = [
-            'article-content', 'post-content', 'entry-content', 
-            'story-content', 'content', 'main-content',
-            'article-body', 'post-body', 'entry-body'
-        ]
+        preferred = self.strategy_memo.lookup(urlparse(url).netloc) if self.strategy_memo else None
+        if preferred:
+            content = apply_strategy(tree, preferred)
+            if content and len(content) >= MIN_CONTENT_LENGTH:
+                return content, preferred
         
-        for class_name in content_classes:
-            content_div = soup.find('div', class_=re.compile(class_name, re.I))
-            if content_div:
-                paragraphs = content_div.find_all('p')
-                if paragraphs:
-                    return ' '.join([p.get_text().strip() for p in paragraphs])
+        for strategy in CONTENT_STRATEGIES:
+            if strategy == preferred:
+                continue
+            content = apply_strategy(tree, strategy)
+            if content is not None:
+                return content, strategy
         
-        # Strategy 3: Find main content area
-        main = soup.find('main')
-        if main:
-            paragraphs = main.find_all('p')
-            if paragraphs:
-                return ' '.join([p.get_text().strip() for p in paragraphs])
-        
-        # Strategy 4: All paragraphs (fallback)
-        paragraphs = soup.find_all('p')
-        if paragraphs:
-            return ' '.join([p.get_text().strip() for p in paragraphs[:20]])  # Limit to first 20
-        
-        return ""
+        return "", None
     
-    def extract_metadata(self, soup, url):
+    def extract_metadata(self, tree, url):
         """Extract author, date, and other metadata"""
         metadata = {
             'author': None,
@@ -76,97 +239,381 @@ class EnhancedContentScraper:
         }
         
         # Extract title
-        title_tag = soup.find('title')
-        if title_tag:
-            metadata['title'] = title_tag.get_text().strip()
+        title_tag = find_first(tree, 'title')
+        if title_tag is not None:
+            metadata['title'] = title_tag.text_content().strip()
         
         # Extract author
         author_patterns = [
-            soup.find('meta', {'name': 'author'}),
-            soup.find('meta', {'property': 'article:author'}),
-            soup.find('span', class_=re.compile('author', re.I)),
-            soup.find('div', class_=re.compile('author', re.I)),
-            soup.find('a', rel='author')
+            lambda: find_first(tree, 'meta', 'name', 'author'),
+            lambda: find_first(tree, 'meta', 'property', 'article:author'),
+            lambda: find_first(tree, 'span', 'class', AUTHOR_CLASS_PATTERN),
+            lambda: find_first(tree, 'div', 'class', AUTHOR_CLASS_PATTERN),
+            lambda: find_first(tree, 'a', 'rel', 'author')
         ]
         
-        for pattern in author_patterns:
-            if pattern:
+        for find in author_patterns:
+            pattern = find()
+            if pattern is not None:
                 if pattern.get('content'):
                     metadata['author'] = pattern.get('content')
                 else:
-                    metadata['author'] = pattern.get_text().strip()
+                    metadata['author'] = pattern.text_content().strip()
                 break
         
         # Extract date
         date_patterns = [
-            soup.find('meta', {'property': 'article:published_time'}),
-            soup.find('time'),
-            soup.find('span', class_=re.compile('date|time', re.I)),
-            soup.find('div', class_=re.compile('date|time', re.I))
+            lambda: find_first(tree, 'meta', 'property', 'article:published_time'),
+            lambda: find_first(tree, 'time'),
+            lambda: find_first(tree, 'span', 'class', DATE_CLASS_PATTERN),
+            lambda: find_first(tree, 'div', 'class', DATE_CLASS_PATTERN)
         ]
         
-        for pattern in date_patterns:
-            if pattern:
+        for find in date_patterns:
+            pattern = find()
+            if pattern is not None:
                 if pattern.get('content'):
                     metadata['date'] = pattern.get('content')
                 elif pattern.get('datetime'):
                     metadata['date'] = pattern.get('datetime')
                 else:
-                    metadata['date'] = pattern.get_text().strip()
+                    metadata['date'] = pattern.text_content().strip()
                 break
         
         return metadata
     
-    def scrape_url(self, url, timeout=15):
+    def get_session(self):
         """
-        Scrape a single URL with enhanced extraction
+        Session for the calling thread (requests.Session is not thread-safe)
         """
-        try:
-            time.sleep(config.SCRAPE_DELAY)
-            response = self.session.get(url, timeout=timeout)
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            if threading.current_thread() is threading.main_thread():
+                session = self.session
+            else:
+                session = requests.Session()
+                session.headers.update({'User-Agent': config.USER_AGENT})
+            self._local.session = session
+        return session
+    
+    def cached_html(self, url):
+        """
+        HTML that can be served from the response cache without any request, else None
+        """
+        return self.cache.lookup(url) if self.cache else None
+    
+    def fetch_html(self, url, timeout=15):
+        """
+        Download a page and return its HTML (raises on HTTP/network errors)
+        Goes through the response cache: fresh entries are served from disk and
+        stale ones are revalidated with a conditional GET
+        """
+        html = self.cached_html(url)
+        if html is not None:
+            return html
+        
+        entry = None
+        headers = {}
+        if self.cache:
+            if self.cache.offline:
+                raise OfflineCacheMiss(f"not cached (offline mode): {url}")
+            entry = self.cache.get(url)
+            headers = self.cache.conditional_headers(entry)
+        
+        host = urlparse(url).netloc
+        self.host_health.check(host)
+        response = self.get_session().get(url, timeout=(config.CONNECT_TIMEOUT, timeout),
+                                          headers=headers, stream=True)
+        with response:
+            if response.status_code in RETRY_STATUSES:
+                raise TransientHTTPError.from_response(response)
+            if response.status_code in REFUSED_STATUSES:
+                # Not retried, but a host refusing page after page still opens its circuit
+                self.host_health.record_failure(host)
+            # Other errors (404, 410, ...) fail just this URL and leave the host's state alone
             response.raise_for_status()
+            self.host_health.record_success(host)
             
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            # Remove unwanted elements
-            for tag in soup(['script', 'style', 'nav', 'footer', 'header', 'aside', 'iframe']):
-                tag.decompose()
-            
-            # Extract content and metadata
-            content = self.extract_article_content(soup, url)
-            metadata = self.extract_metadata(soup, url)
+            if entry and response.status_code == 304:
+                self.cache.touch(url)
+                return self.cache.read_body(entry)
             
-            if not content or len(content) < 100:
-                print(f"  ⚠️  Insufficient content from {url[:50]}")
-                return None
-            
-            return {
-                'url': url,
-                'text': self.clean_text(content),
-                'author': metadata['author'],
-                'date': metadata['date'],
-                'title': metadata['title'],
-                'domain': urlparse(url).netloc,
-                'word_count': len(content.split())
-            }
-            
-        except requests.exceptions.Timeout:
-            print(f"  ⏱️  Timeout for {url[:50]}")
-            return None
+            html = self.read_html(response)
+        
+        if self.cache:
+            self.cache.stats['misses'] += 1
+            self.cache.store(url, html, response.headers)
+        return html
+    
+    def read_html(self, response):
+        """
+        Read a streamed response body as text, decoding it chunk by chunk
+        Rejects non-HTML content types and binary bodies before reading them, and
+        aborts once the body passes MAX_RESPONSE_BYTES or DOWNLOAD_DEADLINE seconds
+        """
+        content_type = response.headers.get('Content-Type', '')
+        decoder = None
+        parts = []
+        
+        for chunk in iter_body(response):
+            if decoder is None:
+                if chunk.startswith(b'%PDF') or b'\x00' in chunk[:1024]:
+                    raise RejectedContent("binary body")
+                decoder = codecs.getincrementaldecoder(sniff_encoding(content_type, chunk))('replace')
+            parts.append(decoder.decode(chunk))
+        
+        if decoder:
+            parts.append(decoder.decode(b'', final=True))
+        return ''.join(parts)
+    
+    def try_download(self, url, timeout=15, attempt=0):
+        """
+        One download attempt. Returns (html, None) on success, (None, delay) when the
+        caller should retry after `delay` seconds, or (None, None) after reporting a
+        failure that is not worth retrying now
+        """
+        try:
+            return self.fetch_html(url, timeout), None
+        except RejectedContent as e:
+            print(f"  ⛔ Skipped {url[:50]}: {e}")
+            self.last_errors[url] = e
+            return None, None
+        except HostUnavailable as e:
+            print(f"  ⛔ Skipped {url[:50]}: {e}")
+            self.last_errors[url] = e
+            return None, None
+        except (TransientHTTPError, requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+            delay = self.host_health.retry_delay(urlparse(url).netloc, attempt, e)
+            if delay is not None:
+                print(f"  🔁 Retrying {url[:50]} in {delay:.1f}s ({e})")
+                return None, delay
+            if isinstance(e, requests.exceptions.Timeout):
+                print(f"  ⏱️  Timeout for {url[:50]}")
+                self.last_errors[url] = 'timeout'
+            else:
+                print(f"  ❌ Error scraping {url[:50]}: {str(e)}")
+                self.last_errors[url] = str(e)
+            return None, None
         except Exception as e:
             print(f"  ❌ Error scraping {url[:50]}: {str(e)}")
+            self.last_errors[url] = str(e)
+            return None, None
+    
+    def download(self, url, timeout=15):
+        """
+        Download a page with retries, returning None (and reporting why) on failure
+        """
+        attempt = 0
+        while True:
+            html, delay = self.try_download(url, timeout, attempt)
+            if delay is None:
+                return html
+            time.sleep(delay)
+            attempt += 1
+    
+    def extract_from_html(self, url, html):
+        """
+        Extract (content, metadata) from a page with the configured backend
+        """
+        return self.extractor.extract(url, html)
+    
+    def extract_heuristic(self, url, html):
+        """
+        Parse a page with lxml and return (content, metadata) from the built-in strategies
+        """
+        tree = parse_tree(html)
+        
+        # Remove unwanted elements (their trailing text stays in place)
+        etree.strip_elements(tree, *UNWANTED_TAGS, with_tail=False)
+        
+        content, strategy = self.extract_article_content(tree, url)
+        metadata = self.extract_metadata(tree, url)
+        metadata['strategy'] = strategy
+        return content, metadata
+    
+    def parse_html(self, url, html, clean=True):
+        """
+        Extract article text and metadata from downloaded HTML
+        """
+        try:
+            content, metadata = self.extract_from_html(url, html)
+        except Exception as e:
+            print(f"  ❌ Error scraping {url[:50]}: {str(e)}")
+            return None
+        
+        if not content or len(content) < MIN_CONTENT_LENGTH:
+            print(f"  ⚠️  Insufficient content from {url[:50]}")
             return None
+        
+        document = {
+            'url': url,
+            'text': self.clean_text(content) if clean else content,
+            'author': metadata['author'],
+            'date': metadata['date'],
+            'title': metadata['title'],
+            'domain': urlparse(url).netloc,
+            'word_count': len(content.split()),
+            'extraction_strategy': metadata.get('strategy')
+        }
+        self.record_strategy(document)
+        return document
     
-    def scrape_multiple_urls(self, urls, max_urls=None):
+    def record_strategy(self, document):
+        """Remember which content strategy worked for the document's domain"""
+        if self.strategy_memo and document.get('extraction_strategy'):
+            self.strategy_memo.record(document['domain'], document['extraction_strategy'])
+    
+    def scrape_url(self, url, timeout=15, clean=True):
+        """
+        Scrape a single URL with enhanced extraction
+        With clean=False the raw text is returned so callers can clean in batches
+        """
+        # Cache hits never touch the network, and hosts with an open circuit fail
+        # straight away, so neither waits for the politeness delay
+        html = self.cached_html(url)
+        if html is None:
+            if self.host_health.available(urlparse(url).netloc):
+                time.sleep(config.SCRAPE_DELAY)
+            html = self.download(url, timeout)
+        if html is None:
+            return None
+        return self.parse_html(url, html, clean)
+    
+    def scrape_multiple_urls(self, urls, max_urls=None, concurrent=None):
         """
         Scrape content from multiple URLs with progress tracking
+        Uses the asyncio fetcher (per-domain rate limits) unless concurrent=False
         """
-        results = []
         urls_to_scrape = urls[:max_urls] if max_urls else urls
+        if concurrent is None:
+            concurrent = config.CONCURRENT_FETCHING
+        
+        # One URL per article (AMP, mobile host and tracking-parameter variants collapse),
+        # and none collected before, here or by another source
+        if self.url_index:
+            urls_to_fetch = self.url_index.filter(urls_to_scrape)
+        else:
+            urls_to_fetch = dedupe_urls(urls_to_scrape)
+        urls_to_scrape = dedupe_urls(urls_to_scrape)
+        
+        if self.frontier:
+            # The frontier still returns documents stored for already-collected URLs
+            self.crawl_frontier(urls_to_fetch, concurrent)
+            self.frontier.print_stats(urls_to_scrape)
+            results = self.frontier.documents(urls_to_scrape)
+        elif concurrent:
+            results = AsyncContentFetcher(self).fetch_all(urls_to_fetch)
+        else:
+            results = self.scrape_sequentially(urls_to_fetch)
+        
+        # Without a frontier, URLs collected in earlier runs yield no document here
+        attempted = len(urls_to_scrape) if self.frontier else len(urls_to_fetch)
+        return self.finish_scrape(results, attempted)
+    
+    def scrape_url_stream(self, batches, key=None, concurrent=None):
+        """
+        Scrape URLs arriving in batches (e.g. SerpScheduler.stream, one batch per search
+        query), starting on each batch as soon as it arrives instead of waiting for all
+        key: function returning an item's URL (items are URLs when omitted)
+        Without the concurrent fetcher, all batches are collected first
+        """
+        if concurrent is None:
+            concurrent = config.CONCURRENT_FETCHING
+        if not concurrent:
+            async def collect():
+                return [item async for batch in iterate_batches(batches) for item in batch]
+            items = asyncio.run(collect())
+            return self.scrape_multiple_urls([key(item) if key else item for item in items], concurrent=False)
+        
+        frontier = self.frontier
+        if frontier:
+            frontier.release_dead_claims()
+        seen = set()
+        urls_to_scrape = []
+        fetched = []
+        
+        def on_batch(batch):
+            """URLs of a batch not seen in earlier batches (runs on the event loop thread)"""
+            urls = [url for url in dedupe_urls(key(item) if key else item for item in batch)
+                    if url_key(url) not in seen]
+            seen.update(url_key(url) for url in urls)
+            urls_to_scrape.extend(urls)
+            if self.url_index:
+                urls = self.url_index.filter(urls)
+            if frontier and urls:
+                frontier.add(urls)
+                urls = frontier.claim(urls, len(urls))
+            fetched.extend(urls)
+            return urls
+        
+        results = AsyncContentFetcher(self).fetch_stream(
+            batches, on_batch=on_batch, on_result=frontier.record if frontier else None
+        )
+        if frontier:
+            frontier.print_stats(urls_to_scrape)
+            results = frontier.documents(urls_to_scrape)
+        return self.finish_scrape(results, len(urls_to_scrape) if frontier else len(fetched))
+    
+    def finish_scrape(self, results, attempted):
+        """Clean scraped documents in one batch, save what the run learned and print stats"""
+        # Clean all documents in one batch
+        for doc, text in zip(results, clean_document_texts(doc['text'] for doc in results)):
+            doc['text'] = text
+        
+        if self.cache:
+            self.cache.print_stats()
+        self.host_health.print_stats()
+        if self.strategy_memo:
+            self.strategy_memo.save()
+            self.strategy_memo.print_stats()
+        if self.url_index:
+            self.url_index.add(doc['url'] for doc in results)
+            self.url_index.save()
+            self.url_index.print_stats()
+        
+        success_rate = len(results) / attempted * 100 if attempted else 0
+        print(f"\n✓ Successfully scraped {len(results)}/{attempted} URLs ({success_rate:.1f}%)")
+        return results
+    
+    def crawl_frontier(self, urls, concurrent):
+        """
+        Fetch the URLs that the crawl frontier still has pending (or failed, with
+        attempts left), committing each result as it arrives
+        """
+        frontier = self.frontier
+        frontier.add(urls)
+        frontier.release_dead_claims()
+        
+        done = frontier.status_counts(urls)['done']
+        if done:
+            print(f"⏩ Resuming crawl: {done}/{len(urls)} URLs already done")
+        
+        # Claim in batches so processes sharing the frontier split the work. Each URL is
+        # claimed at most once per run: failures are retried by later runs, not this one
+        remaining = list(urls)
+        while remaining:
+            batch = frontier.claim(remaining, config.FRONTIER_CLAIM_BATCH)
+            if not batch:
+                break
+            claimed = set(batch)
+            remaining = [url for url in remaining if url not in claimed]
+            if concurrent:
+                AsyncContentFetcher(self).fetch_all(batch, on_result=frontier.record)
+            else:
+                self.scrape_sequentially(batch, on_result=frontier.record)
+    
+    def scrape_sequentially(self, urls, on_result=None):
+        """
+        Scrape URLs one after another with a global delay (original behaviour)
+        on_result(url, document, error) is called after every URL
+        """
+        results = []
         
-        for i, url in enumerate(urls_to_scrape, 1):
-            print(f"[{i}/{len(urls_to_scrape)}] Scraping: {url[:60]}...")
-            content = self.scrape_url(url)
+        for i, url in enumerate(urls, 1):
+            print(f"[{i}/{len(urls)}] Scraping: {url[:60]}...")
+            content = self.scrape_url(url, clean=False)
+            if on_result:
+                on_result(url, content, self.last_errors.pop(url, None))
             if content:
                 results.append(content)
                 print(f"  ✓ Extracted {content['word_count']} words")
@@ -176,10 +623,32 @@ class EnhancedContentScraper:
                 print(f"  💤 Rate limit pause...")
                 time.sleep(5)
         
-        success_rate = len(results) / len(urls_to_scrape) * 100 if urls_to_scrape else 0
-        print(f"\n✓ Successfully scraped {len(results)}/{len(urls_to_scrape)} URLs ({success_rate:.1f}%)")
         return results
 
+# Per-process scrapers (one per extractor) used by parse_document() in parser pool workers,
+# sharing an in-memory strategy memo seeded by init_parse_worker()
+_worker_scrapers = {}
+_worker_memo = None
+
+def init_parse_worker(memo_counts):
+    """Process pool initializer: seed the worker's strategy memo from the parent's"""
+    global _worker_memo
+    _worker_memo = DomainStrategyMemo(counts=memo_counts) if memo_counts is not None else None
+
+def parse_document(url, html, extractor=None):
+    """
+    Process pool entry point: parse one downloaded page into a document dict
+    Text is left uncleaned so the caller can clean it in one batch
+    """
+    extractor = extractor or config.ARTICLE_EXTRACTOR
+    scraper = _worker_scrapers.get(extractor)
+    if scraper is None:
+        scraper = EnhancedContentScraper(use_cache=False, extractor=extractor, use_memo=False, use_frontier=False,
+                                         use_url_index=False)
+        scraper.strategy_memo = _worker_memo
+        _worker_scrapers[extractor] = scraper
+    return scraper.parse_html(url, html, clean=False)
+
 if __name__ == "__main__":
     # Test the scraper
     scraper = EnhancedContentScraper()
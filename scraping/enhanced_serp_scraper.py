@@ -6,34 +6,101 @@ import requests
 from bs4 import BeautifulSoup
 import time
 import json
+import threading
 import config
 from urllib.parse import urlparse
+from scraping.host_health import HostHealth
+from scraping.url_index import dedupe_urls
+from scraping.serp_cache import SerpCache
 
 class EnhancedSERPScraper:
-    def __init__(self, api_key=None):
+    def __init__(self, api_key=None, use_cache=None):
+        """
+        use_cache: serve repeated queries from the persistent SERP cache
+                   (defaults to config.SERP_CACHE_ENABLED)
+        """
         self.api_key = api_key or config.SERP_API_KEY
         self.session = requests.Session()
         self.session.headers.update({'User-Agent': config.USER_AGENT})
+        self._local = threading.local()
+        self.host_health = HostHealth()
+        self.searches = 0  # Searches that went to SerpAPI or Google
+        self.api_exhausted = False  # SerpAPI refused a search for lack of quota
+        
+        if use_cache is None:
+            use_cache = config.SERP_CACHE_ENABLED
+        self.cache = SerpCache() if use_cache else None
+    
+    def get_session(self):
+        """
+        Session for the calling thread (requests.Session is not thread-safe; the
+        scheduler searches from several threads)
+        """
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            if threading.current_thread() is threading.main_thread():
+                session = self.session
+            else:
+                session = requests.Session()
+                session.headers.update({'User-Agent': config.USER_AGENT})
+            self._local.session = session
+        return session
+    
+    def cached_results(self, backend, params):
+        """
+        (results, searchable): cached results to serve as they are (None if the query
+        must be searched), and whether searching is allowed at all (not offline)
+        """
+        if not self.cache:
+            return None, True
+        return self.cache.lookup(backend, params), not self.cache.offline
+    
+    def quota_used_up(self, response):
+        """
+        Whether a 429 from SerpAPI means the plan's searches are used up, rather than a
+        throughput limit that clears on its own: the error says so, or the account has none left
+        """
+        try:
+            if 'run out of searches' in response.json().get('error', '').lower():
+                return True
+            account = requests.get(config.SERP_ACCOUNT_URL, params={'api_key': self.api_key}, timeout=10).json()
+            remaining = account.get('total_searches_left', account.get('plan_searches_left'))
+            return remaining is not None and int(remaining) <= 0
+        except (requests.exceptions.RequestException, ValueError, TypeError, AttributeError):
+            return False
     
-    def search_with_api(self, query, num_results=10):
+    def search_with_api(self, query, num_results=10, before_search=None):
         """
         Search using SerpAPI (100 free searches/month)
         Sign up at: https://serpapi.com/
+        before_search(): called just before a search is sent (not for cached queries);
+                         returning False skips the search
         """
         if not self.api_key:
             return None
         
+        params = {
+            'q': query,
+            'num': num_results,
+            'gl': config.SERP_GL,
+            'hl': config.SERP_HL
+        }
+        cached, searchable = self.cached_results('serpapi', params)
+        if cached is not None or not searchable or self.api_exhausted:
+            return cached
+        if before_search and not before_search():
+            return None
+        
         try:
-            url = "https://serpapi.com/search"
-            params = {
-                'q': query,
-                'api_key': self.api_key,
-                'num': num_results,
-                'gl': 'in',  # India
-                'hl': 'en'
-            }
-            
-            response = requests.get(url, params=params, timeout=10)
+            url = config.SERP_API_URL
+            params = {**params, 'api_key': self.api_key}
+            self.searches += 1
+            response = self.host_health.call(
+                urlparse(url).netloc, lambda: requests.get(url, params=params, timeout=10)
+            )
+            # Other 429s were already retried with backoff; this query fails, later ones try again
+            if response.status_code == 429 and self.quota_used_up(response):
+                self.api_exhausted = True
             response.raise_for_status()
             data = response.json()
             
@@ -47,27 +114,43 @@ class EnhancedSERPScraper:
                     'position': result.get('position')
                 })
             
+            if results and self.cache:
+                self.cache.store('serpapi', params, results)
             return results
             
         except Exception as e:
             print(f"  SerpAPI error: {str(e)}")
-            return None
+            return self.cache.stale('serpapi', params) if self.cache else None
     
-    def search_with_scraping(self, query, num_results=10):
+    def search_with_scraping(self, query, num_results=10, before_search=None):
         """
         Fallback: Search Google and extract URLs using BeautifulSoup
+        before_search(): called just before a search is sent, instead of the
+                         SCRAPE_DELAY pause; returning False skips the search
         """
-        search_url = "https://www.google.com/search"
+        search_url = config.GOOGLE_SEARCH_URL
         params = {
             'q': query,
             'num': num_results,
-            'hl': 'en',
-            'gl': 'in'
+            'hl': config.SERP_HL,
+            'gl': config.SERP_GL
         }
+        cached, searchable = self.cached_results('google', params)
+        if cached is not None or not searchable:
+            return cached or []
         
-        try:
+        host = urlparse(search_url).netloc
+        if before_search:
+            if not before_search():
+                return []
+        elif self.host_health.available(host):
             time.sleep(config.SCRAPE_DELAY)
-            response = self.session.get(search_url, params=params, timeout=10)
+        
+        try:
+            self.searches += 1
+            response = self.host_health.call(
+                host, lambda: self.get_session().get(search_url, params=params, timeout=10)
+            )
             response.raise_for_status()
             
             soup = BeautifulSoup(response.text, 'html.parser')
@@ -94,28 +177,33 @@ class EnhancedSERPScraper:
                             'query': query
                         })
             
+            if results and self.cache:
+                self.cache.store('google', params, results)
             return results
             
         except Exception as e:
             print(f"  Scraping error: {str(e)}")
-            return []
+            return (self.cache.stale('google', params) if self.cache else None) or []
     
     def search_google(self, query, num_results=10):
         """
         Main search method: tries API first, falls back to scraping
         """
         print(f"Searching: {query}")
+        searches = self.searches
         
         # Try API first
         if self.api_key:
             results = self.search_with_api(query, num_results)
             if results:
-                print(f"  ✓ Found {len(results)} results (via API)")
+                source = "via API" if self.searches != searches else "cached"
+                print(f"  ✓ Found {len(results)} results ({source})")
                 return results
         
         # Fallback to scraping
         results = self.search_with_scraping(query, num_results)
-        print(f"  ✓ Found {len(results)} results (via scraping)")
+        source = "via scraping" if self.searches != searches else "cached"
+        print(f"  ✓ Found {len(results)} results ({source})")
         return results
     
     def filter_by_domains(self, results, target_domains=None):
@@ -142,6 +230,7 @@ class EnhancedSERPScraper:
         
         for i, query in enumerate(queries, 1):
             print(f"\n[{i}/{len(queries)}] ", end="")
+            searches = self.searches
             results = self.search_google(query, num_results)
             
             # Filter by target domains if enabled
@@ -153,15 +242,17 @@ class EnhancedSERPScraper:
             
             all_results.extend(results)
             
-            # Rate limiting
-            if i % 5 == 0:
+            # Rate limiting (every 5 searches; cached queries cost nothing)
+            if self.searches != searches and self.searches % 5 == 0 and config.SERP_BATCH_PAUSE:
                 print("  💤 Rate limit pause...")
-                time.sleep(10)
+                time.sleep(config.SERP_BATCH_PAUSE)
         
-        # Remove duplicates by URL
-        unique_results = {r['url']: r for r in all_results}.values()
-        unique_results = list(unique_results)
+        # Remove duplicates, counting AMP/mobile/tracking variants of a URL as one
+        unique_results = dedupe_urls(all_results, key=lambda r: r['url'])
         
+        if self.cache:
+            self.cache.print_stats()
+        self.host_health.print_stats()
         print(f"\n✓ Total unique URLs collected: {len(unique_results)}")
         return unique_results
     
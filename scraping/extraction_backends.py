@@ -0,0 +1,83 @@
+"""
+Pluggable article extraction backends for the content scraper
+Every backend turns downloaded HTML into (content, metadata), where metadata holds
+author, date and title. trafilatura and newspaper3k are optional dependencies and
+are only imported when their backend is selected
+"""
+from datetime import date, datetime
+
+class ExtractionBackend:
+    """Base class: extract(url, html) -> (content, {'author', 'date', 'title'})"""
+    name = None
+
+    def extract(self, url, html):
+        raise NotImplementedError
+
+class HeuristicBackend(ExtractionBackend):
+    """The scraper's own lxml strategies (article tag, content classes, main, all <p>)"""
+    name = 'heuristic'
+
+    def __init__(self, scraper):
+        self.scraper = scraper
+
+    def extract(self, url, html):
+        return self.scraper.extract_heuristic(url, html)
+
+class TrafilaturaBackend(ExtractionBackend):
+    """trafilatura main-text and metadata extraction"""
+    name = 'trafilatura'
+
+    def __init__(self, scraper=None):
+        try:
+            import trafilatura
+        except ImportError:
+            raise ImportError("The 'trafilatura' extractor needs trafilatura (pip install trafilatura)")
+        self.trafilatura = trafilatura
+
+    def extract(self, url, html):
+        result = self.trafilatura.bare_extraction(
+            html, url=url, include_comments=False, with_metadata=True
+        )
+        if not result:
+            return "", {'author': None, 'date': None, 'title': None}
+        return result.get('text') or "", {
+            'author': result.get('author'),
+            'date': result.get('date'),
+            'title': result.get('title')
+        }
+
+class NewspaperBackend(ExtractionBackend):
+    """newspaper3k readability-style extraction (scores text blocks by density)"""
+    name = 'newspaper'
+
+    def __init__(self, scraper=None):
+        try:
+            import newspaper
+        except ImportError:
+            raise ImportError("The 'newspaper' extractor needs newspaper3k (pip install newspaper3k)")
+        self.newspaper = newspaper
+
+    def extract(self, url, html):
+        article = self.newspaper.Article(url, fetch_images=False)
+        article.download(input_html=html)
+        article.parse()
+
+        published = article.publish_date
+        if isinstance(published, (date, datetime)):
+            published = published.isoformat()
+        return article.text or "", {
+            'author': ', '.join(article.authors) or None,
+            'date': published,
+            'title': article.title or None
+        }
+
+BACKENDS = {
+    backend.name: backend
+    for backend in (HeuristicBackend, TrafilaturaBackend, NewspaperBackend)
+}
+
+def get_backend(name, scraper):
+    """Instantiate the extraction backend registered under name"""
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown article extractor '{name}' (choose from {', '.join(BACKENDS)})")
+    return BACKENDS[name](scraper)
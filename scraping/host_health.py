@@ -0,0 +1,155 @@
+"""
+Per-host health tracking for the scrapers
+Transient failures (429, 5xx, connection errors) are retried with exponential backoff
+and full jitter, honouring Retry-After. After HOST_FAILURE_THRESHOLD consecutive
+failures a host's circuit opens and its remaining URLs are skipped until a cooldown
+has passed, so fetch time goes to hosts that are answering
+"""
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+import requests
+import config
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+REFUSED_STATUSES = (401, 403)  # Not retried, but counted toward the host's circuit
+
+class HostUnavailable(Exception):
+    """The host's circuit is open; try again after the cooldown"""
+    unattempted = True  # Nothing was sent, so the crawl frontier gives the attempt back
+
+class TransientHTTPError(Exception):
+    """A retryable status (429/5xx), with the server's Retry-After hint in seconds"""
+
+    def __init__(self, status_code, retry_after=None):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+    @classmethod
+    def from_response(cls, response):
+        return cls(response.status_code, parse_retry_after(response.headers.get('Retry-After')))
+
+def parse_retry_after(value):
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date), or None"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+class HostHealth:
+    def __init__(self, failure_threshold=None, cooldown=None, max_retries=None):
+        self.failure_threshold = failure_threshold or config.HOST_FAILURE_THRESHOLD
+        self.cooldown = cooldown or config.HOST_COOLDOWN
+        self.max_retries = config.MAX_RETRIES if max_retries is None else max_retries
+        self.hosts = {}  # host -> {'failures': consecutive failures, 'open_until': time}
+        self.lock = threading.Lock()
+        self.stats = {'retries': 0, 'circuits_opened': 0, 'skipped': 0}
+
+    def _state(self, host):
+        return self.hosts.setdefault(host, {'failures': 0, 'open_until': 0.0})
+
+    def available(self, host):
+        """False while the host's circuit is open"""
+        state = self.hosts.get(host)
+        return state is None or state['open_until'] <= time.time()
+
+    def check(self, host):
+        """Raise HostUnavailable if the host's circuit is open"""
+        if not self.available(host):
+            with self.lock:
+                self.stats['skipped'] += 1
+            wait = self.hosts[host]['open_until'] - time.time()
+            raise HostUnavailable(f"{host} circuit open for another {wait:.0f}s")
+
+    def record_success(self, host):
+        """The host answered; close its circuit"""
+        with self.lock:
+            state = self._state(host)
+            state['failures'] = 0
+            state['open_until'] = 0.0
+
+    def record_failure(self, host):
+        """The host refused a request (REFUSED_STATUSES); count it toward the circuit"""
+        with self.lock:
+            state = self._state(host)
+            state['failures'] += 1
+            if state['failures'] >= self.failure_threshold:
+                self._open(state, time.time() + self.cooldown)
+
+    def _open(self, state, until):
+        if state['open_until'] < until:
+            state['open_until'] = until
+            self.stats['circuits_opened'] += 1
+
+    def retry_delay(self, host, attempt, error):
+        """
+        Record a failed attempt and return how long to wait before retrying, or None
+        to give up (retries used up, circuit opened, timeout, or Retry-After too far off)
+        attempt: 0 for the first request
+        """
+        now = time.time()
+        with self.lock:
+            state = self._state(host)
+            state['failures'] += 1
+            if state['failures'] >= self.failure_threshold:
+                self._open(state, now + self.cooldown)
+                return None
+
+            # A timeout already cost the full timeout; retrying would double it
+            if attempt >= self.max_retries or isinstance(error, requests.exceptions.Timeout):
+                return None
+
+            retry_after = getattr(error, 'retry_after', None)
+            if retry_after is not None:
+                if retry_after > config.MAX_RETRY_AFTER:
+                    self._open(state, now + retry_after)
+                    return None
+                delay = retry_after + random.uniform(0, config.RETRY_BASE_DELAY)
+            else:
+                delay = random.uniform(0, min(config.RETRY_MAX_DELAY, config.RETRY_BASE_DELAY * 2 ** attempt))
+
+            self.stats['retries'] += 1
+            return delay
+
+    def call(self, host, send):
+        """
+        Run send() (which performs one request and returns the response) with retries
+        Returns the last response; raises HostUnavailable or the final request exception
+        """
+        attempt = 0
+        while True:
+            self.check(host)
+            try:
+                response = send()
+                if response.status_code in RETRY_STATUSES:
+                    raise TransientHTTPError.from_response(response)
+            except TransientHTTPError as e:
+                delay = self.retry_delay(host, attempt, e)
+                if delay is None:
+                    return response
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                delay = self.retry_delay(host, attempt, e)
+                if delay is None:
+                    raise
+            else:
+                self.record_success(host)
+                return response
+
+            print(f"  🔁 Retrying {host} in {delay:.1f}s")
+            time.sleep(delay)
+            attempt += 1
+
+    def print_stats(self):
+        """Print retry and circuit breaker activity"""
+        open_hosts = [host for host in self.hosts if not self.available(host)]
+        print(f"\n🩺 Host health:")
+        print(f"  Retries: {self.stats['retries']}")
+        print(f"  Circuits opened: {self.stats['circuits_opened']} ({len(open_hosts)} still open)")
+        print(f"  URLs skipped on open circuits: {self.stats['skipped']}")
@@ -0,0 +1,150 @@
+"""
+Persistent HTTP response cache for the content scraper
+Bodies are stored gzip-compressed on disk, indexed by a SQLite table with
+ETag/Last-Modified validators and an expiry time
+"""
+import gzip
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+import config
+
+class OfflineCacheMiss(Exception):
+    """Raised in offline mode when a URL has never been cached"""
+
+class ResponseCache:
+    def __init__(self, cache_dir=None, ttl=None, mode=None):
+        """
+        mode: 'default' (serve fresh entries, revalidate stale ones),
+              'refresh' (revalidate every entry) or
+              'offline' (replay cached bodies only, never touch the network)
+        """
+        self.cache_dir = Path(cache_dir or config.HTTP_CACHE_DIR)
+        self.ttl = ttl if ttl is not None else config.HTTP_CACHE_TTL
+        self.mode = mode or config.HTTP_CACHE_MODE
+        self.body_dir = self.cache_dir / 'bodies'
+        self.body_dir.mkdir(parents=True, exist_ok=True)
+
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(str(self.cache_dir / 'index.db'), check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS responses (
+                url TEXT PRIMARY KEY,
+                body_path TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                content_type TEXT,
+                size INTEGER,
+                fetched_at REAL,
+                expires_at REAL
+            )
+        ''')
+        self.conn.commit()
+
+        self.stats = {'hits': 0, 'revalidated': 0, 'misses': 0, 'stored': 0}
+
+    @property
+    def offline(self):
+        return self.mode == 'offline'
+
+    def get(self, url):
+        """Index entry for url, or None"""
+        with self.lock:
+            row = self.conn.execute(
+                'SELECT url, body_path, etag, last_modified, content_type, fetched_at, expires_at '
+                'FROM responses WHERE url=?', (url,)
+            ).fetchone()
+        if not row:
+            return None
+        keys = ('url', 'body_path', 'etag', 'last_modified', 'content_type', 'fetched_at', 'expires_at')
+        return dict(zip(keys, row))
+
+    def iter_entries(self):
+        """Index entries for every cached URL"""
+        with self.lock:
+            urls = [row[0] for row in self.conn.execute('SELECT url FROM responses ORDER BY url')]
+        for url in urls:
+            entry = self.get(url)
+            if entry:
+                yield entry
+
+    def is_fresh(self, entry):
+        """True if the entry can be served without revalidation"""
+        return self.mode != 'refresh' and entry['expires_at'] > time.time()
+
+    def read_body(self, entry):
+        """Decompress a cached body"""
+        with gzip.open(self.cache_dir / entry['body_path'], 'rt', encoding='utf-8') as f:
+            return f.read()
+
+    def lookup(self, url):
+        """
+        Body to serve without any network request (fresh entry, or any entry when
+        offline), else None
+        """
+        entry = self.get(url)
+        if entry and (self.offline or self.is_fresh(entry)):
+            try:
+                body = self.read_body(entry)
+            except OSError:
+                return None  # Body file missing, treat as a miss
+            self.stats['hits'] += 1
+            return body
+        return None
+
+    def conditional_headers(self, entry):
+        """If-None-Match / If-Modified-Since headers for revalidating an entry"""
+        headers = {}
+        if entry and entry['etag']:
+            headers['If-None-Match'] = entry['etag']
+        if entry and entry['last_modified']:
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def touch(self, url):
+        """Extend an entry's lifetime after a 304 Not Modified"""
+        now = time.time()
+        with self.lock:
+            self.conn.execute('UPDATE responses SET fetched_at=?, expires_at=? WHERE url=?',
+                              (now, now + self.ttl, url))
+            self.conn.commit()
+        self.stats['revalidated'] += 1
+
+    def store(self, url, body, headers):
+        """Compress and index a freshly downloaded body"""
+        key = hashlib.sha1(url.encode('utf-8')).hexdigest()
+        body_path = Path(key[:2]) / f'{key}.html.gz'
+        full_path = self.body_dir / body_path
+        full_path.parent.mkdir(parents=True, exist_ok=True)
+
+        # Write then rename so a crash never leaves a truncated body behind
+        temp_path = full_path.with_suffix(f'.{threading.get_ident()}.tmp')
+        with gzip.open(temp_path, 'wt', encoding='utf-8', compresslevel=6) as f:
+            f.write(body)
+        os.replace(temp_path, full_path)
+
+        now = time.time()
+        with self.lock:
+            self.conn.execute('''
+                INSERT OR REPLACE INTO responses
+                (url, body_path, etag, last_modified, content_type, size, fetched_at, expires_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (url, str(Path('bodies') / body_path), headers.get('ETag'), headers.get('Last-Modified'),
+                  headers.get('Content-Type'), len(body), now, now + self.ttl))
+            self.conn.commit()
+        self.stats['stored'] += 1
+
+    def print_stats(self):
+        """Print cache effectiveness for this run"""
+        stats = self.stats
+        print(f"\n💾 HTTP Cache ({self.mode} mode):")
+        print(f"  Fresh hits: {stats['hits']}")
+        print(f"  Revalidated (304): {stats['revalidated']}")
+        print(f"  Downloaded: {stats['misses']} ({stats['stored']} stored)")
+
+    def close(self):
+        self.conn.close()
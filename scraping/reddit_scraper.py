@@ -1,83 +1,207 @@
 """
 Reddit scraper for agriculture-related posts and comments
-Uses PRAW (Python Reddit API Wrapper)
+Uses PRAW (Python Reddit API Wrapper). Subreddit searches and comment fetches run on a
+bounded thread pool. PRAW instances are not thread-safe, so every worker thread has its
+own client, and all clients take each request from one shared RequestBudget (the
+per-client rate limiters cannot see each other's requests)
 """
-import praw
+import threading
 import time
+import praw
+import prawcore
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from praw.models import MoreComments
 import config
+from scraping.url_index import UrlIndex
+from scraping.reddit_state import RedditState, post_id
+
+SUBREDDITS = ['india', 'IndiaSpeaks', 'IndianAgriculture', 'agriculture', 'farming', 'IndianNews']
+
+class RequestBudget:
+    """
+    Thread-safe token bucket: `burst` requests back to back, then `rate` per second
+    """
+
+    def __init__(self, rate=None, burst=1):
+        self.rate = rate or config.REDDIT_REQUEST_RATE
+        self.burst = burst
+        self.tokens = burst
+        self.last = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Wait until a token is available, then take it"""
+        with self.lock:
+            now = time.monotonic()
+            tokens = min(self.burst, self.tokens + (now - self.last) * self.rate)
+
+            if tokens < 1:
+                # Holding the lock while waiting keeps requests in order
+                wait = (1 - tokens) / self.rate
+                time.sleep(wait)
+                now = time.monotonic()
+                tokens = min(self.burst, tokens + wait * self.rate)
+
+            self.tokens, self.last = tokens - 1, now
+
+class PacedRequestor(prawcore.Requestor):
+    """prawcore requestor that takes a token from a shared RequestBudget before every request"""
+
+    def __init__(self, *args, budget=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.budget = budget
+
+    def request(self, *args, **kwargs):
+        self.budget.acquire()
+        return super().request(*args, **kwargs)
 
 class RedditScraper:
-    def __init__(self, client_id=None, client_secret=None, user_agent=None):
+    def __init__(self, client_id=None, client_secret=None, user_agent=None, use_url_index=None, workers=None,
+                 use_state=None):
         """
         Initialize Reddit scraper
         To get credentials: https://www.reddit.com/prefs/apps
+        use_url_index: skip posts collected before, by any source (defaults to config.URL_INDEX_ENABLED)
+        workers: Reddit requests in flight (defaults to config.REDDIT_WORKERS)
+        use_state: fetch only posts newer than earlier runs' and threads that have grown
+                   (defaults to config.REDDIT_STATE_ENABLED)
         """
         self.client_id = client_id or config.REDDIT_CLIENT_ID
         self.client_secret = client_secret or config.REDDIT_CLIENT_SECRET
         self.user_agent = user_agent or getattr(config, 'REDDIT_USER_AGENT', config.USER_AGENT)
+        self.workers = workers or config.REDDIT_WORKERS
+        
+        self.configured = bool(self.client_id and self.client_secret)
+        if not self.configured:
+            print("⚠️  Reddit credentials not configured. Skipping Reddit scraping.")
+        self.budget = RequestBudget(burst=self.workers)
+        self.clients = threading.local()
+        
+        if use_url_index is None:
+            use_url_index = config.URL_INDEX_ENABLED
+        self.url_index = UrlIndex.from_config() if use_url_index else None
         
-        if self.client_id and self.client_secret:
-            self.reddit = praw.Reddit(
+        if use_state is None:
+            use_state = config.REDDIT_STATE_ENABLED
+        self.state = RedditState() if use_state else None
+    
+    @property
+    def reddit(self):
+        """This thread's PRAW client (None without credentials)"""
+        if not self.configured:
+            return None
+        client = getattr(self.clients, 'reddit', None)
+        if client is None:
+            client = self.clients.reddit = praw.Reddit(
                 client_id=self.client_id,
                 client_secret=self.client_secret,
-                user_agent=self.user_agent
+                user_agent=self.user_agent,
+                reddit_url=config.REDDIT_URL,
+                oauth_url=config.REDDIT_OAUTH_URL,
+                requestor_class=PacedRequestor,
+                requestor_kwargs={'budget': self.budget}
             )
-        else:
-            print("⚠️  Reddit credentials not configured. Skipping Reddit scraping.")
-            self.reddit = None
+        return client
     
-    def search_posts(self, query, subreddits=['india', 'IndiaSpeaks', 'IndianAgriculture', 'agriculture', 'farming', 'IndianNews'], limit=50):
+    def post_data(self, submission, subreddit_name):
+        return {
+            'text': submission.title + ". " + submission.selftext,
+            'url': f"https://reddit.com{submission.permalink}",
+            'author': str(submission.author),
+            'date': datetime.fromtimestamp(submission.created_utc).isoformat(),
+            'domain': 'reddit.com',
+            'subreddit': subreddit_name,
+            'score': submission.score,
+            'num_comments': submission.num_comments,
+            'type': 'post'
+        }
+    
+    def search_subreddit(self, subreddit_name, query, limit=50):
         """
-        Search Reddit posts by query across multiple subreddits
+        Search one subreddit's posts by query
+        After a first run only posts newer than the search's high-water mark are fetched
         """
-        if not self.reddit:
-            return []
-        
+        mark, seen = self.state.search_mark(subreddit_name, query) if self.state else (None, set())
         results = []
-        
-        for subreddit_name in subreddits:
-            try:
-                subreddit = self.reddit.subreddit(subreddit_name)
-                print(f"Searching r/{subreddit_name} for: {query}")
-                
-                # Search posts
-                for submission in subreddit.search(query, limit=limit, sort='relevance'):
-                    post_data = {
-                        'text': submission.title + ". " + submission.selftext,
-                        'url': f"https://reddit.com{submission.permalink}",
-                        'author': str(submission.author),
-                        'date': datetime.fromtimestamp(submission.created_utc).isoformat(),
-                        'domain': 'reddit.com',
-                        'subreddit': subreddit_name,
-                        'score': submission.score,
-                        'num_comments': submission.num_comments,
-                        'type': 'post'
-                    }
-                    
-                    if post_data['text'].strip():
-                        results.append(post_data)
-                
-                time.sleep(1)  # Rate limiting
+        post_ids = []
+        newest = None
+        reached_mark = not mark
+        try:
+            subreddit = self.reddit.subreddit(subreddit_name)
+            print(f"Searching r/{subreddit_name} for: {query}")
+            
+            # Search posts (newest first once there is a mark, so the listing stops at it).
+            # Past a mark, `limit` counts only unseen posts, so posts left over by a run
+            # that hit the limit are reached by the next one
+            listing = subreddit.search(query, limit=None if mark else limit, sort='new' if mark else 'relevance')
+            for submission in listing:
+                if mark and submission.created_utc <= mark:
+                    reached_mark = True
+                    break
+                if submission.id in seen:
+                    # Known posts still move the mark: a run cut short may have listed the newest ones
+                    newest = max(newest or submission.created_utc, submission.created_utc)
+                    if self.state:
+                        self.state.count('known_posts')
+                    continue
+                if len(post_ids) >= limit:
+                    break
+                post_data = self.post_data(submission, subreddit_name)
+                post_ids.append(submission.id)
+                newest = max(newest or submission.created_utc, submission.created_utc)
                 
-            except Exception as e:
-                print(f"Error searching r/{subreddit_name}: {str(e)}")
+                if post_data['text'].strip():
+                    results.append(post_data)
+            else:
+                reached_mark = True  # Listing exhausted
+            
+        except Exception as e:
+            # Keep the partial results; their posts are recorded as seen below
+            print(f"Error searching r/{subreddit_name}: {str(e)}")
         
+        if self.state:
+            # The mark only advances once everything newer than it has been listed
+            self.state.record_search(subreddit_name, query, post_ids, newest if reached_mark else None)
+            self.state.count('new_posts', len(post_ids))
         return results
     
+    def search_posts(self, query, subreddits=None, limit=50):
+        """
+        Search Reddit posts by query across multiple subreddits (concurrently)
+        """
+        if not self.configured:
+            return []
+        
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            searches = [pool.submit(self.search_subreddit, name, query, limit) for name in subreddits or SUBREDDITS]
+            return [post for search in searches for post in search.result()]
+    
     def get_post_comments(self, post_url, limit=100):
         """
-        Extract comments from a Reddit post
+        Extract up to `limit` comments from a Reddit post, breadth-first
+        Returns None if the thread could not be fetched
         """
-        if not self.reddit:
+        if not self.configured:
             return []
         
         try:
             submission = self.reddit.submission(url=post_url)
-            submission.comments.replace_more(limit=0)  # Flatten comment tree
+            submission.comment_limit = limit  # Reddit sends no more comments than are read
             
+            # Walk the tree in the order comments.list() gives, stopping after `limit`
+            # comments; "load more" stubs are skipped, as replace_more(limit=0) did
             comments = []
-            for comment in submission.comments.list()[:limit]:
+            queue = deque(submission.comments)
+            visited = 0
+            while queue and visited < limit:
+                comment = queue.popleft()
+                if isinstance(comment, MoreComments):
+                    continue
+                visited += 1
+                queue.extend(comment.replies)
+                
                 if hasattr(comment, 'body') and len(comment.body) > 20:
                     comment_data = {
                         'text': comment.body,
@@ -95,24 +219,113 @@ class RedditScraper:
             
         except Exception as e:
             print(f"Error extracting comments from {post_url}: {str(e)}")
+            return None
+    
+    def thread_comments(self, post, limit=100):
+        """
+        Comments of a post's thread not collected before; threads whose num_comments
+        is unchanged since they were last read are not fetched
+        """
+        if not self.state:
+            return self.get_post_comments(post['url'], limit) or []
+        
+        thread_id = post_id(post['url'])
+        cached = self.state.thread(thread_id)
+        if cached and cached[0] == post['num_comments']:
+            self.state.count('threads_unchanged')
             return []
+        
+        # A failed fetch is not recorded, so the thread is read again next run
+        comments = self.get_post_comments(post['url'], limit)
+        if comments is None:
+            return []
+        self.state.count('threads_fetched')
+        if cached:
+            self.state.count('threads_refreshed')
+        known = cached[1] if cached else set()
+        comment_ids = [comment['url'][len(post['url']):] for comment in comments]
+        self.state.record_thread(thread_id, post['num_comments'], known | set(comment_ids))
+        return [comment for comment, comment_id in zip(comments, comment_ids) if comment_id not in known]
+    
+    def grown_threads(self, queries, exclude=()):
+        """
+        Posts whose threads were read in earlier runs of these queries and have gained
+        comments since (num_comments looked up 100 submissions per request)
+        """
+        threads = self.state.known_threads(SUBREDDITS, queries)
+        for thread_id in exclude:
+            threads.pop(thread_id, None)
+        
+        if not threads:
+            return []
+        grown = []
+        try:
+            for submission in self.reddit.info(fullnames=[f"t3_{thread_id}" for thread_id in threads]):
+                if submission.num_comments != threads.get(submission.id):
+                    grown.append(self.post_data(submission, str(submission.subreddit)))
+        except Exception as e:
+            print(f"Error looking up known threads: {str(e)}")
+        
+        self.state.count('threads_unchanged', len(threads) - len(grown))
+        return grown
     
     def scrape_agriculture_content(self, queries, max_posts_per_query=30):
         """
         Main method to scrape agriculture-related content from Reddit
         Enhanced for better diversity
         """
-        all_results = []
+        if not self.configured:
+            return []
         
-        for query in queries:
-            posts = self.search_posts(query, limit=max_posts_per_query)
-            all_results.extend(posts)
+        all_results = []
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            # Queue every subreddit search up front; each query's comment fetches are
+            # queued as soon as its posts are in, while later searches still run
+            searches = [
+                [pool.submit(self.search_subreddit, name, query, max_posts_per_query) for name in SUBREDDITS]
+                for query in queries
+            ]
+            
+            collected = []
+            queued = set()  # Threads already queued by an earlier query
+            for query_searches in searches:
+                posts = [post for search in query_searches for post in search.result()]
+                
+                # A post matching several queries (or already scraped as a web page) is collected once
+                if self.url_index:
+                    posts = self.url_index.filter(posts, key=lambda post: post['url'])
+                    self.url_index.add(post['url'] for post in posts)
+                
+                # Also get comments from top posts for opinion diversity (top 10 per query;
+                # posts without comments need no request)
+                comment_fetches = []
+                for post in posts[:10]:
+                    thread_id = post_id(post['url'])
+                    if post['num_comments'] and thread_id not in queued:
+                        queued.add(thread_id)
+                        comment_fetches.append(
+                            pool.submit(self.thread_comments, post, config.REDDIT_MAX_COMMENTS)
+                        )
+                collected.append((posts, comment_fetches))
+            
+            # New comments in threads read by earlier runs
+            if self.state:
+                collected.append(([], [
+                    pool.submit(self.thread_comments, post, config.REDDIT_MAX_COMMENTS)
+                    for post in self.grown_threads(queries, exclude=queued)
+                ]))
             
-            # Also get comments from top posts for opinion diversity
-            for post in posts[:10]:  # Get comments from top 10 posts per query
-                comments = self.get_post_comments(post['url'], limit=100)
-                all_results.extend(comments)
+            for posts, comment_fetches in collected:
+                all_results.extend(posts)
+                for fetch in comment_fetches:
+                    all_results.extend(fetch.result())
         
+        if self.url_index:
+            self.url_index.save()
+            self.url_index.print_stats()
+        if self.state:
+            self.state.save()
+            self.state.print_stats()
         print(f"✓ Collected {len(all_results)} items from Reddit")
         return all_results
 
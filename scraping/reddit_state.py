@@ -0,0 +1,132 @@
+"""
+Persistent state for incremental Reddit scraping
+Per (subreddit, query): the submission IDs seen and the newest created_utc (high-water
+mark), so later runs fetch only newer posts. Per submission: num_comments and the comment
+IDs when its thread was last read, so unchanged threads are not fetched again
+"""
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from urllib.parse import urlparse
+import config
+
+def post_id(url):
+    """Submission ID from a post URL (https://reddit.com/r/<sub>/comments/<id>/<slug>/)"""
+    return urlparse(url).path.strip('/').split('/')[3]
+
+class RedditState:
+    def __init__(self, path=None):
+        self.path = Path(path or config.REDDIT_STATE_PATH)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS reddit_searches (
+                subreddit TEXT NOT NULL,
+                query TEXT NOT NULL,
+                newest_utc REAL,
+                seen_ids TEXT NOT NULL,
+                updated_at REAL,
+                PRIMARY KEY (subreddit, query)
+            )
+        ''')
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS reddit_threads (
+                post_id TEXT PRIMARY KEY,
+                num_comments INTEGER,
+                comment_ids TEXT NOT NULL,
+                fetched_at REAL
+            )
+        ''')
+        self.conn.commit()
+
+        # Written by save(), so a run that fails part-way does not advance the marks
+        self.pending_searches = {}  # (subreddit, query) -> (newest_utc, seen ids)
+        self.pending_threads = {}  # post id -> (num_comments, comment ids)
+        self.stats = {'new_posts': 0, 'known_posts': 0, 'threads_fetched': 0, 'threads_unchanged': 0,
+                      'threads_refreshed': 0}
+
+    def search_mark(self, subreddit, query):
+        """(newest created_utc, seen submission IDs) of a search, or (None, empty set)"""
+        with self.lock:
+            if (subreddit, query) in self.pending_searches:
+                newest, seen = self.pending_searches[subreddit, query]
+                return newest, set(seen)
+            row = self.conn.execute(
+                'SELECT newest_utc, seen_ids FROM reddit_searches WHERE subreddit=? AND query=?', (subreddit, query)
+            ).fetchone()
+        return (row[0], set(json.loads(row[1]))) if row else (None, set())
+
+    def record_search(self, subreddit, query, post_ids, newest_utc):
+        """Add a search's new submissions and advance its high-water mark"""
+        mark, seen = self.search_mark(subreddit, query)
+        if mark is not None and (newest_utc is None or mark > newest_utc):
+            newest_utc = mark
+        with self.lock:
+            self.pending_searches[subreddit, query] = (newest_utc, seen | set(post_ids))
+
+    def thread(self, post_id):
+        """(num_comments, comment IDs) when the thread was last read, or None"""
+        with self.lock:
+            if post_id in self.pending_threads:
+                return self.pending_threads[post_id]
+            row = self.conn.execute(
+                'SELECT num_comments, comment_ids FROM reddit_threads WHERE post_id=?', (post_id,)
+            ).fetchone()
+        return (row[0], set(json.loads(row[1]))) if row else None
+
+    def record_thread(self, post_id, num_comments, comment_ids):
+        with self.lock:
+            self.pending_threads[post_id] = (num_comments, set(comment_ids))
+
+    def known_threads(self, subreddits, queries):
+        """{post id: num_comments} of read threads that the given searches returned before"""
+        seen = set()
+        for subreddit in subreddits:
+            for query in queries:
+                seen |= self.search_mark(subreddit, query)[1]
+        threads = {}
+        for post in seen:
+            cached = self.thread(post)
+            if cached:
+                threads[post] = cached[0]
+        return threads
+
+    def count(self, stat, amount=1):
+        with self.lock:
+            self.stats[stat] += amount
+
+    def save(self):
+        """Write this run's marks and threads in one transaction"""
+        now = time.time()
+        with self.lock:
+            self.conn.executemany(
+                'INSERT OR REPLACE INTO reddit_searches (subreddit, query, newest_utc, seen_ids, updated_at) '
+                'VALUES (?, ?, ?, ?, ?)',
+                [(subreddit, query, newest, json.dumps(sorted(seen)), now)
+                 for (subreddit, query), (newest, seen) in self.pending_searches.items()]
+            )
+            self.conn.executemany(
+                'INSERT OR REPLACE INTO reddit_threads (post_id, num_comments, comment_ids, fetched_at) '
+                'VALUES (?, ?, ?, ?)',
+                [(post, num_comments, json.dumps(sorted(ids)), now)
+                 for post, (num_comments, ids) in self.pending_threads.items()]
+            )
+            self.conn.commit()
+            self.pending_searches.clear()
+            self.pending_threads.clear()
+
+    def print_stats(self):
+        """Print how much re-fetching the state saved"""
+        stats = self.stats
+        print(f"\n📌 Reddit state ({self.path}):")
+        print(f"  New posts: {stats['new_posts']}, already seen: {stats['known_posts']}")
+        print(f"  Threads read: {stats['threads_fetched']} ({stats['threads_refreshed']} grown since last run), "
+              f"unchanged and skipped: {stats['threads_unchanged']}")
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,104 @@
+"""
+Persistent cache of search results for the SERP scraper
+Results are stored as JSON in SQLite, keyed by (query, num, gl, hl, backend), so reruns
+serve repeated queries instantly instead of spending SerpAPI quota
+"""
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+import config
+
+class SerpCache:
+    def __init__(self, path=None, ttl=None, mode=None):
+        """
+        mode: 'default' (serve fresh entries, re-search only stale ones),
+              'refresh' (re-search every query) or
+              'offline' (serve cached results of any age, never search)
+        """
+        self.path = Path(path or config.SERP_CACHE_PATH)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl if ttl is not None else config.SERP_CACHE_TTL
+        self.mode = mode or config.SERP_CACHE_MODE
+
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS serp_results (
+                query TEXT NOT NULL,
+                num INTEGER NOT NULL,
+                gl TEXT NOT NULL,
+                hl TEXT NOT NULL,
+                backend TEXT NOT NULL,
+                results TEXT NOT NULL,
+                fetched_at REAL,
+                expires_at REAL,
+                PRIMARY KEY (query, num, gl, hl, backend)
+            )
+        ''')
+        self.conn.commit()
+
+        self.stats = {'hits': 0, 'stale': 0, 'misses': 0, 'stored': 0, 'stale_served': 0}
+
+    @property
+    def offline(self):
+        return self.mode == 'offline'
+
+    def _key(self, backend, params):
+        return (params['q'], int(params['num']), params['gl'], params['hl'], backend)
+
+    def _get(self, backend, params):
+        with self.lock:
+            row = self.conn.execute(
+                'SELECT results, expires_at FROM serp_results '
+                'WHERE query=? AND num=? AND gl=? AND hl=? AND backend=?', self._key(backend, params)
+            ).fetchone()
+        return (json.loads(row[0]), row[1]) if row else (None, None)
+
+    def lookup(self, backend, params):
+        """
+        Cached results to serve without searching (fresh entry, or any entry when
+        offline), else None
+        """
+        results, expires_at = self._get(backend, params)
+        if results is None:
+            self.stats['misses'] += 1
+            return None
+        if self.offline or (self.mode != 'refresh' and expires_at > time.time()):
+            self.stats['hits'] += 1
+            return results
+        self.stats['stale'] += 1
+        return None
+
+    def stale(self, backend, params):
+        """Cached results of any age, served when a re-search fails"""
+        results, _ = self._get(backend, params)
+        if results is not None:
+            self.stats['stale_served'] += 1
+        return results
+
+    def store(self, backend, params, results):
+        """Cache the results of a successful search"""
+        now = time.time()
+        with self.lock:
+            self.conn.execute(
+                'INSERT OR REPLACE INTO serp_results '
+                '(query, num, gl, hl, backend, results, fetched_at, expires_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                (*self._key(backend, params), json.dumps(results, ensure_ascii=False), now, now + self.ttl)
+            )
+            self.conn.commit()
+        self.stats['stored'] += 1
+
+    def print_stats(self):
+        """Print cache effectiveness for this run"""
+        stats = self.stats
+        print(f"\n💾 SERP Cache ({self.mode} mode):")
+        print(f"  Fresh hits: {stats['hits']}")
+        print(f"  Stale: {stats['stale']}, not cached: {stats['misses']} ({stats['stored']} searched and stored)")
+        if stats['stale_served']:
+            print(f"  Stale results served after a failed search: {stats['stale_served']}")
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,199 @@
+"""
+Concurrent, quota-aware scheduler for SERP queries
+Queries are searched on a thread pool, paced per backend with token buckets (SerpAPI
+at SERP_API_RATE, the Google scraping fallback at SERP_SCRAPE_RATE). Each query is
+answered from the SERP cache, by SerpAPI while quota is left, or by scraping, and its
+results are yielded as soon as it completes, so content fetching can start on the
+first query's URLs instead of waiting for the whole query list
+"""
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+import requests
+import config
+from scraping.async_fetcher import DomainRateLimiter
+from scraping.enhanced_serp_scraper import EnhancedSERPScraper
+from scraping.url_index import url_key
+
+class SerpQuota:
+    """SerpAPI searches left, shared by the scheduler's worker threads"""
+
+    def __init__(self, remaining=None, reserve=None):
+        """
+        remaining: searches left on the plan (None = unknown; searches are spent until
+                   SerpAPI refuses one)
+        reserve: searches kept back for other uses
+        """
+        self.remaining = remaining
+        self.reserve = config.SERP_QUOTA_RESERVE if reserve is None else reserve
+        self.used = 0
+        self.lock = threading.Lock()
+
+    @classmethod
+    def from_account(cls, api_key):
+        """config.SERP_API_QUOTA if set, else the searches left on the SerpAPI account"""
+        if not api_key:
+            return cls(remaining=0)
+        if config.SERP_API_QUOTA is not None:
+            return cls(config.SERP_API_QUOTA)
+        try:
+            response = requests.get(config.SERP_ACCOUNT_URL, params={'api_key': api_key}, timeout=10)
+            response.raise_for_status()
+            account = response.json()
+            remaining = account.get('total_searches_left', account.get('plan_searches_left'))
+            return cls(int(remaining) if remaining is not None else None)
+        except Exception as e:
+            print(f"  SerpAPI account lookup failed ({e}); quota unknown")
+            return cls()
+
+    def take(self):
+        """Spend one search; False once only the reserve is left"""
+        with self.lock:
+            if self.remaining is not None:
+                if self.remaining <= self.reserve:
+                    return False
+                self.remaining -= 1
+            self.used += 1
+            return True
+
+    def exhaust(self):
+        """SerpAPI refused a search: nothing is left"""
+        with self.lock:
+            self.remaining = 0
+
+class SerpScheduler:
+    def __init__(self, scraper=None, quota=None, concurrency=None, api_rate=None, scrape_rate=None):
+        """
+        scraper: EnhancedSERPScraper doing the searches (its cache and host health are used)
+        quota: SerpQuota (None = SerpQuota.from_account, or unknown in offline cache mode)
+        """
+        self.scraper = scraper or EnhancedSERPScraper()
+        if quota is None:
+            offline = self.scraper.cache and self.scraper.cache.offline
+            quota = SerpQuota() if offline else SerpQuota.from_account(self.scraper.api_key)
+        self.quota = quota
+        self.concurrency = concurrency or config.SERP_CONCURRENCY
+        self.api_limiter = DomainRateLimiter(rate=api_rate or config.SERP_API_RATE, burst=self.concurrency)
+        self.scrape_limiter = DomainRateLimiter(rate=scrape_rate or config.SERP_SCRAPE_RATE, burst=1)
+        self.results = []  # Unique results of the last run, in query order
+        self.stats = {'api': 0, 'scraping': 0, 'cached': 0}
+
+    def _before_search(self, backend, searched, loop):
+        """
+        Worker-thread hook run just before a search is sent: spend quota for API
+        searches and wait for the backend's token. False skips the search
+        """
+        if backend == 'api':
+            if not self.quota.take():
+                return False
+            limiter, url = self.api_limiter, config.SERP_API_URL
+        else:
+            limiter, url = self.scrape_limiter, config.GOOGLE_SEARCH_URL
+
+        # Hosts with an open circuit fail immediately and need no token
+        host = urlparse(url).netloc
+        if self.scraper.host_health.available(host):
+            asyncio.run_coroutine_threadsafe(limiter.acquire(host), loop).result()
+        searched.append(backend)
+        return True
+
+    def search(self, query, num_results, loop):
+        """
+        Answer one query on a worker thread: cache, SerpAPI while quota is left, else
+        the scraping fallback. Returns (results, source)
+        """
+        scraper = self.scraper
+        searched = []
+
+        if scraper.api_key:
+            results = scraper.search_with_api(
+                query, num_results, before_search=lambda: self._before_search('api', searched, loop)
+            )
+            if scraper.api_exhausted:
+                self.quota.exhaust()
+            if results:
+                return results, 'api' if searched else 'cached'
+
+        searched.clear()
+        results = scraper.search_with_scraping(
+            query, num_results, before_search=lambda: self._before_search('scraping', searched, loop)
+        )
+        return results, 'scraping' if searched else 'cached'
+
+    async def stream(self, queries, num_results=10, filter_domains=True, max_per_domain=None):
+        """
+        Search all queries concurrently, yielding each query's results as it completes
+        URLs yielded for an earlier query (or variants of them) are left out, and
+        max_per_domain caps the results kept per domain like get_diverse_results
+        """
+        queries = list(queries)
+        loop = asyncio.get_running_loop()
+        executor = ThreadPoolExecutor(max_workers=self.concurrency)
+
+        async def search(index, query):
+            return index, await loop.run_in_executor(executor, self.search, query, num_results, loop)
+
+        print(f"Searching {len(queries)} queries ({self.concurrency} in flight, "
+              f"{self.api_limiter.rate:g} API searches/s, {self.scrape_limiter.rate:g} scraping searches/s)...")
+        start = time.monotonic()
+        tasks = [asyncio.ensure_future(search(i, query)) for i, query in enumerate(queries)]
+        kept = [[] for _ in queries]
+        seen = set()
+        domain_counts = {}
+        try:
+            for done, task in enumerate(asyncio.as_completed(tasks), 1):
+                index, (results, source) = await task
+                self.stats[source] += 1
+                if filter_domains and config.TARGET_DOMAINS:
+                    results = self.scraper.filter_by_domains(results, config.TARGET_DOMAINS)
+
+                for result in results:
+                    key = url_key(result['url'])
+                    domain = urlparse(result['url']).netloc
+                    if key in seen or (max_per_domain and domain_counts.get(domain, 0) >= max_per_domain):
+                        continue
+                    seen.add(key)
+                    domain_counts[domain] = domain_counts.get(domain, 0) + 1
+                    kept[index].append(result)
+
+                print(f"[{done}/{len(queries)}] {queries[index]}: {len(results)} results "
+                      f"({source}, {len(kept[index])} new)")
+                if kept[index]:
+                    yield kept[index]
+        finally:
+            for task in tasks:
+                task.cancel()
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        self.results = [result for results in kept for result in results]
+        self.print_stats(time.monotonic() - start)
+
+    def run(self, queries, num_results=10, filter_domains=True, max_per_domain=None):
+        """Search all queries and return their unique results in query order"""
+        async def drain():
+            async for _ in self.stream(queries, num_results, filter_domains, max_per_domain):
+                pass
+        asyncio.run(drain())
+        return self.results
+
+    def print_stats(self, elapsed):
+        """Print where queries were answered from and the quota spent"""
+        if self.scraper.cache:
+            self.scraper.cache.print_stats()
+        self.scraper.host_health.print_stats()
+
+        stats = self.stats
+        left = 'unknown' if self.quota.remaining is None else self.quota.remaining
+        print(f"\n🔎 SERP scheduler ({elapsed:.1f}s):")
+        print(f"  Queries via API: {stats['api']}, scraping fallback: {stats['scraping']}, cache: {stats['cached']}")
+        print(f"  SerpAPI searches used: {self.quota.used} (left: {left})")
+        print(f"\n✓ Total unique URLs collected: {len(self.results)}")
+
+if __name__ == "__main__":
+    # Test the scheduler
+    scheduler = SerpScheduler()
+    results = scheduler.run(config.AGRICULTURE_QUERIES[:5], num_results=5)
+    for r in results[:5]:
+        print(f"  - {r['url']}")
@@ -0,0 +1,77 @@
+"""
+Per-domain memo of which content extraction strategy works
+Pages on one site share a template, so once a strategy has produced content for a
+domain, later pages try it first and skip the DOM scans of the strategies before it
+"""
+import json
+import os
+import threading
+from pathlib import Path
+import config
+
+class DomainStrategyMemo:
+    def __init__(self, path=None, counts=None):
+        """
+        path: JSON file the memo is loaded from and saved to (None = in memory only)
+        counts: initial {domain: {strategy: successes}}, e.g. a snapshot from another process
+        """
+        self.path = Path(path) if path else None
+        self.counts = {domain: dict(strategies) for domain, strategies in (counts or {}).items()}
+        self.lock = threading.Lock()
+        self.dirty = False
+        self.stats = {'confirmed': 0, 'learned': 0}
+
+        if self.path and self.path.exists() and counts is None:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.counts = json.load(f)
+
+    @classmethod
+    def from_config(cls):
+        """The persistent memo at config.EXTRACTION_MEMO_PATH"""
+        return cls(config.EXTRACTION_MEMO_PATH)
+
+    def lookup(self, domain):
+        """Strategy that has worked most often on this domain, or None"""
+        # record() may add a strategy mid-scan from another worker thread
+        with self.lock:
+            return self._best(domain)
+
+    def _best(self, domain):
+        """lookup() for callers already holding the lock"""
+        strategies = self.counts.get(domain)
+        if not strategies:
+            return None
+        return max(strategies, key=strategies.get)
+
+    def record(self, domain, strategy):
+        """Count a page of this domain whose content came from strategy"""
+        with self.lock:
+            if self._best(domain) == strategy:
+                self.stats['confirmed'] += 1
+            else:
+                self.stats['learned'] += 1
+            strategies = self.counts.setdefault(domain, {})
+            strategies[strategy] = strategies.get(strategy, 0) + 1
+            self.dirty = True
+
+    def snapshot(self):
+        """Plain-dict copy for handing to worker processes"""
+        with self.lock:
+            return {domain: dict(strategies) for domain, strategies in self.counts.items()}
+
+    def save(self):
+        """Write the memo to disk if it changed (no-op for in-memory memos)"""
+        if not self.path or not self.dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = self.path.with_suffix('.tmp')
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.snapshot(), f, indent=2, sort_keys=True)
+        os.replace(temp_path, self.path)
+        self.dirty = False
+
+    def print_stats(self):
+        """Print how often pages followed their domain's known strategy"""
+        print(f"\n🧭 Extraction strategy memo ({len(self.counts)} domains):")
+        print(f"  Pages matching the domain's strategy: {self.stats['confirmed']}")
+        print(f"  Pages that taught a new strategy: {self.stats['learned']}")
@@ -0,0 +1,254 @@
+"""
+URL canonicalization and a persistent seen-index shared by the SERP, content and
+Reddit paths. Variants of one article (http/https, www/m/amp hosts, AMP paths,
+tracking parameters, fragments, Google redirect links) map to one canonical key,
+which is stored as a 64-bit hash in an exact set or, for large crawls, a Bloom filter
+"""
+import hashlib
+import math
+import os
+from pathlib import Path
+from urllib.parse import urlsplit, parse_qsl, urlencode, unquote, quote
+import numpy as np
+import config
+
+TRACKING_PARAMS = {
+    'fbclid', 'gclid', 'dclid', 'msclkid', 'yclid', 'igshid', 'mc_cid', 'mc_eid',
+    '_ga', '_gl', 'ref', 'ref_src', 'ref_url', 'cmpid', 'ito', 'ncid', 'amp', 'outputtype'
+}
+TRACKING_PREFIXES = ('utm_',)
+
+HOST_PREFIXES = ('www.', 'm.', 'amp.', 'mobile.')
+REDDIT_HOST_PREFIXES = ('old.', 'new.', 'np.')
+
+def canonicalize_url(url):
+    """
+    Scheme-less canonical form of a URL used as its identity, e.g.
+    http://m.example.com/news/story/amp/?utm_source=x#top -> example.com/news/story
+    """
+    parts = urlsplit(url.strip())
+    host = (parts.hostname or '').lower().rstrip('.')
+    query = parse_qsl(parts.query, keep_blank_values=True)
+
+    # Google result links wrap the target: /url?q=<target>
+    if host.startswith(('google.', 'www.google.')) and parts.path == '/url':
+        target = dict(query).get('q') or dict(query).get('url')
+        if target and target.startswith('http'):
+            return canonicalize_url(target)
+
+    for prefix in HOST_PREFIXES:
+        if host.startswith(prefix) and host.count('.') > 1:
+            host = host[len(prefix):]
+            break
+    if host.endswith('reddit.com'):
+        for prefix in REDDIT_HOST_PREFIXES:
+            if host.startswith(prefix):
+                host = host[len(prefix):]
+                break
+    if parts.port and parts.port not in (80, 443):
+        host = f"{host}:{parts.port}"
+
+    # Normalize percent-encoding, drop empty and AMP segments and the trailing slash
+    segments = [segment for segment in unquote(parts.path).split('/') if segment]
+    if segments and segments[-1].lower() == 'amp':
+        segments.pop()
+    if segments and segments[0].lower() == 'amp':
+        segments.pop(0)
+    if segments and segments[-1].lower().endswith('.amp'):
+        segments[-1] = segments[-1][:-4]
+    elif segments and '.amp.' in segments[-1].lower():
+        index = segments[-1].lower().index('.amp.')
+        segments[-1] = segments[-1][:index] + segments[-1][index + 4:]
+    path = quote('/' + '/'.join(segments), safe="/:@!$&'()*+,;=-._~")
+
+    query = sorted(
+        (key, value) for key, value in query
+        if key.lower() not in TRACKING_PARAMS and not key.lower().startswith(TRACKING_PREFIXES)
+    )
+    canonical = host + (path if path != '/' else '')
+    if query:
+        canonical += '?' + urlencode(query)
+    return canonical
+
+def url_key(url):
+    """64-bit hash of the canonical URL"""
+    digest = hashlib.blake2b(canonicalize_url(url).encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'little')
+
+def dedupe_urls(items, key=None):
+    """
+    Keep the first item of every canonical URL, in order
+    key: function returning an item's URL (items are URLs when omitted)
+    """
+    seen = set()
+    unique = []
+    for item in items:
+        canonical = canonicalize_url(key(item) if key else item)
+        if canonical not in seen:
+            seen.add(canonical)
+            unique.append(item)
+    return unique
+
+class ExactSeenSet:
+    """Exact set of 64-bit URL hashes (8 bytes per URL on disk)"""
+
+    def __init__(self):
+        self.keys = set()
+
+    def __contains__(self, key):
+        return key in self.keys
+
+    def __len__(self):
+        return len(self.keys)
+
+    def add(self, key):
+        self.keys.add(key)
+
+    def merge(self, other):
+        self.keys |= other.keys
+
+    def save(self, path):
+        np.save(path, np.fromiter(self.keys, dtype=np.uint64, count=len(self.keys)))
+
+    @classmethod
+    def load(cls, path):
+        seen = cls()
+        seen.keys = set(np.load(path).tolist())
+        return seen
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter over 64-bit URL hashes: no false negatives, a
+    configurable false-positive rate, and memory independent of URL length
+    """
+
+    def __init__(self, capacity, error_rate):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.num_bits = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self.bits = np.zeros((self.num_bits + 7) // 8, dtype=np.uint8)
+        self.count = 0
+
+    def _positions(self, key):
+        # Double hashing: split a 128-bit digest of the key into two 64-bit hashes
+        digest = hashlib.blake2b(key.to_bytes(8, 'little'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+
+    def __contains__(self, key):
+        return all(self.bits[p >> 3] & (1 << (p & 7)) for p in self._positions(key))
+
+    def __len__(self):
+        return self.count
+
+    def add(self, key):
+        if key in self:
+            return
+        for p in self._positions(key):
+            self.bits[p >> 3] |= 1 << (p & 7)
+        self.count += 1
+
+    def merge(self, other):
+        if (other.num_bits, other.num_hashes) != (self.num_bits, self.num_hashes):
+            raise ValueError("cannot merge Bloom filters of different sizes")
+        self.bits |= other.bits
+        self.count = max(self.count, other.count)
+
+    def save(self, path):
+        np.savez_compressed(path, bits=self.bits,
+                            params=np.array([self.capacity, self.num_bits, self.num_hashes, self.count], dtype=np.int64),
+                            error_rate=np.array([self.error_rate]))
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            capacity, num_bits, num_hashes, count = (int(v) for v in data['params'])
+            bloom = cls(capacity, float(data['error_rate'][0]))
+            bloom.num_bits, bloom.num_hashes, bloom.count = num_bits, num_hashes, count
+            bloom.bits = data['bits'].copy()
+        return bloom
+
+class UrlIndex:
+    def __init__(self, path=None, mode=None, capacity=None, error_rate=None):
+        """
+        path: file prefix the index persists to (None = in memory only)
+        mode: 'exact' (set of hashes) or 'bloom' (Bloom filter sized for `capacity`
+              URLs at `error_rate` false positives)
+        """
+        self.mode = mode or config.URL_INDEX_MODE
+        self.capacity = capacity or config.URL_INDEX_CAPACITY
+        self.error_rate = error_rate or config.URL_INDEX_ERROR_RATE
+        self.path = None
+        if path:
+            self.path = Path(f"{path}.{'bloom.npz' if self.mode == 'bloom' else 'npy'}")
+        loaded = self._load()
+        self.seen = loaded if loaded is not None else self._empty()
+        self.stats = {'variants_collapsed': 0, 'already_collected': 0, 'added': 0}
+
+    @classmethod
+    def from_config(cls):
+        """The shared persistent index at config.URL_INDEX_PATH"""
+        return cls(config.URL_INDEX_PATH)
+
+    def _empty(self):
+        if self.mode == 'bloom':
+            return BloomFilter(self.capacity, self.error_rate)
+        return ExactSeenSet()
+
+    def _load(self):
+        if not self.path or not self.path.exists():
+            return None
+        if self.mode == 'bloom':
+            return BloomFilter.load(self.path)
+        return ExactSeenSet.load(self.path)
+
+    @property
+    def size(self):
+        """Number of URLs collected"""
+        return len(self.seen)
+
+    def __contains__(self, url):
+        return url_key(url) in self.seen
+
+    def add(self, urls):
+        """Mark URLs (and all their variants) as collected"""
+        for url in urls:
+            key = url_key(url)
+            if key not in self.seen:
+                self.seen.add(key)
+                self.stats['added'] += 1
+
+    def filter(self, items, key=None):
+        """
+        Items still worth fetching: one per canonical URL, in order, minus those
+        collected before (by any source, in this or an earlier run)
+        key: function returning an item's URL (items are URLs when omitted)
+        """
+        items = list(items)
+        unique = dedupe_urls(items, key)
+        fresh = [item for item in unique if (key(item) if key else item) not in self]
+        self.stats['variants_collapsed'] += len(items) - len(unique)
+        self.stats['already_collected'] += len(unique) - len(fresh)
+        return fresh
+
+    def save(self):
+        """Persist the index, merging entries another process saved meanwhile"""
+        if not self.path:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        on_disk = self._load()
+        if on_disk is not None:
+            self.seen.merge(on_disk)
+        # np.save/np.savez append their extension to names that lack it
+        temp_path = self.path.with_name(f"tmp_{os.getpid()}_{self.path.name}")
+        self.seen.save(temp_path)
+        os.replace(temp_path, self.path)
+
+    def print_stats(self):
+        """Print how many fetches the index saved"""
+        print(f"\n🔗 URL index ({self.size} URLs, {self.mode}):")
+        print(f"  Duplicate URL variants dropped: {self.stats['variants_collapsed']}")
+        print(f"  URLs already collected: {self.stats['already_collected']}")
+        print(f"  Newly collected: {self.stats['added']}")
@@ -1,35 +1,69 @@
 """
 Database module for storing statements and pairs
+Statements are unique by content_hash, a fixed-width key of their text and source URL
 """
+import hashlib
 import sqlite3
+import threading
+import time
 import pandas as pd
 from datetime import datetime
 import config
 
+SCHEMA_VERSION = 1  # PRAGMA user_version (0 = statements unique on raw text and source URL)
+
+STATEMENTS_TABLE = '''
+    CREATE TABLE IF NOT EXISTS {name} (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        content_hash BLOB NOT NULL UNIQUE,
+        text TEXT NOT NULL,
+        source_url TEXT,
+        author TEXT,
+        publication_date TEXT,
+        topic TEXT,
+        document_id TEXT,
+        created_at TEXT
+    )
+'''
+STATEMENT_COLUMNS = 'id, text, source_url, author, publication_date, topic, document_id, created_at'
+
+# Access paths of the pipeline and the annotation exporter
+INDEXES = [
+    'CREATE INDEX IF NOT EXISTS idx_statements_source_url ON statements(source_url)',
+    'CREATE INDEX IF NOT EXISTS idx_pairs_similarity ON statement_pairs(similarity_score)',
+    'CREATE INDEX IF NOT EXISTS idx_pairs_label ON statement_pairs(relationship_label, inconsistency_subtype)',
+]
+
+# Pair strata that can be filtered on in SQL -> same_source value
+PAIR_STRATA = {'same_source': 1, 'cross_source': 0}
+
+def content_hash(text, source_url):
+    """16-byte BLAKE2b key of a statement's text and source URL"""
+    return hashlib.blake2b(f"{text}\0{source_url or ''}".encode('utf-8'), digest_size=16).digest()
+
 class StatementDatabase:
     def __init__(self, db_path=config.DATABASE_PATH):
         self.db_path = db_path
+        
+        # One long-lived connection; WAL with synchronous=NORMAL keeps the database
+        # consistent while syncing only at checkpoints instead of on every commit
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.execute('PRAGMA temp_store=MEMORY')
+        self.conn.execute(f'PRAGMA cache_size=-{config.DATABASE_CACHE_MB * 1024}')
         self.create_tables()
     
     def create_tables(self):
-        """Create necessary database tables"""
-        conn = sqlite3.connect(self.db_path)
+        """Create necessary database tables, upgrading older databases in place"""
+        conn = self.conn
+        if conn.execute('PRAGMA user_version').fetchone()[0] < SCHEMA_VERSION:
+            self.migrate()
         cursor = conn.cursor()
         
         # Statements table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS statements (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                text TEXT NOT NULL,
-                source_url TEXT,
-                author TEXT,
-                publication_date TEXT,
-                topic TEXT,
-                document_id TEXT,
-                created_at TEXT,
-                UNIQUE(text, source_url)
-            )
-        ''')
+        cursor.execute(STATEMENTS_TABLE.format(name='statements'))
         
         # Statement pairs table
         cursor.execute('''
@@ -48,60 +82,166 @@ class StatementDatabase:
             )
         ''')
         
+        for index in INDEXES:
+            cursor.execute(index)
+        cursor.execute(f'PRAGMA user_version={SCHEMA_VERSION}')
         conn.commit()
-        conn.close()
     
-    def insert_statement(self, text, source_url, author=None, topic=None, document_id=None):
-        """Insert a statement into the database"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+    def migrate(self):
+        """
+        Upgrade a database of the original schema (UNIQUE(text, source_url)) in place
+        Statements are copied, ids unchanged, into a table keyed by content_hash. Rows
+        that only differed by a missing source URL (NULLs never conflicted) merge into
+        the first, and their pairs move to it
+        """
+        conn = self.conn
+        columns = [row[1] for row in conn.execute('PRAGMA table_info(statements)')]
+        if not columns or 'content_hash' in columns:
+            return
         
+        print(f"Migrating {self.db_path} to content-hash statement keys...")
+        start = time.time()
+        kept = {}  # content_hash -> id
+        merged = []  # (merged id, kept id)
+        conn.execute('BEGIN')
         try:
-            cursor.execute('''
-                INSERT INTO statements (text, source_url, author, topic, document_id, created_at)
-                VALUES (?, ?, ?, ?, ?, ?)
-            ''', (text, source_url, author, topic, document_id, datetime.now().isoformat()))
+            conn.execute(STATEMENTS_TABLE.format(name='statements_new'))
+            cursor = conn.execute(f'SELECT {STATEMENT_COLUMNS} FROM statements ORDER BY id')
+            while True:
+                rows = cursor.fetchmany(config.DATABASE_INSERT_BATCH)
+                if not rows:
+                    break
+                new_rows = []
+                for row in rows:
+                    key = content_hash(row[1], row[2])
+                    if key in kept:
+                        merged.append((row[0], kept[key]))
+                    else:
+                        kept[key] = row[0]
+                        new_rows.append((key,) + row)
+                conn.executemany(
+                    f'INSERT INTO statements_new (content_hash, {STATEMENT_COLUMNS}) VALUES ({", ".join("?" * 9)})',
+                    new_rows
+                )
+            
+            for merged_id, kept_id in merged:
+                for column in ('statement_a_id', 'statement_b_id'):
+                    conn.execute(f'UPDATE OR IGNORE statement_pairs SET {column}=? WHERE {column}=?',
+                                 (kept_id, merged_id))
+                    conn.execute(f'DELETE FROM statement_pairs WHERE {column}=?', (merged_id,))
+            
+            # Keep the AUTOINCREMENT counter, so ids of deleted statements are not reused
+            sequence = conn.execute("SELECT seq FROM sqlite_sequence WHERE name='statements'").fetchone()
+            conn.execute('DROP TABLE statements')
+            conn.execute('ALTER TABLE statements_new RENAME TO statements')
+            if sequence:
+                conn.execute("DELETE FROM sqlite_sequence WHERE name='statements'")
+                conn.execute("INSERT INTO sqlite_sequence (name, seq) VALUES ('statements', ?)", sequence)
             conn.commit()
-            statement_id = cursor.lastrowid
-        except sqlite3.IntegrityError:
-            # Statement already exists
-            cursor.execute('SELECT id FROM statements WHERE text=? AND source_url=?', 
-                         (text, source_url))
-            statement_id = cursor.fetchone()[0]
+        except Exception:
+            conn.rollback()
+            raise
+        
+        print(f"✓ Migrated {len(kept)} statements ({len(merged)} merged) in {time.time() - start:.1f}s")
+    
+    def insert_statement(self, text, source_url, author=None, topic=None, document_id=None):
+        """Insert a statement into the database (returns the existing id for a duplicate)"""
+        return self.insert_statements_bulk([{
+            'text': text, 'source_url': source_url, 'author': author, 'topic': topic, 'document_id': document_id
+        }])[0]
+    
+    def insert_statements_bulk(self, statements, topic=None):
+        """
+        Insert statements (dicts with text, source_url and optionally author, topic,
+        document_id) in one transaction. Returns their ids in input order; statements
+        already stored keep their existing id
+        """
+        now = datetime.now().isoformat()
+        rows = [(content_hash(stmt['text'], stmt.get('source_url')), stmt['text'], stmt.get('source_url'),
+                 stmt.get('author'), stmt.get('topic', topic), stmt.get('document_id'), now)
+                for stmt in statements]
+        batch = config.DATABASE_INSERT_BATCH
+        
+        ids = {}  # content_hash -> id
+        with self.lock, self.conn:
+            # Multi-row INSERTs: RETURNING rows are not available through executemany
+            for start in range(0, len(rows), batch):
+                chunk = rows[start:start + batch]
+                cursor = self.conn.execute(
+                    'INSERT INTO statements '
+                    '(content_hash, text, source_url, author, topic, document_id, created_at) VALUES '
+                    + ', '.join(['(?, ?, ?, ?, ?, ?, ?)'] * len(chunk))
+                    + ' ON CONFLICT (content_hash) DO NOTHING RETURNING content_hash, id',
+                    [value for row in chunk for value in row]
+                )
+                ids.update(cursor)
+            
+            # Statements stored before this call
+            missing = list({row[0] for row in rows if row[0] not in ids})
+            for start in range(0, len(missing), batch):
+                chunk = missing[start:start + batch]
+                cursor = self.conn.execute(
+                    f'SELECT content_hash, id FROM statements WHERE content_hash IN ({", ".join("?" * len(chunk))})',
+                    chunk
+                )
+                ids.update(cursor)
         
-        conn.close()
-        return statement_id
+        return [ids[row[0]] for row in rows]
     
     def insert_pair(self, statement_a_id, statement_b_id, similarity_score, same_source=True):
-        """Insert a statement pair"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        """Insert a statement pair (returns None for a duplicate)"""
+        return self.insert_pairs_bulk([(statement_a_id, statement_b_id, similarity_score, same_source)])[0]
+    
+    def insert_pairs_bulk(self, pairs):
+        """
+        Insert pairs ((statement_a_id, statement_b_id, similarity_score, same_source)
+        tuples) in one transaction. Returns their ids in input order, None for pairs
+        already stored or repeated
+        """
+        now = datetime.now().isoformat()
+        rows = [(a_id, b_id, score, same_source, now) for a_id, b_id, score, same_source in pairs]
+        batch = config.DATABASE_INSERT_BATCH
         
-        try:
-            cursor.execute('''
-                INSERT INTO statement_pairs 
-                (statement_a_id, statement_b_id, similarity_score, same_source, created_at)
-                VALUES (?, ?, ?, ?, ?)
-            ''', (statement_a_id, statement_b_id, similarity_score, same_source, 
-                  datetime.now().isoformat()))
-            conn.commit()
-            pair_id = cursor.lastrowid
-        except sqlite3.IntegrityError:
-            pair_id = None
+        inserted = {}  # (statement_a_id, statement_b_id) -> id
+        with self.lock, self.conn:
+            for start in range(0, len(rows), batch):
+                chunk = rows[start:start + batch]
+                cursor = self.conn.execute(
+                    'INSERT INTO statement_pairs '
+                    '(statement_a_id, statement_b_id, similarity_score, same_source, created_at) VALUES '
+                    + ', '.join(['(?, ?, ?, ?, ?)'] * len(chunk))
+                    + ' ON CONFLICT DO NOTHING RETURNING id, statement_a_id, statement_b_id',
+                    [value for row in chunk for value in row]
+                )
+                for pair_id, a_id, b_id in cursor:
+                    inserted[a_id, b_id] = pair_id
         
-        conn.close()
-        return pair_id
+        return [inserted.pop(row[:2], None) for row in rows]
     
     def get_all_statements(self):
         """Retrieve all statements as DataFrame"""
-        conn = sqlite3.connect(self.db_path)
-        df = pd.read_sql_query("SELECT * FROM statements", conn)
-        conn.close()
-        return df
+        with self.lock:
+            return pd.read_sql_query(f"SELECT {STATEMENT_COLUMNS} FROM statements", self.conn)
     
-    def get_all_pairs(self):
-        """Retrieve all statement pairs with full text"""
-        conn = sqlite3.connect(self.db_path)
+    def pairs_query(self, unlabeled_only=False, stratum=None, min_score=None):
+        """
+        SQL and parameters for statement pairs with full text, filtered in SQL
+        unlabeled_only: only pairs without a relationship_label
+        stratum: 'same_source' or 'cross_source' (pairs store only same_source)
+        min_score: minimum similarity_score
+        """
+        conditions, params = [], []
+        if unlabeled_only:
+            conditions.append("(p.relationship_label IS NULL OR p.relationship_label = '')")
+        if stratum is not None:
+            if stratum not in PAIR_STRATA:
+                raise ValueError(f"Unknown stratum {stratum!r} (expected one of {', '.join(PAIR_STRATA)})")
+            conditions.append('p.same_source = ?')
+            params.append(PAIR_STRATA[stratum])
+        if min_score is not None:
+            conditions.append('p.similarity_score >= ?')
+            params.append(min_score)
+        
         query = '''
             SELECT 
                 p.id,
@@ -121,6 +261,37 @@ class StatementDatabase:
             JOIN statements s1 ON p.statement_a_id = s1.id
             JOIN statements s2 ON p.statement_b_id = s2.id
         '''
-        df = pd.read_sql_query(query, conn)
-        conn.close()
-        return df
+        if conditions:
+            query += ' WHERE ' + ' AND '.join(conditions)
+        return query, params
+    
+    def get_all_pairs(self, **filters):
+        """Retrieve all statement pairs with full text (filters as in pairs_query)"""
+        query, params = self.pairs_query(**filters)
+        with self.lock:
+            return pd.read_sql_query(query, self.conn, params=params)
+    
+    def iter_pairs(self, chunk_size=None, **filters):
+        """
+        Statement pairs with full text as DataFrames of up to chunk_size rows (filters as
+        in pairs_query). Rows are fetched from a cursor chunk by chunk on a separate read
+        connection, so memory stays flat however many pairs there are
+        """
+        query, params = self.pairs_query(**filters)
+        conn = sqlite3.connect(self.db_path)
+        try:
+            yield from pd.read_sql_query(query, conn, params=params,
+                                         chunksize=chunk_size or config.EXPORT_CHUNK_SIZE)
+        finally:
+            conn.close()
+    
+    def close(self):
+        self.conn.close()
+
+if __name__ == "__main__":
+    # Open (and upgrade in place) the pipeline database
+    db = StatementDatabase()
+    statement_count = db.conn.execute('SELECT COUNT(*) FROM statements').fetchone()[0]
+    pair_count = db.conn.execute('SELECT COUNT(*) FROM statement_pairs').fetchone()[0]
+    print(f"✓ {db.db_path}: schema version {SCHEMA_VERSION}, {statement_count} statements, {pair_count} pairs")
+    db.close()